@@ -0,0 +1,27 @@
+"""
+项目公共模块
+==============================================
+
+各章节示例共享的基础设施代码，例如：
+- model_factory: 延迟创建并缓存聊天模型
+- response_cache: 模型响应的本地 SQLite 缓存
+- model_compare: 多模型并发对比（延迟、首 token 时间、输出速度）
+- streaming: 流式输出渲染（stream / astream，记录首 token 时间）
+- agent_runner: Agent 异步并发运行器（ainvoke / astream + 信号量限流）
+- tool_timeout: 工具并行执行时的单工具超时中间件
+- tool_cache: 纯函数式工具的结果缓存（TTL + LRU，跳过重复执行与参数校验）
+- search_index: 本地搜索引擎（中文 bigram 分词 + 倒排索引 + BM25 排序）
+- weather_provider: 可替换的天气数据源（内存映射 CSV + TTL 缓存 + 请求合并）
+- agent_pool: 编译好的 Agent 复用池（相同配置只编译一次，统计节省的编译时间）
+- tool_schema: 工具 schema 缓存（bind_tools / create_agent 复用已生成的 schema）
+- checkpointer: SQLite 持久化 checkpointer（WAL 模式，按超级步批量提交）
+- delta_state: 增量保存消息历史的 Agent 状态（DeltaChannel + 定期快照）
+- bounded_checkpointer: 有容量上限的 InMemorySaver（LRU 淘汰会话并溢出到磁盘）
+- compact_serde: checkpoint 的紧凑二进制序列化（消息字段驻留 + zstd 压缩）
+- token_counter: 基于 tiktoken BPE 分词器的 token 计数（按消息缓存）
+- context_window: 增量维护的对话滑动窗口（固定保留 system 消息，按 token 数 / 轮数淘汰）
+- background_summary: 后台预先生成摘要的 SummarizationMiddleware（去掉摘要造成的延迟尖刺）
+- rolling_summary: 分层滚动摘要（每次只摘要新增的一段对话，分段摘要逐层合并）
+- prefix_cache: 提示词前缀复用率统计（服务端前缀缓存 / KV 缓存的复用潜力）
+- tools: 各章节共享的工具（天气、计算器、搜索），按需加载
+"""
@@ -0,0 +1,205 @@
+"""
+公共模块：Agent 复用池
+==============================================
+
+create_agent 每次都会构建并编译一个新的 LangGraph 图（创建节点、工具节点、校验图结构），
+按请求创建 Agent 时，这部分耗时会出现在每个请求的延迟里。
+
+编译好的 Agent 本身是无状态的（对话状态保存在 checkpointer 中），可以被多个请求并发复用：
+- 键：(模型, 工具列表, system_prompt, 中间件, 其他参数)
+- 相同的键只编译一次，之后直接返回编译好的 Agent
+- checkpointer / store 不参与编译：复用编译结果，通过 copy 绑定到本次传入的 checkpointer（几乎零开销）
+- 多个线程同时请求同一个键时，只有一个线程编译，其余线程等待并复用结果
+- 统计编译次数、命中次数和节省的编译时间
+
+使用方法：
+
+from common.agent_pool import get_agent
+
+# 参数与 create_agent 相同
+agent = get_agent(model=model, tools=[get_weather], system_prompt="你是一名智能助手。")
+
+注意：
+- 模型、工具、中间件按对象身份区分：get_chat_model 对相同配置返回同一个模型实例，
+  因此相同配置的模型可以命中；中间件需要复用同一个实例才能命中
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from langchain.agents import create_agent
+
+
+def _key_part(value):
+    """
+    把参数转换为可哈希的键：基本类型按值，列表/字典逐项转换，其他对象按身份（id）
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _key_part(v)) for k, v in value.items()))
+    return ("id", id(value))
+
+
+@dataclass
+class _PoolEntry:
+    """
+    池中的一个编译好的 Agent
+    """
+
+    agent: object
+    compile_time: float  # 编译耗时（秒）
+    refs: tuple  # 键中按 id 区分的对象，保持引用以免 id 被复用
+
+
+class AgentPool:
+    """
+    编译好的 Agent 的复用池（LRU 淘汰，线程安全）
+    """
+
+    def __init__(self, maxsize: int = 64):
+        """
+        参数：
+            maxsize: 最多保存的 Agent 数，超过后淘汰最久未使用的
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}  # 键 -> 编译锁，保证同一个键只编译一次
+
+        # 统计信息
+        self.compiles = 0
+        self.hits = 0
+        self.compile_time = 0.0  # 累计编译耗时（秒）
+        self.compile_time_saved = 0.0  # 命中时节省的编译耗时（秒）
+
+    def get(
+        self,
+        model,
+        tools=None,
+        system_prompt=None,
+        middleware=(),
+        checkpointer=None,
+        store=None,
+        **kwargs,
+    ):
+        """
+        获取编译好的 Agent，参数与 create_agent 相同
+
+        返回：
+            编译好的 Agent（绑定了本次传入的 checkpointer / store）
+        """
+        tools = list(tools or [])
+        middleware = tuple(middleware)
+        key = (
+            _key_part(model),
+            _key_part(tools),
+            _key_part(system_prompt),
+            _key_part(middleware),
+            _key_part(kwargs),
+        )
+
+        entry = self._lookup(key)
+        if entry is None:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+            with key_lock:
+                # 等待期间其他线程可能已经编译完成
+                entry = self._lookup(key)
+                if entry is None:
+                    entry = self._compile(
+                        key, model, tools, system_prompt, middleware, kwargs
+                    )
+
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+        if checkpointer is None and store is None:
+            return entry.agent
+        return entry.agent.copy(update={"checkpointer": checkpointer, "store": store})
+
+    def _lookup(self, key):
+        """
+        查询池，命中时更新 LRU 顺序和统计
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.compile_time_saved += entry.compile_time
+            return entry
+
+    def _compile(self, key, model, tools, system_prompt, middleware, kwargs):
+        """
+        编译 Agent 并放入池中
+        """
+        start = time.perf_counter()
+        agent = create_agent(
+            model=model,
+            tools=tools,
+            system_prompt=system_prompt,
+            middleware=middleware,
+            **kwargs,
+        )
+        elapsed = time.perf_counter() - start
+
+        entry = _PoolEntry(
+            agent=agent,
+            compile_time=elapsed,
+            refs=(model, tools, system_prompt, middleware, kwargs),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self.compiles += 1
+            self.compile_time += elapsed
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        """
+        清空池与统计
+        """
+        with self._lock:
+            self._entries.clear()
+            self.compiles = 0
+            self.hits = 0
+            self.compile_time = 0.0
+            self.compile_time_saved = 0.0
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：池中 Agent 数、编译次数、命中次数、累计编译耗时与节省的编译耗时（秒）
+        """
+        with self._lock:
+            return {
+                "agents": len(self._entries),
+                "compiles": self.compiles,
+                "hits": self.hits,
+                "compile_time": self.compile_time,
+                "compile_time_saved": self.compile_time_saved,
+            }
+
+
+# 进程内共享的默认池
+_default_pool = AgentPool()
+
+
+def get_agent_pool() -> AgentPool:
+    """
+    获取默认的 Agent 复用池
+    """
+    return _default_pool
+
+
+def get_agent(model, tools=None, system_prompt=None, **kwargs):
+    """
+    从默认池获取编译好的 Agent，参数与 create_agent 相同
+    """
+    return _default_pool.get(model, tools=tools, system_prompt=system_prompt, **kwargs)
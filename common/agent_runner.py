@@ -0,0 +1,177 @@
+"""
+公共模块：Agent 异步并发运行器
+==============================================
+
+agent.invoke / agent.stream 是同步调用：等待模型响应时，整个线程都在空等。
+同时服务很多用户时，应该使用异步的 ainvoke / astream：
+- 一个会话在等待模型 API 时，事件循环可以去推进其他会话
+- 用 asyncio.Semaphore 限制同时进行的会话数，避免超过模型 API 的速率限制
+
+使用方法：
+
+import asyncio
+from common.agent_runner import run_conversations
+
+conversations = [
+    ["北京天气怎么样？"],
+    ["10 加 5 等于多少？", "再乘以 3 呢？"],  # 多轮会话
+]
+report = asyncio.run(run_conversations(agent, conversations, max_concurrency=8))
+print(report.conversations_per_second)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ConversationResult:
+    """
+    单个会话的运行结果
+    """
+
+    conversation_id: str
+    messages: list = field(default_factory=list)  # 会话结束时的完整消息历史
+    latency: float = 0.0  # 会话总耗时（秒）
+    error: str | None = None
+
+    @property
+    def final_answer(self) -> str:
+        """
+        最后一条消息的内容（Agent 的最终回答）
+        """
+        return self.messages[-1].content if self.messages else ""
+
+
+@dataclass
+class RunReport:
+    """
+    一批会话的运行报告
+    """
+
+    results: list[ConversationResult]
+    wall_time: float  # 整批会话的总耗时（秒）
+
+    @property
+    def conversations_per_second(self) -> float:
+        """
+        吞吐量：每秒完成的会话数
+        """
+        if self.wall_time <= 0:
+            return 0.0
+        return len(self.results) / self.wall_time
+
+    @property
+    def failed(self) -> int:
+        """
+        失败的会话数
+        """
+        return sum(1 for r in self.results if r.error)
+
+
+async def _run_turn(agent, agent_input, config, stream, on_chunk, conversation_id):
+    """
+    执行一轮对话，返回这一轮结束时的 Agent 状态
+    """
+    if not stream:
+        return await agent.ainvoke(agent_input, config=config)
+
+    # stream_mode="updates"：每个节点执行完成后返回一次更新，便于实时展示进度
+    # stream_mode="values"：每一步返回完整状态，最后一个即为最终状态
+    final_state = None
+    async for mode, chunk in agent.astream(
+        agent_input, config=config, stream_mode=["updates", "values"]
+    ):
+        if mode == "values":
+            final_state = chunk
+        elif on_chunk is not None:
+            on_chunk(conversation_id, chunk)
+    return final_state
+
+
+async def run_conversation(
+    agent,
+    turns: list[str],
+    conversation_id: str,
+    stream: bool = False,
+    on_chunk=None,
+) -> ConversationResult:
+    """
+    异步运行一个（可能多轮的）会话
+
+    参数：
+        agent: create_agent 创建的 Agent
+        turns: 用户每一轮的输入
+        conversation_id: 会话 ID；Agent 配置了 checkpointer 时作为 thread_id
+        stream: 是否使用 astream（否则使用 ainvoke）
+        on_chunk: 流式模式下每个节点更新的回调，参数为 (conversation_id, chunk)
+
+    返回：
+        ConversationResult
+    """
+    result = ConversationResult(conversation_id=conversation_id)
+    config = {"configurable": {"thread_id": conversation_id}}
+
+    # 有 checkpointer 时由它保存历史；没有时需要手动携带完整历史
+    has_memory = getattr(agent, "checkpointer", None) is not None
+    history = []
+
+    start = time.perf_counter()
+    try:
+        for turn in turns:
+            user_message = {"role": "user", "content": turn}
+            agent_input = {
+                "messages": [user_message] if has_memory else history + [user_message]
+            }
+            state = await _run_turn(
+                agent, agent_input, config, stream, on_chunk, conversation_id
+            )
+            history = state["messages"]
+        result.messages = history
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.latency = time.perf_counter() - start
+
+    return result
+
+
+async def run_conversations(
+    agent,
+    conversations: list[list[str]],
+    max_concurrency: int = 8,
+    stream: bool = False,
+    on_chunk=None,
+) -> RunReport:
+    """
+    并发运行多个会话
+
+    参数：
+        agent: create_agent 创建的 Agent
+        conversations: 会话列表，每个会话是用户各轮输入组成的列表
+        max_concurrency: 最多同时进行的会话数
+        stream: 是否使用 astream（否则使用 ainvoke）
+        on_chunk: 流式模式下每个节点更新的回调，参数为 (conversation_id, chunk)
+
+    返回：
+        RunReport（results 与 conversations 顺序一致）
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(index, turns):
+        async with semaphore:
+            return await run_conversation(
+                agent,
+                turns,
+                conversation_id=f"conversation-{index}",
+                stream=stream,
+                on_chunk=on_chunk,
+            )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(limited(i, turns) for i, turns in enumerate(conversations, 1))
+    )
+    wall_time = time.perf_counter() - start
+
+    return RunReport(results=list(results), wall_time=wall_time)
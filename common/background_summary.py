@@ -0,0 +1,252 @@
+"""
+公共模块：后台预先生成摘要的 SummarizationMiddleware
+==============================================
+
+SummarizationMiddleware 在对话 token 数超过阈值的那一次模型调用前，
+同步调用摘要模型生成摘要：
+- 摘要模型要读完全部旧消息，耗时往往比一次普通回复还长
+- 这段时间全部算在用户当前这一轮的等待时间里，出现明显的延迟尖刺
+
+本模块提供 BackgroundSummarizationMiddleware（SummarizationMiddleware 的子类）：
+1. token 数接近阈值（达到 prefetch_ratio × 阈值）时，在后台线程中为当时的旧消息生成摘要，
+   当前这一轮不等待；模型调用前后都会检查，模型回复之后就越过阈值的一轮
+   （一轮新增的 token 超过阈值的 1 - prefetch_ratio）也能在下一轮之前开始生成
+2. 之后的模型调用发现摘要已经生成好，就把旧消息替换为摘要（之后新增的消息原样保留）
+3. 达到阈值时摘要还没生成完，只等待剩余的时间；后台摘要失败或旧消息已被修改时，
+   退回到原来的同步摘要
+4. 按 thread_id 分别维护进行中的摘要，同一个中间件可以服务多个会话
+
+使用方法：
+
+from common.background_summary import BackgroundSummarizationMiddleware
+
+agent = create_agent(
+    model=model,
+    tools=[],
+    checkpointer=InMemorySaver(),
+    middleware=[
+        BackgroundSummarizationMiddleware(
+            model=summary_model,
+            trigger=("tokens", 1000),
+            prefetch_ratio=0.8,  # 达到 800 tokens 时开始在后台生成摘要
+        )
+    ],
+)
+
+注意：
+- 摘要提前生成，替换的是接近阈值时的旧消息，效果与在阈值处同步摘要基本相同
+- 后台线程中的摘要调用不会出现在 Agent 的流式输出与回调中
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.agents.middleware import SummarizationMiddleware
+from langchain_core.messages import RemoveMessage
+from langgraph.config import get_config
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+
+class _PendingSummary:
+    """
+    一个会话进行中的后台摘要：被摘要的旧消息 id + 摘要结果
+    """
+
+    __slots__ = ("message_ids", "future")
+
+    def __init__(self, message_ids: tuple, future):
+        self.message_ids = message_ids
+        self.future = future
+
+    def matches(self, messages: list) -> bool:
+        """
+        当前消息列表的开头是否仍是被摘要的那些消息
+        """
+        if len(messages) < len(self.message_ids):
+            return False
+        return all(
+            message.id == message_id
+            for message, message_id in zip(messages, self.message_ids)
+        )
+
+
+def _thread_key():
+    """
+    当前会话的 thread_id（没有 checkpointer 时为 None）
+    """
+    try:
+        return get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:  # 不在图的执行上下文中
+        return None
+
+
+class BackgroundSummarizationMiddleware(SummarizationMiddleware):
+    """
+    接近阈值时在后台预先生成摘要、下一次模型调用时直接替换的摘要中间件
+    """
+
+    def __init__(
+        self, model, *, prefetch_ratio: float = 0.8, max_workers: int = 4, **kwargs
+    ):
+        """
+        参数：
+            model: 生成摘要的模型
+            prefetch_ratio: token 数达到阈值的多少比例时开始在后台生成摘要
+            max_workers: 生成摘要的后台线程数
+            **kwargs: 传给 SummarizationMiddleware 的参数（trigger、keep、summary_prompt 等）
+        """
+        super().__init__(model, **kwargs)
+        if not 0 < prefetch_ratio <= 1:
+            raise ValueError(f"prefetch_ratio 必须在 (0, 1] 之间，实际为 {prefetch_ratio}")
+        self.prefetch_ratio = prefetch_ratio
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="summary"
+        )
+        self._pending = {}  # thread_id -> _PendingSummary
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.prefetched = 0  # 启动的后台摘要次数
+        self.swapped = 0  # 使用后台摘要替换旧消息的次数
+        self.waited = 0  # 替换前还需要等待摘要完成的次数
+        self.inline = 0  # 退回同步摘要的次数
+
+    # ------------------------------------------------------------------
+    # 后台摘要
+    # ------------------------------------------------------------------
+
+    def _get_pending(self, key, messages: list) -> _PendingSummary | None:
+        """
+        取出会话进行中的摘要；旧消息已被修改（如被其他中间件替换）时丢弃
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and not pending.matches(messages):
+                del self._pending[key]
+                pending = None
+            return pending
+
+    def _maybe_prefetch(self, key, messages: list, total_tokens: int) -> None:
+        """
+        token 数接近阈值时，在后台为当前的旧消息生成摘要
+        """
+        # 把 token 数按比例放大后再判断，等价于把 token 阈值按比例缩小
+        scaled_tokens = int(total_tokens / self.prefetch_ratio)
+        if not self._should_summarize(messages, scaled_tokens):
+            return
+        cutoff_index = self._determine_cutoff_index(messages)
+        if cutoff_index <= 0:
+            return
+
+        messages_to_summarize = list(messages[:cutoff_index])
+        with self._lock:
+            if key in self._pending:
+                return
+            future = self._executor.submit(self._create_summary, messages_to_summarize)
+            self._pending[key] = _PendingSummary(
+                tuple(message.id for message in messages_to_summarize), future
+            )
+            self.prefetched += 1
+
+    def _swap(self, key, pending: _PendingSummary, messages: list) -> dict | None:
+        """
+        用已生成的摘要替换旧消息；后台摘要失败时返回 None
+        """
+        with self._lock:
+            self._pending.pop(key, None)
+        try:
+            summary = pending.future.result()
+        except Exception:
+            return None
+
+        with self._lock:
+            self.swapped += 1
+        return {
+            "messages": [
+                RemoveMessage(id=REMOVE_ALL_MESSAGES),
+                *self._build_new_messages(summary),
+                *messages[len(pending.message_ids) :],
+            ]
+        }
+
+    def _plan(self, messages: list):
+        """
+        决定本次模型调用前的处理：返回 (会话, 进行中的摘要, 是否达到阈值, token 数)
+        """
+        self._ensure_message_ids(messages)
+        key = _thread_key()
+        pending = self._get_pending(key, messages)
+        total_tokens = self.token_counter(messages)
+        should_summarize = self._should_summarize(messages, total_tokens)
+        return key, pending, should_summarize, total_tokens
+
+    # ------------------------------------------------------------------
+    # 中间件钩子
+    # ------------------------------------------------------------------
+
+    def before_model(self, state, runtime):
+        messages = state["messages"]
+        key, pending, should_summarize, total_tokens = self._plan(messages)
+
+        if pending is not None and (pending.future.done() or should_summarize):
+            if not pending.future.done():
+                with self._lock:
+                    self.waited += 1
+                pending.future.exception()  # 等待摘要完成
+            result = self._swap(key, pending, messages)
+            if result is not None:
+                return result
+
+        if should_summarize:
+            with self._lock:
+                self.inline += 1
+            return super().before_model(state, runtime)
+
+        self._maybe_prefetch(key, messages, total_tokens)
+        return None
+
+    async def abefore_model(self, state, runtime):
+        messages = state["messages"]
+        key, pending, should_summarize, total_tokens = self._plan(messages)
+
+        if pending is not None and (pending.future.done() or should_summarize):
+            if not pending.future.done():
+                with self._lock:
+                    self.waited += 1
+                # 异步等待，不阻塞事件循环
+                await asyncio.wait([asyncio.wrap_future(pending.future)])
+            result = self._swap(key, pending, messages)
+            if result is not None:
+                return result
+
+        if should_summarize:
+            with self._lock:
+                self.inline += 1
+            return await super().abefore_model(state, runtime)
+
+        self._maybe_prefetch(key, messages, total_tokens)
+        return None
+
+    def after_model(self, state, runtime):
+        # 模型回复已加入历史：这一轮可能已经越过阈值，提前为下一次模型调用准备摘要
+        messages = state["messages"]
+        self._ensure_message_ids(messages)
+        self._maybe_prefetch(_thread_key(), messages, self.token_counter(messages))
+        return None
+
+    async def aafter_model(self, state, runtime):
+        return self.after_model(state, runtime)
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：后台摘要 / 替换 / 等待 / 同步摘要次数，以及进行中的摘要数
+        """
+        with self._lock:
+            return {
+                "prefetched": self.prefetched,
+                "swapped": self.swapped,
+                "waited": self.waited,
+                "inline": self.inline,
+                "pending": len(self._pending),
+            }
@@ -0,0 +1,352 @@
+"""
+公共模块：有容量上限的 InMemorySaver（LRU 淘汰 + 溢出到磁盘）
+==============================================
+
+InMemorySaver 会永久保存每一个 thread_id 的全部 checkpoint：
+服务端同时承载成千上万个会话时，内存只增不减。
+
+本模块提供 BoundedInMemorySaver（InMemorySaver 的子类）：
+1. 限制内存中的会话数（max_threads）和序列化数据总字节数（max_bytes）
+2. 超过上限时，把最久未访问的会话整体移出内存，写入本地磁盘（SQLite 文件）
+3. 之后再用这个 thread_id 调用 invoke / get_state 时，自动从磁盘加载回内存，对调用方透明
+4. 按会话维护 checkpoint / 写入 / 通道值的索引，淘汰与删除会话不需要扫描全部数据
+
+使用方法：
+
+from common.bounded_checkpointer import BoundedInMemorySaver
+
+saver = BoundedInMemorySaver(max_threads=1000, max_bytes=256 * 1024 * 1024)
+agent = create_agent(model=model, tools=[], checkpointer=saver)
+print(saver.stats())
+
+注意：
+- 溢出文件只用于扩展内存，默认放在临时目录、close() 时删除；需要重启后保留对话请使用
+  common/checkpointer.py 中的 SQLiteSaver
+- 溢出文件使用 pickle 保存本进程写入的数据，不要指向不可信的文件
+"""
+
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS spilled "
+    "(thread_id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+)
+_INSERT_SPILLED = "INSERT OR REPLACE INTO spilled (thread_id, data) VALUES (?, ?)"
+_SELECT_SPILLED = "SELECT data FROM spilled WHERE thread_id = ?"
+_DELETE_SPILLED = "DELETE FROM spilled WHERE thread_id = ?"
+_LIST_SPILLED = "SELECT thread_id FROM spilled"
+
+
+class _ThreadIndex:
+    """
+    一个会话在内存中的数据：writes / blobs 的键，以及序列化数据的字节数
+    """
+
+    __slots__ = ("write_keys", "blob_keys", "nbytes")
+
+    def __init__(self):
+        self.write_keys = set()
+        self.blob_keys = set()
+        self.nbytes = 0
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """
+    有会话数 / 字节数上限的 InMemorySaver，超出上限的会话按 LRU 溢出到磁盘
+    """
+
+    def __init__(
+        self,
+        max_threads: int = 1000,
+        max_bytes: int | None = 256 * 1024 * 1024,
+        spill_path: str | Path | None = None,
+        *,
+        serde=None,
+    ):
+        """
+        参数：
+            max_threads: 内存中最多保留的会话数
+            max_bytes: 内存中序列化数据的总字节数上限，None 表示不限制
+            spill_path: 溢出文件路径，默认在临时目录中创建、close() 时删除
+            serde: 序列化器，默认与 InMemorySaver 相同
+        """
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+
+        self._tmpdir = None
+        if spill_path is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="checkpoint_spill_")
+            spill_path = Path(self._tmpdir) / "spill.sqlite"
+        self.spill_path = str(spill_path)
+        self._spill = sqlite3.connect(self.spill_path, check_same_thread=False)
+        self._spill.execute(_SCHEMA)
+        self._spill.commit()
+
+        # InMemorySaver 本身没有加锁；淘汰会同时修改多个字典，所有操作在这把锁内完成
+        self._lock = threading.RLock()
+        self._lru = OrderedDict()  # thread_id -> _ThreadIndex，按最近访问排序
+        self._spilled = {
+            thread_id for (thread_id,) in self._spill.execute(_LIST_SPILLED)
+        }
+        self.nbytes = 0
+
+        # 统计信息
+        self.evictions = 0
+        self.reloads = 0
+
+    # ------------------------------------------------------------------
+    # LRU 与溢出
+    # ------------------------------------------------------------------
+
+    def _touch(self, thread_id: str) -> _ThreadIndex:
+        """
+        标记会话为最近使用；会话在磁盘上时先加载回内存（调用方持有锁）
+        """
+        index = self._lru.get(thread_id)
+        if index is not None:
+            self._lru.move_to_end(thread_id)
+            return index
+        index = self._lru[thread_id] = _ThreadIndex()
+        if thread_id in self._spilled:
+            self._reload(thread_id, index)
+        return index
+
+    def _reload(self, thread_id: str, index: _ThreadIndex) -> None:
+        row = self._spill.execute(_SELECT_SPILLED, (thread_id,)).fetchone()
+        storage, writes, blobs = pickle.loads(row[0])
+
+        self.storage[thread_id] = defaultdict(dict, storage)
+        self.writes.update(writes)
+        self.blobs.update(blobs)
+        index.write_keys.update(writes)
+        index.blob_keys.update(blobs)
+        index.nbytes = _thread_nbytes(storage, writes, blobs)
+        self.nbytes += index.nbytes
+
+        with self._spill:
+            self._spill.execute(_DELETE_SPILLED, (thread_id,))
+        self._spilled.discard(thread_id)
+        self.reloads += 1
+
+    def _evict(self, keep: str) -> None:
+        """
+        超过上限时，把最久未访问的会话写入磁盘并移出内存（调用方持有锁）
+
+        参数：
+            keep: 当前正在写入的会话，不会被淘汰
+        """
+        while len(self._lru) > self.max_threads or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            thread_id = next(iter(self._lru))
+            if thread_id == keep:
+                if len(self._lru) == 1:
+                    return
+                self._lru.move_to_end(thread_id)
+                continue
+
+            index = self._lru.pop(thread_id)
+            storage = self.storage.pop(thread_id, {})
+            writes = {
+                k: self.writes.pop(k) for k in index.write_keys if k in self.writes
+            }
+            blobs = {k: self.blobs.pop(k) for k in index.blob_keys if k in self.blobs}
+            self.nbytes -= index.nbytes
+
+            # 只读访问过、没有任何数据的会话直接丢弃
+            if any(storage.values()) or writes or blobs:
+                data = pickle.dumps(
+                    ({ns: dict(cps) for ns, cps in storage.items()}, writes, blobs),
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+                with self._spill:
+                    self._spill.execute(_INSERT_SPILLED, (thread_id, data))
+                self._spilled.add(thread_id)
+                self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            index = self._touch(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][
+                checkpoint["id"]
+            ]
+            added = len(saved[1]) + len(saved_metadata[1])
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                if key not in index.blob_keys:
+                    index.blob_keys.add(key)
+                    added += len(self.blobs[key][1])
+            index.nbytes += added
+            self.nbytes += added
+
+            self._evict(keep=thread_id)
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            index = self._touch(thread_id)
+            before = _writes_nbytes(self.writes.get(key, {}))
+            super().put_writes(config, writes, task_id, task_path)
+            added = _writes_nbytes(self.writes[key]) - before
+            index.write_keys.add(key)
+            index.nbytes += added
+            self.nbytes += added
+
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            index = self._lru.pop(thread_id, None)
+            if index is not None:
+                self.storage.pop(thread_id, None)
+                for key in index.write_keys:
+                    self.writes.pop(key, None)
+                for key in index.blob_keys:
+                    self.blobs.pop(key, None)
+                self.nbytes -= index.nbytes
+            if thread_id in self._spilled:
+                with self._spill:
+                    self._spill.execute(_DELETE_SPILLED, (thread_id,))
+                self._spilled.discard(thread_id)
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            result = super().get_tuple(config)
+            self._evict(keep=thread_id)
+            return result
+
+    def get_delta_channel_history(self, *, config, channels):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            result = super().get_delta_channel_history(config=config, channels=channels)
+            self._evict(keep=thread_id)
+            return result
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        if config is not None:
+            thread_id = config["configurable"]["thread_id"]
+            with self._lock:
+                self._touch(thread_id)
+                items = list(
+                    super().list(config, filter=filter, before=before, limit=limit)
+                )
+                self._evict(keep=thread_id)
+            yield from items
+            return
+
+        # 列出全部会话：内存中的会话直接读取，磁盘上的会话逐个读出，不加载回内存、不触发淘汰
+        with self._lock:
+            items = list(super().list(None, filter=filter, before=before, limit=limit))
+            spilled = sorted(self._spilled)
+        yield from items
+        if limit is not None:
+            limit -= len(items)
+        for thread_id in spilled:
+            if limit is not None and limit <= 0:
+                return
+            view = self._spilled_view(thread_id)
+            if view is None:
+                continue
+            items = list(view.list(None, filter=filter, before=before, limit=limit))
+            yield from items
+            if limit is not None:
+                limit -= len(items)
+
+    def _spilled_view(self, thread_id: str) -> InMemorySaver | None:
+        """
+        用磁盘上的一个会话构造临时的 InMemorySaver（只读）
+        """
+        with self._lock:
+            row = self._spill.execute(_SELECT_SPILLED, (thread_id,)).fetchone()
+        if row is None:
+            return None
+        storage, writes, blobs = pickle.loads(row[0])
+        view = InMemorySaver(serde=self.serde)
+        view.storage[thread_id] = defaultdict(dict, storage)
+        view.writes.update(writes)
+        view.blobs.update(blobs)
+        return view
+
+    # ------------------------------------------------------------------
+    # 生命周期与统计
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """
+        关闭溢出文件；使用默认临时目录时一并删除
+        """
+        with self._lock:
+            if self._spill is None:
+                return
+            self._spill.close()
+            self._spill = None
+            if self._tmpdir is not None:
+                shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：内存中的会话数与字节数、磁盘上的会话数、淘汰与加载次数
+        """
+        with self._lock:
+            return {
+                "threads": len(self._lru),
+                "bytes": self.nbytes,
+                "spilled_threads": len(self._spilled),
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+            }
+
+
+def _writes_nbytes(writes: dict) -> int:
+    return sum(len(value[1]) for _task_id, _channel, value, _path in writes.values())
+
+
+def _thread_nbytes(storage: dict, writes: dict, blobs: dict) -> int:
+    """
+    一个会话的序列化数据字节数
+    """
+    total = sum(
+        len(checkpoint[1]) + len(metadata[1])
+        for checkpoints in storage.values()
+        for checkpoint, metadata, _parent in checkpoints.values()
+    )
+    total += sum(_writes_nbytes(w) for w in writes.values())
+    total += sum(len(blob[1]) for blob in blobs.values())
+    return total
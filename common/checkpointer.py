@@ -0,0 +1,669 @@
+"""
+公共模块：SQLite 持久化 checkpointer
+==============================================
+
+InMemorySaver 把所有会话状态放在进程内存里：
+- 进程重启后，所有 thread_id 的对话历史全部丢失
+- 会话越多、对话越长，占用的内存越大，且永远不会释放
+
+本模块提供基于本地 SQLite 文件的 checkpointer（SQLiteSaver），接口与 InMemorySaver 相同：
+1. WAL 模式：写入不阻塞读取，多个线程可以同时读取不同会话的状态
+2. 按超级步（super-step）批量写入：
+   - 一个超级步中，每个任务完成时都会调用 put_writes 保存中间写入
+   - 这些写入先放在内存缓冲区中，与该超级步结束时的 put 在同一个事务中提交
+   - 每个超级步只提交一次事务（只 fsync 一次），而不是每个任务提交一次
+3. 预编译语句：SQL 语句都是固定的字符串，由 sqlite3 的语句缓存复用编译结果
+4. 单个写连接（加锁串行写入）+ 每个线程一个只读连接（并发读取）
+
+使用方法：
+
+from common.checkpointer import SQLiteSaver, create_checkpointer
+
+agent = create_agent(model=model, tools=[], checkpointer=SQLiteSaver())
+
+# 根据环境变量 CHECKPOINTER 选择：memory（默认，InMemorySaver）、bounded（BoundedInMemorySaver）
+# 或 sqlite（SQLiteSaver）
+agent = create_agent(model=model, tools=[], checkpointer=create_checkpointer())
+
+注意：
+- 缓冲区中尚未提交的写入会在下一次 put、读取该会话的状态、flush() / close() 以及进程正常退出时提交；
+  进程被强制杀死时，最后一个超级步中未提交的写入会丢失，恢复后这些任务会重新执行
+- 异步接口（aget_tuple / aput 等）直接调用同步实现，与 InMemorySaver 相同
+"""
+
+import atexit
+import json
+import os
+import random
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+# 默认数据库文件：项目根目录下的 .cache/checkpoints.sqlite
+DEFAULT_CHECKPOINT_PATH = (
+    Path(__file__).resolve().parents[1] / ".cache" / "checkpoints.sqlite"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+# 固定的 SQL 语句：sqlite3 按语句字符串缓存编译结果（cached_statements）
+_INSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+    "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_BLOB = (
+    "INSERT OR IGNORE INTO blobs (thread_id, checkpoint_ns, channel, version, "
+    "type, blob) VALUES (?, ?, ?, ?, ?, ?)"
+)
+# 普通写入（idx >= 0）已存在时保留第一次的结果，特殊写入（错误、中断等，idx < 0）覆盖
+_INSERT_WRITE = (
+    "INSERT OR IGNORE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, "
+    "idx, channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_WRITE = (
+    "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, "
+    "idx, channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT_CHECKPOINT = (
+    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+    "metadata_type, metadata FROM checkpoints "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+)
+_SELECT_LATEST_CHECKPOINT = (
+    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+    "metadata_type, metadata FROM checkpoints "
+    "WHERE thread_id = ? AND checkpoint_ns = ? "
+    "ORDER BY checkpoint_id DESC LIMIT 1"
+)
+# 一条语句取出一个 checkpoint 用到的全部 blob：(channel, version) 列表以 JSON 对象传入
+_SELECT_BLOBS = (
+    "SELECT channel, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+    "AND (channel, version) IN (SELECT key, value FROM json_each(?))"
+)
+# 排序与 writes_sort_key 一致：(task_path, task_id, idx)
+_SELECT_WRITES = (
+    "SELECT task_id, channel, type, value FROM writes "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+    "ORDER BY task_path, task_id, idx"
+)
+# 沿父节点链向上逐个返回祖先 checkpoint（不含起点），调用方找到所需数据后即可停止读取
+_SELECT_ANCESTORS = """
+WITH RECURSIVE chain(checkpoint_id, parent_checkpoint_id, type, checkpoint, depth) AS (
+    SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, 0
+    FROM checkpoints
+    WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns
+      AND checkpoint_id = COALESCE(:checkpoint_id, (
+          SELECT MAX(checkpoint_id) FROM checkpoints
+          WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns
+      ))
+    UNION ALL
+    SELECT c.checkpoint_id, c.parent_checkpoint_id, c.type, c.checkpoint, chain.depth + 1
+    FROM checkpoints AS c JOIN chain
+      ON c.thread_id = :thread_id AND c.checkpoint_ns = :checkpoint_ns
+     AND c.checkpoint_id = chain.parent_checkpoint_id
+)
+SELECT checkpoint_id, type, checkpoint FROM chain WHERE depth > 0
+"""
+_STORAGE_BYTES = (
+    "SELECT (SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+    "FROM checkpoints) + (SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM blobs) "
+    "+ (SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes)"
+)
+_DELETE_THREAD = (
+    "DELETE FROM checkpoints WHERE thread_id = ?",
+    "DELETE FROM blobs WHERE thread_id = ?",
+    "DELETE FROM writes WHERE thread_id = ?",
+)
+
+# 进程退出时提交所有实例缓冲区中的写入（弱引用，不影响实例被回收）
+_instances = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for saver in list(_instances):
+        try:
+            saver.close()
+        except Exception:
+            pass
+
+
+class SQLiteSaver(BaseCheckpointSaver[str]):
+    """
+    基于 SQLite（WAL 模式）的 checkpointer，按超级步批量提交写入
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CHECKPOINT_PATH,
+        *,
+        serde=None,
+        cached_statements: int = 64,
+    ):
+        """
+        参数：
+            path: SQLite 数据库文件路径，":memory:" 表示不落盘（仅用于测试）
+            serde: 序列化器，默认与 InMemorySaver 相同（JsonPlusSerializer）
+            cached_statements: 每个连接缓存的预编译语句数
+        """
+        super().__init__(serde=serde)
+        self.path = str(path)
+        self.cached_statements = cached_statements
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        # 写连接：所有写入加锁串行执行
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        # 读连接：每个线程一个，WAL 模式下读取互不阻塞，也不阻塞写入
+        # ":memory:" 数据库不能跨连接共享，只能使用写连接读取
+        self._local = threading.local()
+        self._readers = []
+
+        # 写入缓冲区：等待与下一个 put 一起提交的 writes 行
+        self._pending_writes = []
+        self._pending_upserts = []
+
+        # 统计信息
+        self.transactions = 0
+        self.checkpoints_written = 0
+        self.writes_written = 0
+
+        _instances.add(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """
+        当前线程的只读连接
+        """
+        if self.path == ":memory:":
+            return self._conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        """
+        保存 checkpoint，并在同一个事务中提交缓冲区里该超级步的全部写入
+        """
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values = c.pop("channel_values")
+
+        blob_rows = []
+        for channel, version in new_versions.items():
+            if channel in values:
+                type_, blob = self.serde.dumps_typed(values[channel])
+            else:
+                type_, blob = "empty", None
+            blob_rows.append(
+                (thread_id, checkpoint_ns, channel, str(version), type_, blob)
+            )
+
+        type_, serialized = self.serde.dumps_typed(c)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        row = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),  # parent
+            type_,
+            serialized,
+            metadata_type,
+            serialized_metadata,
+        )
+
+        with self._lock:
+            self._commit(blob_rows=blob_rows, checkpoint_row=row)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        """
+        把任务的中间写入放入缓冲区，等到超级步结束时与 checkpoint 一起提交
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = []
+        upserts = []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, serialized = self.serde.dumps_typed(value)
+            write_row = (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                write_idx,
+                channel,
+                type_,
+                serialized,
+                task_path,
+            )
+            (rows if write_idx >= 0 else upserts).append(write_row)
+
+        with self._lock:
+            self._pending_writes.extend(rows)
+            self._pending_upserts.extend(upserts)
+
+    def _commit(self, blob_rows=(), checkpoint_row=None) -> None:
+        """
+        在一个事务中提交缓冲区中的写入以及本次的 blob / checkpoint（调用方持有写锁）
+        """
+        if not (
+            self._pending_writes or self._pending_upserts or blob_rows or checkpoint_row
+        ):
+            return
+
+        with self._conn:
+            if self._pending_writes:
+                self._conn.executemany(_INSERT_WRITE, self._pending_writes)
+            if self._pending_upserts:
+                self._conn.executemany(_UPSERT_WRITE, self._pending_upserts)
+            if blob_rows:
+                self._conn.executemany(_INSERT_BLOB, blob_rows)
+            if checkpoint_row is not None:
+                self._conn.execute(_INSERT_CHECKPOINT, checkpoint_row)
+
+        self.transactions += 1
+        self.writes_written += len(self._pending_writes) + len(self._pending_upserts)
+        self.checkpoints_written += checkpoint_row is not None
+        self._pending_writes = []
+        self._pending_upserts = []
+
+    def flush(self) -> None:
+        """
+        立即提交缓冲区中的写入
+        """
+        with self._lock:
+            self._commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        删除一个会话的全部 checkpoint、blob 与写入
+        """
+        with self._lock:
+            self._commit()
+            with self._conn:
+                for sql in _DELETE_THREAD:
+                    self._conn.execute(sql, (thread_id,))
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def _before_read(self, thread_id: str | None = None) -> sqlite3.Connection:
+        # 读取前先提交该会话在缓冲区中的写入，保证能读到刚写入的数据；
+        # 只读取其他会话时不提交，避免并发读取打断正在进行的批量写入
+        pending = self._pending_writes + self._pending_upserts
+        if pending and (
+            thread_id is None or any(row[0] == thread_id for row in pending)
+        ):
+            self.flush()
+        return self._reader()
+
+    def _load_tuple(self, conn, thread_id, checkpoint_ns, row, metadata=None):
+        """
+        由 checkpoints 表的一行组装 CheckpointTuple
+        """
+        checkpoint_id, parent_checkpoint_id, type_, serialized = row[:4]
+        checkpoint = self.serde.loads_typed((type_, serialized))
+        if metadata is None:
+            metadata = self.serde.loads_typed((row[4], row[5]))
+
+        channel_values = {}
+        versions = checkpoint["channel_versions"]
+        if versions:
+            blobs = conn.execute(
+                _SELECT_BLOBS,
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    json.dumps({k: str(v) for k, v in versions.items()}),
+                ),
+            )
+            for channel, blob_type, blob in blobs:
+                if blob_type != "empty":
+                    channel_values[channel] = self.serde.loads_typed(
+                        (blob_type, blob)
+                    )
+
+        writes = conn.execute(
+            _SELECT_WRITES, (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=metadata,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config):
+        """
+        获取指定的 checkpoint；config 中没有 checkpoint_id 时返回最新的
+        """
+        thread_id = config["configurable"]["thread_id"]
+        conn = self._before_read(thread_id)
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        if checkpoint_id := get_checkpoint_id(config):
+            row = conn.execute(
+                _SELECT_CHECKPOINT, (thread_id, checkpoint_ns, checkpoint_id)
+            ).fetchone()
+        else:
+            row = conn.execute(
+                _SELECT_LATEST_CHECKPOINT, (thread_id, checkpoint_ns)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._load_tuple(conn, thread_id, checkpoint_ns, row)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        """
+        按 checkpoint_id 从新到旧列出 checkpoint
+        """
+        conn = self._before_read(
+            config["configurable"]["thread_id"] if config is not None else None
+        )
+
+        where, params = [], []
+        if config is not None:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        sql = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY checkpoint_id DESC"
+
+        # 元数据由 serde 序列化，只能取出后在 Python 中过滤
+        for thread_id, checkpoint_ns, *row in conn.execute(sql, params).fetchall():
+            if limit is not None and limit <= 0:
+                break
+            metadata = self.serde.loads_typed((row[4], row[5]))
+            if filter and not all(
+                metadata.get(key) == value for key, value in filter.items()
+            ):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield self._load_tuple(conn, thread_id, checkpoint_ns, row, metadata)
+
+    def get_delta_channel_history(self, *, config, channels):
+        """
+        为 DeltaChannel 通道收集重放所需的写入与快照（见 common/delta_state.py）
+
+        沿父节点链只遍历一次：每个通道在最近的、保存了值的祖先处停止，
+        该值作为 seed，之后各祖先上该通道的写入按从旧到新的顺序返回
+        """
+        if not channels:
+            return {}
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        conn = self._before_read(thread_id)
+
+        collected = {channel: [] for channel in channels}
+        seeds = {}
+        remaining = set(channels)
+
+        ancestors = conn.execute(
+            _SELECT_ANCESTORS,
+            {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": get_checkpoint_id(config),
+            },
+        )
+        for checkpoint_id, type_, serialized in ancestors:
+            checkpoint = self.serde.loads_typed((type_, serialized))
+            versions = {
+                channel: str(version)
+                for channel, version in checkpoint["channel_versions"].items()
+                if channel in remaining
+            }
+
+            # 在这个祖先处保存了值（快照）的通道，到此为止
+            terminated = {}
+            if versions:
+                blobs = conn.execute(
+                    _SELECT_BLOBS, (thread_id, checkpoint_ns, json.dumps(versions))
+                )
+                for channel, blob_type, blob in blobs:
+                    if blob_type != "empty":
+                        terminated[channel] = self.serde.loads_typed((blob_type, blob))
+
+            # 该祖先上的写入产生了它的子节点，始终需要收集（包括快照所在的祖先）
+            writes = conn.execute(
+                _SELECT_WRITES, (thread_id, checkpoint_ns, checkpoint_id)
+            ).fetchall()
+            for task_id, channel, value_type, value in reversed(writes):
+                if channel in remaining:
+                    collected[channel].append(
+                        (task_id, channel, self.serde.loads_typed((value_type, value)))
+                    )
+
+            seeds.update(terminated)
+            remaining.difference_update(terminated)
+            if not remaining:
+                break
+
+        result = {}
+        for channel in channels:
+            entry = {"writes": list(reversed(collected[channel]))}
+            if channel in seeds:
+                entry["seed"] = seeds[channel]
+            result[channel] = entry
+        return result
+
+    # ------------------------------------------------------------------
+    # 异步接口：本地 SQLite 操作很快，直接调用同步实现
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    async def aget_delta_channel_history(self, *, config, channels):
+        return self.get_delta_channel_history(config=config, channels=channels)
+
+    def get_next_version(self, current, channel) -> str:
+        # 与 InMemorySaver 相同的版本格式：递增的整数部分 + 随机小数部分
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ------------------------------------------------------------------
+    # 生命周期与统计
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """
+        提交缓冲区并关闭所有连接
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            self._commit()
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._conn.close()
+            self._conn = None
+        _instances.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def storage_bytes(self) -> int:
+        """
+        数据库中保存的序列化数据总字节数（checkpoint、通道值与中间写入）
+        """
+        conn = self._before_read()
+        return conn.execute(_STORAGE_BYTES).fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：提交的事务数、写入的 checkpoint 数与中间写入数
+        """
+        return {
+            "transactions": self.transactions,
+            "checkpoints": self.checkpoints_written,
+            "writes": self.writes_written,
+        }
+
+
+def create_checkpointer(kind: str | None = None, **kwargs):
+    """
+    创建 checkpointer
+
+    参数：
+        kind: "memory"（InMemorySaver）、"bounded"（BoundedInMemorySaver）
+              或 "sqlite"（SQLiteSaver），不传时读取环境变量 CHECKPOINTER，默认 "memory"
+        **kwargs: 传给 checkpointer 构造函数的参数，如 SQLiteSaver 的 path
+
+    设置环境变量 CHECKPOINT_SERDE=compact 且没有传入 serde 时，
+    使用紧凑的二进制序列化器（见 common/compact_serde.py）
+    """
+    kind = (kind or os.getenv("CHECKPOINTER") or "memory").lower()
+    serde_kind = os.getenv("CHECKPOINT_SERDE", "").lower()
+    if "serde" not in kwargs and serde_kind == "compact":
+        from common.compact_serde import CompactSerializer
+
+        kwargs["serde"] = CompactSerializer()
+    if kind == "memory":
+        return InMemorySaver(**kwargs)
+    if kind == "bounded":
+        from common.bounded_checkpointer import BoundedInMemorySaver
+
+        return BoundedInMemorySaver(**kwargs)
+    if kind == "sqlite":
+        return SQLiteSaver(**kwargs)
+    raise ValueError(f"未知的 checkpointer 类型：{kind}，可选：memory、bounded、sqlite")
@@ -0,0 +1,234 @@
+"""
+公共模块：checkpoint 的紧凑二进制序列化
+==============================================
+
+checkpointer 默认使用 JsonPlusSerializer（msgpack）序列化状态，消息对象被编码为：
+(模块路径, 类名, model_dump() 得到的完整字段字典, 反序列化方法名)
+- 每条消息都重复保存 "langchain_core.messages.ai"、"AIMessage" 以及全部字段名
+- 值为默认值的字段（空的 additional_kwargs、tool_calls 等）也照样保存
+- 短消息的编码中，这些重复内容往往比消息正文还长
+
+本模块提供 CompactSerializer（JsonPlusSerializer 的子类）：
+1. 消息类与字段名驻留（interning）：用固定的小整数编号代替类路径和字段名
+2. 只保存与默认值不同的字段
+3. 可选 zstd 压缩：超过阈值的数据用预置字典压缩，字典中包含常见字段名与元数据键，
+   短数据也能获得不错的压缩率
+4. 其他类型（Send、pydantic 模型、日期等）仍交给 JsonPlusSerializer 处理，
+   旧格式（"msgpack"）的数据也能正常读取
+
+使用方法：
+
+from common.compact_serde import CompactSerializer
+
+checkpointer = InMemorySaver(serde=CompactSerializer())
+checkpointer = SQLiteSaver(serde=CompactSerializer(compress=False))
+
+注意：
+- _MESSAGE_CLASSES、_FIELDS 与 _ZSTD_DICTIONARY 决定了已保存数据的含义，
+  只能在末尾追加，不能修改或删除已有条目
+"""
+
+import threading
+
+import ormsgpack
+from langchain_core import messages
+from langgraph.checkpoint.serde.jsonplus import (
+    EXT_DELTA_SNAPSHOT,
+    JsonPlusSerializer,
+    _msgpack_default,
+    _option,
+)
+from langgraph.checkpoint.serde.types import _DeltaSnapshot
+
+try:
+    import zstandard
+except ImportError:  # 未安装时不压缩
+    zstandard = None
+
+
+# 自定义的 msgpack 扩展类型编号（JsonPlusSerializer 使用 0 ~ 7）
+EXT_COMPACT_MESSAGE = 32
+
+# 消息类编号：只能在末尾追加
+_MESSAGE_CLASSES = (
+    messages.HumanMessage,
+    messages.AIMessage,
+    messages.ToolMessage,
+    messages.SystemMessage,
+    messages.RemoveMessage,
+    messages.ChatMessage,
+    messages.FunctionMessage,
+    messages.AIMessageChunk,
+    messages.HumanMessageChunk,
+    messages.ToolMessageChunk,
+    messages.SystemMessageChunk,
+)
+
+# 字段名编号：只能在末尾追加；不在表中的字段按字段名保存
+_FIELDS = (
+    "content",
+    "additional_kwargs",
+    "response_metadata",
+    "name",
+    "id",
+    "tool_calls",
+    "invalid_tool_calls",
+    "usage_metadata",
+    "tool_call_id",
+    "artifact",
+    "status",
+    "role",
+    "tool_call_chunks",
+    "chunk_position",
+)
+
+# zstd 预置字典：消息中反复出现的键与取值（版本 1，只能新增版本，不能修改）
+_ZSTD_DICTIONARY = (
+    b"token_usage completion_tokens prompt_tokens total_tokens "
+    b"completion_tokens_details prompt_tokens_details cached_tokens "
+    b"reasoning_tokens audio_tokens accepted_prediction_tokens "
+    b"rejected_prediction_tokens model_name model_provider system_fingerprint "
+    b"finish_reason stop tool_calls logprobs openai qwen-plus "
+    b"input_tokens output_tokens input_token_details output_token_details "
+    b"cache_read reasoning name args id type tool_call function arguments "
+    b"refusal success error messages jump_to structured_response "
+    b"channel_versions versions_seen updated_channels "
+    b"branch:to:model branch:to:tools __start__ __input__ model tools "
+    b"source loop input step parents run_id thread_id checkpoint_ns "
+    b"lc_run-- run- call_ chatcmpl- "
+)
+_ZSTD_TYPE = "cmsgpack+zstd1"
+
+
+def _class_fields(cls) -> tuple:
+    """
+    消息类需要保存的字段及其默认值：(字段名, 编码后的键, 默认值)
+    """
+    fields = []
+    for name, info in cls.model_fields.items():
+        if name == "type":  # 由消息类决定，不需要保存
+            continue
+        key = _FIELDS.index(name) if name in _FIELDS else name
+        fields.append((name, key, info.get_default(call_default_factory=True)))
+    return tuple(fields)
+
+
+_CLASS_CODES = {cls: code for code, cls in enumerate(_MESSAGE_CLASSES)}
+_CLASS_FIELDS = {cls: _class_fields(cls) for cls in _MESSAGE_CLASSES}
+
+
+class CompactSerializer(JsonPlusSerializer):
+    """
+    消息驻留编码 + 可选 zstd 压缩的序列化器，兼容读取 JsonPlusSerializer 的数据
+    """
+
+    def __init__(
+        self,
+        *,
+        compress: bool = True,
+        compress_threshold: int = 256,
+        level: int = 3,
+        **kwargs,
+    ):
+        """
+        参数：
+            compress: 是否启用 zstd 压缩（未安装 zstandard 时自动关闭）
+            compress_threshold: 编码结果达到多少字节才压缩，太短的数据压缩收益很小
+            level: zstd 压缩级别
+            **kwargs: 传给 JsonPlusSerializer 的参数
+        """
+        super().__init__(**kwargs)
+        self.compress = compress and zstandard is not None
+        self.compress_threshold = compress_threshold
+        self.level = level
+
+        # zstd 压缩器 / 解压器不是线程安全的，每个线程使用自己的实例
+        self._local = threading.local()
+        self._dictionary = None
+        if zstandard is not None:
+            self._dictionary = zstandard.ZstdCompressionDict(
+                _ZSTD_DICTIONARY, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+            )
+
+    def _compressor(self):
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(
+                level=self.level, dict_data=self._dictionary
+            )
+            self._local.compressor = compressor
+        return compressor
+
+    def _decompressor(self):
+        if self._dictionary is None:
+            raise RuntimeError("读取压缩的 checkpoint 需要安装 zstandard")
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionary)
+            self._local.decompressor = decompressor
+        return decompressor
+
+    # ------------------------------------------------------------------
+    # 编码
+    # ------------------------------------------------------------------
+
+    def _pack(self, obj) -> bytes:
+        return ormsgpack.packb(obj, default=self._default, option=_option)
+
+    def _default(self, obj):
+        cls = type(obj)
+        code = _CLASS_CODES.get(cls)
+        if code is not None:
+            fields = {}
+            for name, key, default in _CLASS_FIELDS[cls]:
+                value = getattr(obj, name)
+                if value != default:
+                    fields[key] = value
+            # 消息模型允许额外字段（AIMessage("x", foo=1)）：按字段名保存，读取时原样传回
+            if obj.model_extra:
+                fields.update(obj.model_extra)
+            return ormsgpack.Ext(EXT_COMPACT_MESSAGE, self._pack((code, fields)))
+        if isinstance(obj, _DeltaSnapshot):
+            # 快照中保存的是完整的消息列表，同样使用紧凑编码
+            return ormsgpack.Ext(EXT_DELTA_SNAPSHOT, self._pack(obj.value))
+        return _msgpack_default(obj)
+
+    def dumps_typed(self, obj):
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return super().dumps_typed(obj)
+
+        data = self._pack(obj)
+        if self.compress and len(data) >= self.compress_threshold:
+            return _ZSTD_TYPE, self._compressor().compress(data)
+        return "cmsgpack", data
+
+    # ------------------------------------------------------------------
+    # 解码
+    # ------------------------------------------------------------------
+
+    def _ext_hook(self, code: int, data: bytes):
+        if code == EXT_COMPACT_MESSAGE:
+            class_code, fields = self._unpack(data)
+            cls = _MESSAGE_CLASSES[class_code]
+            return cls(
+                **{
+                    (_FIELDS[key] if isinstance(key, int) else key): value
+                    for key, value in fields.items()
+                }
+            )
+        if code == EXT_DELTA_SNAPSHOT:
+            return _DeltaSnapshot(self._unpack(data))
+        return self._unpack_ext_hook(code, data)
+
+    def _unpack(self, data: bytes):
+        return ormsgpack.unpackb(
+            data, ext_hook=self._ext_hook, option=ormsgpack.OPT_NON_STR_KEYS
+        )
+
+    def loads_typed(self, data):
+        type_, payload = data
+        if type_ == "cmsgpack":
+            return self._unpack(payload)
+        if type_ == _ZSTD_TYPE:
+            return self._unpack(self._decompressor().decompress(payload))
+        return super().loads_typed(data)
@@ -0,0 +1,185 @@
+"""
+公共模块：增量维护的对话上下文窗口（滑动窗口）
+==============================================
+
+每轮对话都用列表推导 / 切片或 trim_messages 修剪完整历史：
+- 每轮都要重新遍历全部消息，把 system 消息和对话消息分开再拼接
+- trim_messages 每次调用都会对完整历史重新计数（二分查找时还会对前缀反复计数）
+- 历史越长，每轮的修剪开销越大，整段对话的总开销随轮数平方增长
+
+本模块提供 ContextWindow：
+1. 对话消息保存在 deque 中，同时维护窗口内的 token 总数与轮数（增量更新）
+2. system 消息固定保留（pinned），不参与淘汰
+3. 追加消息时只计数这一条消息；超过上限时从最旧的一端逐条淘汰，
+   每条消息最多被追加、淘汰各一次，追加 + 修剪的均摊开销为 O(1)
+4. 淘汰后窗口总是从用户消息开始，不会留下缺少开头的一轮（如孤立的工具结果）
+
+使用方法：
+
+from common.context_window import ContextWindow
+
+window = ContextWindow(max_tokens=2000, max_turns=10)
+window.append({"role": "system", "content": "你是一个友好的助手。"})
+
+window.append({"role": "user", "content": question})
+response = model.invoke(window.messages())
+window.append(response)
+
+注意：
+- 支持消息对象与 {"role": ..., "content": ...} 字典，messages() 按原样返回
+- 设置 trim_to 时，窗口开头只在淘汰时变化（几轮一次），其余轮次只在末尾追加消息
+- 单轮消息本身就超过 max_tokens 时，窗口只保留这一轮的最后一条用户消息起的内容
+"""
+
+import threading
+from collections import deque
+
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import convert_to_messages
+
+from common.token_counter import get_token_counter
+
+
+def _to_message(message) -> BaseMessage:
+    """
+    字典 / 元组等形式的消息转换为消息对象（只用于判断类型与计数）
+    """
+    if isinstance(message, BaseMessage):
+        return message
+    return convert_to_messages([message])[0]
+
+
+class ContextWindow:
+    """
+    固定保留 system 消息、按 token 数 / 轮数限制最近对话的滑动窗口（线程安全）
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        max_turns: int | None = None,
+        token_counter=None,
+        trim_to: int | None = None,
+    ):
+        """
+        参数：
+            max_tokens: 窗口（含 system 消息）的 token 数上限，None 表示不限制
+            max_turns: 最多保留多少轮对话（每条用户消息开始新的一轮，含当前这一轮），
+                None 表示不限制
+            token_counter: 单条消息的计数函数，默认使用 get_token_counter()
+            trim_to: 超过 max_tokens 时一次淘汰到 trim_to 以下（而不是刚好低于 max_tokens），
+                窗口开头几轮才变化一次，有利于服务端的前缀缓存；None 表示不启用
+        """
+        self.max_tokens = max_tokens
+        self.max_turns = max_turns
+        self.trim_to = trim_to
+        if token_counter is None:
+            token_counter = get_token_counter().count_message
+        self.token_counter = token_counter
+
+        self._pinned = []  # system 消息
+        self._window = deque()  # (原始消息, 是否为用户消息, token 数)
+        self._lock = threading.Lock()
+
+        # 增量维护的汇总值
+        self.pinned_tokens = 0
+        self.window_tokens = 0
+        self.turns = 0
+
+        # 统计信息
+        self.appended = 0
+        self.evicted = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """
+        窗口内全部消息（含 system 消息）的 token 数
+        """
+        return self.pinned_tokens + self.window_tokens
+
+    def append(self, message) -> None:
+        """
+        追加一条消息，并淘汰超出上限的旧消息
+        """
+        converted = _to_message(message)
+        tokens = self.token_counter(converted)
+
+        with self._lock:
+            self.appended += 1
+            if converted.type == "system":
+                self._pinned.append(message)
+                self.pinned_tokens += tokens
+            else:
+                is_human = converted.type == "human"
+                self._window.append((message, is_human, tokens))
+                self.window_tokens += tokens
+                self.turns += is_human
+            self._trim()
+
+    def extend(self, messages) -> None:
+        """
+        依次追加多条消息
+        """
+        for message in messages:
+            self.append(message)
+
+    def _trim(self) -> None:
+        """
+        从最旧的一端淘汰消息，直到满足上限且窗口从用户消息开始（调用方持有锁）
+        """
+        window = self._window
+        aligning = False  # 淘汰了一条用户消息后，这一轮剩余的消息也要一并淘汰
+        token_limit = self.max_tokens
+        while window:
+            _message, is_human, tokens = window[0]
+            over_tokens = token_limit is not None and self.total_tokens > token_limit
+            if over_tokens and self.trim_to is not None:
+                token_limit = self.trim_to  # 一旦需要淘汰，就一次淘汰到 trim_to 以下
+                over_tokens = self.total_tokens > token_limit
+            over = over_tokens or (
+                self.max_turns is not None and self.turns > self.max_turns
+            )
+            if is_human:
+                # 只剩最后一轮时不再淘汰，保证当前问题总在窗口中
+                if not over or self.turns <= 1:
+                    return
+                self.turns -= 1
+                aligning = True
+            elif not over and not aligning:
+                return
+            window.popleft()
+            self.window_tokens -= tokens
+            self.evicted += 1
+
+    def messages(self) -> list:
+        """
+        当前窗口的消息：system 消息 + 最近的对话
+        """
+        with self._lock:
+            return self._pinned + [message for message, _human, _tokens in self._window]
+
+    def clear(self) -> None:
+        """
+        清空窗口（包括 system 消息）与统计
+        """
+        with self._lock:
+            self._pinned.clear()
+            self._window.clear()
+            self.pinned_tokens = self.window_tokens = self.turns = 0
+            self.appended = self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._window)
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：窗口内的消息数、轮数、token 数，累计追加 / 淘汰的消息数
+        """
+        with self._lock:
+            return {
+                "messages": len(self._pinned) + len(self._window),
+                "turns": self.turns,
+                "tokens": self.total_tokens,
+                "appended": self.appended,
+                "evicted": self.evicted,
+            }
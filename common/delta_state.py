@@ -0,0 +1,105 @@
+"""
+公共模块：增量保存消息历史的 Agent 状态
+==============================================
+
+create_agent 默认的状态中，messages 通道使用 add_messages 合并消息，
+每个 checkpoint 都会把**完整的**消息列表序列化保存一次：
+- 第 n 步的 checkpoint 保存 n 条消息，整个会话共保存 1 + 2 + ... + n ≈ n²/2 条
+- 长会话（如客服对话）中，checkpointer 的内存 / 磁盘占用随轮数平方增长
+
+本模块把 messages 通道换成 LangGraph 的 DeltaChannel：
+1. 普通的 checkpoint 不再保存消息列表，只保存这一步新增 / 修改的消息（即各节点的写入）
+2. 读取状态时，从最近的完整快照开始，按顺序重放之后每一步的写入，还原出完整的消息列表
+3. 每 snapshot_frequency 次更新保存一次完整快照，限制重放的步数
+
+使用方法：
+
+from common.delta_state import DeltaAgentState, checkpoint_storage_bytes
+
+agent = create_agent(
+    model=model,
+    tools=[],
+    checkpointer=InMemorySaver(),
+    state_schema=DeltaAgentState,  # 只替换状态结构，其余用法不变
+)
+
+print(checkpoint_storage_bytes(agent.checkpointer))
+
+注意：
+- DeltaChannel 目前是 LangGraph 的 Beta 功能，存储格式可能在后续版本中变化
+- 读取历史 checkpoint 需要沿父节点链重放写入，快照间隔越大，读取越慢、占用越小
+"""
+
+from functools import lru_cache, reduce
+from typing import Annotated
+
+from langchain.agents import AgentState
+from langchain_core.messages import AnyMessage
+from langgraph.channels import DeltaChannel
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph.message import add_messages
+from typing_extensions import Required
+
+
+# 默认每 50 次更新保存一次完整快照（客服对话每轮约 2 ~ 4 次更新）
+DEFAULT_SNAPSHOT_FREQUENCY = 50
+
+
+def add_messages_batch(messages: list, updates: list) -> list:
+    """
+    DeltaChannel 的合并函数：依次把每一批写入用 add_messages 合并到消息列表
+
+    逐批合并保证了分批重放与一次性重放的结果相同：
+    f(f(s, xs), ys) == f(s, xs + ys)
+    """
+    return reduce(add_messages, updates, messages)
+
+
+@lru_cache(maxsize=None)
+def delta_state_schema(snapshot_frequency: int = DEFAULT_SNAPSHOT_FREQUENCY) -> type:
+    """
+    创建 messages 通道增量保存的状态结构
+
+    相同的 snapshot_frequency 返回同一个类，可以命中 Agent 复用池
+
+    参数：
+        snapshot_frequency: 每多少次更新保存一次完整的消息列表快照
+    """
+
+    class DeltaAgentState(AgentState):
+        messages: Required[
+            Annotated[
+                list[AnyMessage],
+                DeltaChannel(add_messages_batch, snapshot_frequency=snapshot_frequency),
+            ]
+        ]
+
+    return DeltaAgentState
+
+
+# 默认快照间隔的状态结构
+DeltaAgentState = delta_state_schema()
+
+
+def checkpoint_storage_bytes(saver) -> int:
+    """
+    统计 checkpointer 中保存的序列化数据总字节数（checkpoint、通道值与中间写入）
+
+    支持 InMemorySaver 以及提供 storage_bytes() 方法的 checkpointer（如 SQLiteSaver）
+    """
+    if hasattr(saver, "storage_bytes"):
+        return saver.storage_bytes()
+    if not isinstance(saver, InMemorySaver):
+        raise TypeError(f"不支持统计 {type(saver).__name__} 的存储大小")
+
+    total = 0
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            for checkpoint, metadata, _parent in checkpoints.values():
+                total += len(checkpoint[1]) + len(metadata[1])
+    for _type, blob in saver.blobs.values():
+        total += len(blob)
+    for writes in saver.writes.values():
+        for _task_id, _channel, (_type, value), _path in writes.values():
+            total += len(value)
+    return total
@@ -0,0 +1,166 @@
+"""
+公共模块：多模型并发对比
+==============================================
+
+把同一个提示词并发发送给多个模型，统计每个模型的：
+- latency: 总耗时
+- ttft: 首 token 时间（time to first token）
+- tokens/sec: 输出速度
+
+串行对比 N 个模型的耗时是 sum(latency)，
+并发对比（asyncio.gather）的耗时约等于 max(latency)。
+
+使用方法：
+
+import asyncio
+from common.model_compare import compare_models, print_comparison
+
+results, wall_time = asyncio.run(
+    compare_models("用一句话解释什么是智能体", ["qwen-plus", "qwen-turbo"])
+)
+print_comparison(results, wall_time)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from common.model_factory import get_chat_model
+from common.streaming import astream_print
+
+
+@dataclass
+class ModelRunResult:
+    """
+    单个模型的一次调用结果
+    """
+
+    model_name: str
+    content: str = ""
+    latency: float = 0.0  # 总耗时（秒）
+    ttft: float | None = None  # 首 token 时间（秒）
+    output_tokens: int = 0  # 输出 token 数
+    error: str | None = None
+
+    @property
+    def tokens_per_second(self) -> float:
+        """
+        输出速度：首 token 之后的生成阶段，每秒输出多少 token
+        """
+        if self.ttft is None or self.output_tokens == 0:
+            return 0.0
+        generation_time = self.latency - self.ttft
+        if generation_time <= 0:
+            return 0.0
+        return self.output_tokens / generation_time
+
+
+def build_model(model_name: str, **kwargs):
+    """
+    根据模型名称创建模型
+
+    参数：
+        model_name: 模型名称
+            - "qwen-plus"：走 Qwen 的 OpenAI 兼容端点
+            - "groq:llama-3.3-70b-versatile"：带厂商前缀，交给 init_chat_model 推断厂商
+        **kwargs: 其余传给 get_chat_model 的参数
+
+    返回：
+        BaseChatModel 实例
+    """
+    if ":" in model_name:
+        return get_chat_model(model=model_name, model_provider=None, **kwargs)
+    return get_chat_model(model=model_name, **kwargs)
+
+
+async def run_model(model_name: str, model, prompt) -> ModelRunResult:
+    """
+    用 astream 调用单个模型，记录首 token 时间、总耗时和输出 token 数
+
+    参数：
+        model_name: 模型名称（用于展示）
+        model: 模型实例
+        prompt: 提示词（字符串或消息列表）
+
+    返回：
+        ModelRunResult
+    """
+    result = ModelRunResult(model_name=model_name)
+    start = time.perf_counter()
+
+    try:
+        stats = await astream_print(model, prompt, echo=False)
+        result.latency = stats.total_time
+        result.ttft = stats.ttft
+
+        if stats.message is not None:
+            result.content = stats.message.content
+            # 优先使用模型返回的 token 统计，否则用输出块数近似
+            usage = stats.message.usage_metadata
+            if usage and usage.get("output_tokens"):
+                result.output_tokens = usage["output_tokens"]
+            else:
+                result.output_tokens = stats.chunks
+
+    except Exception as e:
+        result.latency = time.perf_counter() - start
+        result.error = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+async def compare_models(prompt, model_names: list[str], **kwargs):
+    """
+    把同一个提示词并发发送给多个模型
+
+    参数：
+        prompt: 提示词（字符串或消息列表）
+        model_names: 模型名称列表，每个名称创建一个独立的模型
+        **kwargs: 其余传给 get_chat_model 的参数，如 temperature
+
+    返回：
+        (结果列表（与 model_names 顺序一致）, 总耗时（秒）)
+    """
+    tasks = []
+    results = [None] * len(model_names)
+
+    for i, model_name in enumerate(model_names):
+        try:
+            model = build_model(model_name, **kwargs)
+        except Exception as e:
+            # 模型创建失败（如缺少厂商集成包、缺少 API Key）不影响其他模型
+            results[i] = ModelRunResult(
+                model_name=model_name, error=f"{type(e).__name__}: {e}"
+            )
+            continue
+        tasks.append((i, run_model(model_name, model, prompt)))
+
+    start = time.perf_counter()
+    outputs = await asyncio.gather(*(task for _, task in tasks))
+    wall_time = time.perf_counter() - start
+
+    for (i, _), output in zip(tasks, outputs):
+        results[i] = output
+
+    return results, wall_time
+
+
+def print_comparison(results: list[ModelRunResult], wall_time: float):
+    """
+    打印对比结果
+    """
+    for r in results:
+        print(f"\n使用模型：{r.model_name}")
+        print("=" * 40)
+        if r.error:
+            print(f"模型 {r.model_name} 调用失败：{r.error}")
+            continue
+        print(f"回复：{r.content}")
+        print(
+            f"总耗时：{r.latency:.2f}s | 首 token：{r.ttft or 0:.2f}s | "
+            f"输出 tokens：{r.output_tokens} | 速度：{r.tokens_per_second:.1f} tokens/s"
+        )
+
+    serial_time = sum(r.latency for r in results)
+    print("\n" + "=" * 40)
+    print(f"并发总耗时：{wall_time:.2f}s（串行约需 {serial_time:.2f}s）")
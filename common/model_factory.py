@@ -0,0 +1,150 @@
+"""
+公共模块：模型工厂（延迟初始化 + 按配置缓存）
+==============================================
+
+各章节示例原本在 import 阶段就执行 load_dotenv() 和 init_chat_model(...)，
+仅仅导入模块就要付出创建模型客户端的全部开销。
+
+本模块提供统一的模型工厂：
+1. load_qwen_config - 第一次需要时才加载并校验环境变量
+2. get_chat_model   - 第一次使用时才创建模型，并按配置缓存复用
+3. 同一配置的模型只创建一次，底层 HTTP 客户端也随之复用
+4. 设置环境变量 MODEL_RESPONSE_CACHE=1 时，默认为模型开启本地响应缓存
+   （见 common/response_cache.py，适合反复重放相同提示词的回归测试）
+
+使用方法：
+
+from common.model_factory import get_chat_model
+
+model = get_chat_model()                   # 默认 qwen-plus, temperature=0.8
+model_0 = get_chat_model(temperature=0.0)  # 不同配置会得到不同的缓存项
+"""
+
+import os
+import threading
+from functools import lru_cache
+
+
+# 缓存：配置键 -> 已创建的模型实例
+# 键为 (model, model_provider, base_url, temperature, 其余参数)
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_qwen_config() -> tuple[str, str]:
+    """
+    加载并校验 Qwen 的 API Key 与 Base URL（只在第一次调用时执行）
+
+    返回：
+        (QWEN_API_KEY, QWEN_BASE_URL)
+    """
+    # 延迟导入：只有真正需要模型时才加载 dotenv
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    qwen_api_key = os.getenv("QWEN_API_KEY")
+    qwen_base_url = os.getenv("QWEN_BASE_URL")
+
+    # 校验配置，提前中断程序，避免模型初始化阶段出现难以定位的鉴权错误
+    if not qwen_api_key or qwen_api_key == "your_qwen_api_key_here":
+        raise ValueError(
+            "\n请先在 .env 文件中设置有效的 QWEN_API_KEY\n"
+            "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费密钥"
+        )
+
+    if not qwen_base_url or qwen_base_url == "your_qwen_base_url_here":
+        raise ValueError(
+            "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL\n"
+            "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
+        )
+
+    return qwen_api_key, qwen_base_url
+
+
+def _freeze(value):
+    """
+    把参数值转换为可哈希的形式，用于组成缓存键
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def get_chat_model(
+    model: str = "qwen-plus",
+    model_provider: str | None = "openai",
+    base_url: str | None = None,
+    temperature: float | None = 0.8,
+    **kwargs,
+):
+    """
+    获取（必要时创建）一个配置好的聊天模型
+
+    参数：
+        model: 模型名称，也支持 "groq:llama-3.3-70b-versatile" 这种带厂商前缀的写法
+        model_provider: 模型厂商（协议），默认 "openai"（Qwen 走 OpenAI 兼容协议）
+        base_url: 模型服务地址；走 openai 协议且未指定时，自动使用 QWEN_BASE_URL
+        temperature: 采样温度
+        **kwargs: 其余传给 init_chat_model 的参数，如 max_tokens、cache
+
+    返回：
+        BaseChatModel 实例（相同配置返回同一个实例）
+    """
+    # 未指定地址的 openai 协议模型，默认指向 Qwen 的 OpenAI 兼容端点
+    if model_provider == "openai" and base_url is None:
+        api_key, base_url = load_qwen_config()
+        kwargs.setdefault("api_key", api_key)
+
+    # 回归测试模式：未显式指定 cache 时，统一使用本地响应缓存
+    if "cache" not in kwargs and os.getenv("MODEL_RESPONSE_CACHE") == "1":
+        from common.response_cache import get_response_cache
+
+        kwargs["cache"] = get_response_cache()
+
+    key = (model, model_provider, base_url, temperature, _freeze(kwargs))
+
+    # 加锁：多个线程同时请求同一配置时，只创建一次
+    with _model_cache_lock:
+        cached = _model_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 延迟导入：import 本模块时不加载厂商 SDK
+        from langchain.chat_models import init_chat_model
+
+        if base_url is not None:
+            kwargs["base_url"] = base_url
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+
+        chat_model = init_chat_model(
+            model=model,
+            model_provider=model_provider,
+            **kwargs,
+        )
+        _model_cache[key] = chat_model
+        return chat_model
+
+
+def clear_model_cache():
+    """
+    清空模型缓存（例如修改 .env 后需要重新创建模型）
+    """
+    with _model_cache_lock:
+        _model_cache.clear()
+    load_qwen_config.cache_clear()
+
+
+def model_cache_size() -> int:
+    """
+    返回当前缓存的模型数量
+    """
+    with _model_cache_lock:
+        return len(_model_cache)
@@ -0,0 +1,202 @@
+"""
+公共模块：提示词前缀复用率统计（服务端前缀缓存 / KV 缓存）
+==============================================
+
+qwen-plus 等模型服务会缓存请求的前缀（KV 缓存）：
+这一次请求的开头与之前的请求完全相同时，相同的部分计费更低、首 token 更快。
+但只要前缀中有一个字节不同，之后的内容全部无法复用：
+- 修剪消息时从开头删除旧消息：从 system 提示词之后就不同了
+- 每次摘要都重写整段摘要：摘要之后的内容全部无法复用
+
+本模块统计每次请求能复用上一次请求多少前缀：
+1. 把请求按顺序拆成若干段：system 提示词、工具定义、每一条消息
+2. 与同一个会话的上一次请求逐段比较：完全相同的段计入复用；
+   第一段不同的内容按相同前缀的字符比例计入（例如只在末尾追加了内容的摘要）
+3. 复用率 = 复用的 token 数 / 本次请求的 token 数
+
+- PrefixReuseTracker：手动组装消息时使用，observe(messages) 返回本次的复用情况
+- PrefixReuseMiddleware：create_agent 时使用，记录 Agent 每次调用模型的请求
+
+使用方法：
+
+from common.prefix_cache import PrefixReuseMiddleware
+
+monitor = PrefixReuseMiddleware()
+agent = create_agent(model=model, tools=[], middleware=[..., monitor])  # 放在最后
+agent.invoke(..., config={"configurable": {"thread_id": "user_1"}})
+for record in monitor.history("user_1"):
+    print(record)  # {"prompt_tokens": ..., "reused_tokens": ..., "ratio": ...}
+
+注意：
+- 统计的是「复用潜力」：服务端通常按固定大小的 token 块缓存，且有最短前缀、过期时间等限制，
+  实际命中以响应中的 cached_tokens 为准
+"""
+
+import json
+import threading
+from collections import OrderedDict, deque
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages.utils import convert_to_messages
+
+from common.background_summary import _thread_key
+from common.token_counter import _message_text, get_token_counter
+from common.tool_schema import tool_schemas
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class PrefixReuseTracker:
+    """
+    按会话记录每次请求与上一次请求的前缀复用情况（线程安全）
+    """
+
+    def __init__(
+        self, token_counter=None, max_threads: int = 1000, max_history: int = 1000
+    ):
+        """
+        参数：
+            token_counter: TokenCounter 实例，默认使用 get_token_counter()
+            max_threads: 最多记录多少个会话（LRU 淘汰）
+            max_history: 每个会话最多保留多少条记录
+        """
+        self.token_counter = token_counter or get_token_counter()
+        self.max_threads = max_threads
+        self.max_history = max_history
+
+        # 会话 -> (上一次请求的各段, 历史记录)
+        self._threads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _segments(self, messages, system=None, tools=None) -> list[tuple[str, int]]:
+        """
+        把请求拆成 (文本, token 数) 的列表
+        """
+        segments = []
+        if system:
+            segments.append((f"system:{system}", self.token_counter.count_text(system)))
+        if tools:
+            text = json.dumps(tool_schemas(tools), ensure_ascii=False, sort_keys=True)
+            segments.append((f"tools:{text}", self.token_counter.count_text(text)))
+        for message in convert_to_messages(messages):
+            segments.append(
+                (
+                    f"{message.type}:{message.name or ''}:{_message_text(message)}",
+                    self.token_counter.count_message(message),
+                )
+            )
+        return segments
+
+    def observe(
+        self, messages, *, system: str | None = None, tools=None, key=None
+    ) -> dict:
+        """
+        记录一次请求，返回 {"prompt_tokens", "reused_tokens", "ratio"}
+
+        参数：
+            messages: 发给模型的消息列表（消息对象或 {"role": ..., "content": ...} 字典）
+            system: 单独传入的 system 提示词（create_agent 的 system_prompt）
+            tools: 绑定的工具
+            key: 会话标识，如 thread_id
+        """
+        segments = self._segments(messages, system, tools)
+        prompt_tokens = sum(tokens for _text, tokens in segments)
+
+        with self._lock:
+            entry = self._threads.get(key)
+            if entry is None:
+                entry = self._threads[key] = [[], deque(maxlen=self.max_history)]
+            self._threads.move_to_end(key)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+            previous, history = entry
+            entry[0] = segments
+
+        reused_tokens = 0
+        for (text, tokens), (previous_text, _) in zip(segments, previous):
+            if text == previous_text:
+                reused_tokens += tokens
+                continue
+            # 第一段不同的内容：按相同前缀的字符比例估算
+            common = _common_prefix_length(text, previous_text)
+            reused_tokens += tokens * common // max(len(text), 1)
+            break
+
+        record = {
+            "prompt_tokens": prompt_tokens,
+            "reused_tokens": reused_tokens,
+            "ratio": reused_tokens / prompt_tokens if prompt_tokens else 0.0,
+        }
+        with self._lock:
+            history.append(record)
+        return record
+
+    def history(self, key=None) -> list[dict]:
+        """
+        某个会话每次请求的复用记录
+        """
+        with self._lock:
+            entry = self._threads.get(key)
+            return list(entry[1]) if entry is not None else []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._threads.clear()
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：全部会话的请求数、token 总数、复用的 token 数与整体复用率
+        """
+        with self._lock:
+            records = [
+                record for _, history in self._threads.values() for record in history
+            ]
+        prompt_tokens = sum(record["prompt_tokens"] for record in records)
+        reused_tokens = sum(record["reused_tokens"] for record in records)
+        return {
+            "requests": len(records),
+            "prompt_tokens": prompt_tokens,
+            "reused_tokens": reused_tokens,
+            "ratio": round(reused_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+        }
+
+
+class PrefixReuseMiddleware(AgentMiddleware):
+    """
+    记录 Agent 每次调用模型时的前缀复用率（按 thread_id 区分会话）
+
+    - 只观察请求，不修改请求
+    - 应放在中间件列表的最后：记录的是其他中间件修改之后、真正发给模型的请求
+    """
+
+    def __init__(self, tracker: PrefixReuseTracker | None = None):
+        super().__init__()
+        self.tracker = tracker or PrefixReuseTracker()
+
+    def _observe(self, request) -> None:
+        self.tracker.observe(
+            request.messages,
+            system=request.system_prompt,
+            tools=request.tools,
+            key=_thread_key(),
+        )
+
+    def wrap_model_call(self, request, handler):
+        self._observe(request)
+        return handler(request)
+
+    async def awrap_model_call(self, request, handler):
+        self._observe(request)
+        return await handler(request)
+
+    def history(self, thread_id=None) -> list[dict]:
+        return self.tracker.history(thread_id)
+
+    def stats(self) -> dict:
+        return self.tracker.stats()
@@ -0,0 +1,270 @@
+"""
+公共模块：模型响应的本地持久化缓存（SQLite）
+==============================================
+
+回归测试会反复重放同样的提示词，每次 model.invoke 都要请求一次 qwen-plus。
+本模块实现 LangChain 的 BaseCache 接口，把模型响应缓存到本地 SQLite 文件：
+
+1. 内容寻址：键 = sha256(规范化后的消息 + 模型参数)
+   - LangChain 会先去掉消息 id 再序列化消息（prompt）
+   - 模型参数（model、temperature、max_tokens 等）序列化为 llm_string
+2. TTL 过期：超过 ttl_seconds 的缓存视为未命中并删除
+3. LRU 淘汰：缓存总大小超过 max_bytes 时，按最近访问时间淘汰最旧的条目
+
+使用方法：
+
+from common.model_factory import get_chat_model
+from common.response_cache import get_response_cache
+
+model = get_chat_model(temperature=0.0, cache=get_response_cache())
+model.invoke("你好")  # 第一次：请求模型并写入缓存
+model.invoke("你好")  # 第二次：直接从本地缓存返回
+
+注意：
+- 只建议对确定性调用（temperature=0）开启缓存，否则会“冻结”随机输出
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+
+# 默认缓存文件：项目根目录下的 .cache/model_responses.sqlite
+DEFAULT_CACHE_PATH = (
+    Path(__file__).resolve().parents[1] / ".cache" / "model_responses.sqlite"
+)
+
+
+class SQLiteResponseCache(BaseCache):
+    """
+    基于 SQLite 的模型响应缓存（支持 TTL 与按大小的 LRU 淘汰）
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        ttl_seconds: float | None = 7 * 24 * 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        参数：
+            path: SQLite 缓存文件路径
+            ttl_seconds: 缓存有效期（秒），None 表示永不过期
+            max_bytes: 缓存内容总大小上限（字节），超过后淘汰最久未访问的条目
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 多线程共享同一个连接，用锁保证串行访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+
+        # 统计命中情况
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(prompt: str, llm_string: str) -> str:
+        """
+        内容寻址：根据提示词和模型参数计算缓存键
+        """
+        return hashlib.sha256(
+            f"{prompt}\x00{llm_string}".encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def _encode(return_val) -> bytes:
+        """
+        把 Generation 列表编码为 JSON 字节串
+        """
+        items = []
+        for gen in return_val:
+            if isinstance(gen, ChatGeneration):
+                items.append(
+                    {
+                        "message": message_to_dict(gen.message),
+                        "generation_info": gen.generation_info,
+                    }
+                )
+            else:
+                items.append({"text": gen.text, "generation_info": gen.generation_info})
+        return json.dumps(items, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _decode(value: bytes) -> list:
+        """
+        把 JSON 字节串还原为 Generation 列表
+        """
+        generations = []
+        for item in json.loads(value):
+            if "message" in item:
+                message = messages_from_dict([item["message"]])[0]
+                generations.append(
+                    ChatGeneration(
+                        message=message, generation_info=item["generation_info"]
+                    )
+                )
+            else:
+                generations.append(
+                    Generation(
+                        text=item["text"], generation_info=item["generation_info"]
+                    )
+                )
+        return generations
+
+    def lookup(self, prompt: str, llm_string: str):
+        """
+        查询缓存：未命中或已过期返回 None
+        """
+        key = self._make_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+
+            # TTL 过期：删除并视为未命中
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            # 记录访问时间，供 LRU 淘汰使用
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return self._decode(value)
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        """
+        写入缓存，并在超出大小上限时执行 LRU 淘汰
+        """
+        key = self._make_key(prompt, llm_string)
+        value = self._encode(return_val)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """
+        淘汰过期条目，以及超出 max_bytes 的最久未访问条目（调用方需持有锁）
+        """
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        # 按访问时间从旧到新遍历，累计需要释放的空间
+        to_delete = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+    def clear(self, **kwargs) -> None:
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        返回缓存统计信息：条目数、总大小、命中/未命中次数
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 每个缓存文件只打开一个连接
+_response_caches = {}
+_response_caches_lock = threading.Lock()
+
+
+def get_response_cache(path: str | Path = DEFAULT_CACHE_PATH, **kwargs):
+    """
+    获取（必要时创建）指定路径的响应缓存
+
+    参数：
+        path: SQLite 缓存文件路径
+        **kwargs: 传给 SQLiteResponseCache 的其余参数，如 ttl_seconds、max_bytes
+
+    返回：
+        SQLiteResponseCache 实例（同一路径返回同一个实例，
+        因此 get_chat_model 可以按缓存对象区分并复用模型）
+    """
+    key = str(Path(path).resolve())
+    with _response_caches_lock:
+        cache = _response_caches.get(key)
+        if cache is None:
+            cache = SQLiteResponseCache(path, **kwargs)
+            _response_caches[key] = cache
+        return cache
@@ -0,0 +1,277 @@
+"""
+公共模块：分层滚动摘要（每次只摘要新增的一段对话）
+==============================================
+
+SummarizationMiddleware 每次触发摘要时，把「上一次的摘要 + 之后的旧消息」整体交给摘要模型，
+重新写一份完整的摘要：
+- 上一次的摘要被反复改写，对话越长、摘要越长，每次摘要的输入越大
+- 早期的信息每经过一次改写就可能丢失一部分细节
+
+本模块提供 RollingSummarizationMiddleware（SummarizationMiddleware 的子类）：
+1. 每次触发时只摘要上次摘要之后新增的这一段消息，得到一条「分段摘要」（第 0 层）
+2. 某一层的摘要积累到 fanout 条时，合并为上一层的一条摘要（只读这 fanout 条摘要）
+3. 发给模型的摘要 = 各层摘要按时间顺序拼接；层数随对话长度对数增长
+4. 分层摘要保存在摘要消息的 additional_kwargs 中，随 checkpoint 一起持久化，
+   不需要额外的存储
+
+每次摘要只处理新增的一段消息（偶尔加上 fanout 条摘要的合并），
+摘要的开销不再随对话长度增长。
+
+fanout=None 时从不合并：新的分段摘要只追加在摘要末尾，摘要之前的内容逐字节保持不变，
+服务端的前缀缓存（KV 缓存）可以一直复用；代价是摘要随分段数线性增长。
+
+使用方法：
+
+from common.rolling_summary import RollingSummarizationMiddleware
+
+agent = create_agent(
+    model=model,
+    tools=[],
+    checkpointer=InMemorySaver(),
+    middleware=[
+        RollingSummarizationMiddleware(
+            model=summary_model,
+            trigger=("tokens", 1000),
+            fanout=4,  # 每 4 条摘要合并为上一层的 1 条
+        )
+    ],
+)
+
+需要同时在后台生成摘要时，使用 BackgroundRollingSummarizationMiddleware（参数为两者之和）。
+
+注意：
+- 自定义的 summary_prompt 中需要包含 {messages} 占位符，否则摘要模型看不到对话内容
+- 由 SummarizationMiddleware 生成的旧摘要（没有分层信息）会作为最上层的一条摘要保留
+"""
+
+import copy
+import threading
+
+from langchain.agents.middleware import SummarizationMiddleware
+from langchain.agents.middleware.summarization import _check_summary, _summary_config
+from langchain_core.messages import HumanMessage
+
+from common.background_summary import BackgroundSummarizationMiddleware
+
+
+DEFAULT_MERGE_PROMPT = """下面是同一段对话中按时间顺序排列的几段摘要。
+
+请把它们合并为一段摘要，要求：
+1. 保留用户的背景、目标、偏好，已经完成 / 未完成的任务，以及重要结论
+2. 删除重复内容；前后信息有冲突时，以后面的摘要为准
+3. 只输出合并后的摘要
+
+{summaries}"""
+
+# SummarizationMiddleware 生成的摘要消息的前缀
+_SUMMARY_PREFIX = "Here is a summary of the conversation to date:\n\n"
+
+
+class _RollingSummary(str):
+    """
+    摘要文本，同时携带分层摘要（在生成摘要与构造摘要消息之间传递）
+    """
+
+    levels: list
+
+
+def _is_summary_message(message) -> bool:
+    return message.additional_kwargs.get("lc_source") == "summarization"
+
+
+def _render(levels: list) -> str:
+    """
+    各层摘要按时间顺序拼接：层数越高的摘要越早
+    """
+    return "\n\n".join(summary for level in reversed(levels) for summary in level)
+
+
+class RollingSummarizationMiddleware(SummarizationMiddleware):
+    """
+    只摘要新增消息、按层合并分段摘要的摘要中间件
+    """
+
+    def __init__(
+        self,
+        model,
+        *,
+        fanout: int | None = 4,
+        merge_prompt: str = DEFAULT_MERGE_PROMPT,
+        **kwargs,
+    ):
+        """
+        参数：
+            model: 生成摘要的模型
+            fanout: 每一层积累多少条摘要后合并为上一层的一条；
+                None 表示从不合并，摘要只在末尾追加（前缀稳定，见 common/prefix_cache.py）
+            merge_prompt: 合并摘要的提示词，需要包含 {summaries} 占位符
+            **kwargs: 传给 SummarizationMiddleware 的参数（trigger、keep、summary_prompt 等）
+        """
+        super().__init__(model, **kwargs)
+        if fanout is not None and fanout < 2:
+            raise ValueError(f"fanout 至少为 2，实际为 {fanout}")
+        self.fanout = fanout
+        self.merge_prompt = merge_prompt
+        self._stats_lock = threading.Lock()
+
+        # 统计信息
+        self.steps = 0  # 分段摘要次数
+        self.merges = 0  # 合并摘要次数
+        self.summarized_messages = 0  # 交给摘要模型的消息总数
+        self.last_step_messages = 0  # 最近一次摘要处理的消息数
+
+    # ------------------------------------------------------------------
+    # 分层摘要
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _split(messages_to_summarize: list) -> tuple[list, list]:
+        """
+        拆分出上一次的分层摘要与之后新增的消息
+        """
+        levels = []
+        new_messages = []
+        for message in messages_to_summarize:
+            if not _is_summary_message(message):
+                new_messages.append(message)
+                continue
+            saved = message.additional_kwargs.get("summary_levels")
+            if saved is not None:
+                levels = copy.deepcopy(saved)
+            else:
+                # SummarizationMiddleware 生成的旧摘要：作为最上层的一条摘要保留
+                text = message.text.removeprefix(_SUMMARY_PREFIX)
+                levels = [[], [text]]
+        return levels, new_messages
+
+    def _push(self, levels: list, summary: str) -> None:
+        """
+        把新的分段摘要放入第 0 层
+        """
+        if not levels:
+            levels.append([])
+        levels[0].append(summary)
+        with self._stats_lock:
+            self.steps += 1
+
+    def _merge_prompt(self, summaries: list) -> str:
+        return self.merge_prompt.format(
+            summaries="\n\n".join(
+                f"[{i}] {summary}" for i, summary in enumerate(summaries, 1)
+            )
+        )
+
+    def _merge(self, summaries: list) -> str:
+        with self._stats_lock:
+            self.merges += 1
+        if self.summarizer is not None:
+            return _check_summary(
+                self.summarizer.invoke(
+                    [HumanMessage(content=summary) for summary in summaries],
+                    config=_summary_config(),
+                )
+            )
+        prompt = self._merge_prompt(summaries)
+        return self._summary_model.invoke(prompt, config=_summary_config()).text.strip()
+
+    async def _amerge(self, summaries: list) -> str:
+        with self._stats_lock:
+            self.merges += 1
+        if self.summarizer is not None:
+            return _check_summary(
+                await self.summarizer.ainvoke(
+                    [HumanMessage(content=summary) for summary in summaries],
+                    config=_summary_config(),
+                )
+            )
+        prompt = self._merge_prompt(summaries)
+        response = await self._summary_model.ainvoke(prompt, config=_summary_config())
+        return response.text.strip()
+
+    def _full_levels(self, levels: list):
+        """
+        依次返回摘要数已达到 fanout、需要合并的层号
+        """
+        if self.fanout is None:
+            return
+        depth = 0
+        while depth < len(levels):
+            if len(levels[depth]) >= self.fanout:
+                yield depth
+            depth += 1
+
+    def _record(self, new_messages: list) -> None:
+        with self._stats_lock:
+            self.summarized_messages += len(new_messages)
+            self.last_step_messages = len(new_messages)
+
+    @staticmethod
+    def _carry(levels: list, depth: int, merged: str) -> None:
+        """
+        第 depth 层合并为一条摘要，放入上一层
+        """
+        levels[depth] = []
+        if depth + 1 == len(levels):
+            levels.append([])
+        levels[depth + 1].append(merged)
+
+    @staticmethod
+    def _result(levels: list) -> _RollingSummary:
+        summary = _RollingSummary(_render(levels))
+        summary.levels = levels
+        return summary
+
+    # ------------------------------------------------------------------
+    # 覆盖 SummarizationMiddleware 的摘要生成
+    # ------------------------------------------------------------------
+
+    def _create_summary(self, messages_to_summarize: list) -> str:
+        levels, new_messages = self._split(messages_to_summarize)
+        if new_messages:
+            self._record(new_messages)
+            self._push(levels, super()._create_summary(new_messages))
+            for depth in self._full_levels(levels):
+                self._carry(levels, depth, self._merge(levels[depth]))
+        return self._result(levels)
+
+    async def _acreate_summary(self, messages_to_summarize: list) -> str:
+        levels, new_messages = self._split(messages_to_summarize)
+        if new_messages:
+            self._record(new_messages)
+            self._push(levels, await super()._acreate_summary(new_messages))
+            for depth in self._full_levels(levels):
+                self._carry(levels, depth, await self._amerge(levels[depth]))
+        return self._result(levels)
+
+    def _build_new_messages(self, summary: str) -> list[HumanMessage]:
+        messages = super()._build_new_messages(summary)
+        levels = getattr(summary, "levels", None)
+        if levels is not None:
+            messages[0].additional_kwargs["summary_levels"] = levels
+        return messages
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：分段摘要 / 合并次数，交给摘要模型的消息总数与最近一次的消息数
+        """
+        with self._stats_lock:
+            return {
+                "steps": self.steps,
+                "merges": self.merges,
+                "summarized_messages": self.summarized_messages,
+                "last_step_messages": self.last_step_messages,
+            }
+
+
+class BackgroundRollingSummarizationMiddleware(
+    RollingSummarizationMiddleware, BackgroundSummarizationMiddleware
+):
+    """
+    分层滚动摘要 + 后台预先生成摘要（参数为两者之和：fanout、prefetch_ratio 等）
+    """
+
+    def stats(self) -> dict:
+        return {
+            **RollingSummarizationMiddleware.stats(self),
+            **BackgroundSummarizationMiddleware.stats(self),
+        }
@@ -0,0 +1,147 @@
+"""
+公共模块：本地搜索引擎（倒排索引 + BM25）
+==============================================
+
+web_search 工具最初的实现是遍历所有关键词，逐个判断 key in query：
+- 每次查询都要扫描全部关键词，文档一多就很慢
+- 第一个匹配的关键词就返回，没有相关性排序
+
+本模块实现一个小型的本地搜索引擎：
+1. 分词：英文/数字按单词切分；中文按相邻两字切分（bigram），
+   "机器学习" -> ["机器", "器学", "学习"]，不需要中文分词词典
+2. 倒排索引：词 -> [(文档编号, 词频)]，加载语料时构建一次
+3. BM25 排序：综合词频、逆文档频率和文档长度计算相关性
+4. Top-K：用 heapq.nlargest 选出得分最高的 k 个文档，不需要全量排序
+
+查询只访问包含查询词的文档，10 万篇以上的语料也能毫秒级返回。
+
+使用方法：
+
+from common.search_index import SearchDocument, SearchIndex
+
+index = SearchIndex([
+    SearchDocument(title="LangChain官方文档", content="LangChain"),
+    SearchDocument(title="机器学习入门 - Coursera", content="机器学习"),
+])
+for doc, score in index.search("机器学习教程", k=3):
+    print(doc.title, score)
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+
+# 英文单词 / 数字，或连续的中文字符
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    分词：英文转小写后按单词切分，中文按 bigram 切分
+
+    参数：
+        text: 待分词的文本
+
+    返回：
+        词列表，如 "Python机器学习" -> ["python", "机器", "器学", "学习"]
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        if not "\u4e00" <= match[0] <= "\u9fff":
+            tokens.append(match)
+        elif len(match) == 1:
+            tokens.append(match)
+        else:
+            tokens.extend(match[i : i + 2] for i in range(len(match) - 1))
+    return tokens
+
+
+@dataclass
+class SearchDocument:
+    """
+    语料中的一篇文档
+    """
+
+    title: str  # 标题（搜索结果中展示）
+    content: str = ""  # 正文 / 标签，参与检索但不展示
+    url: str = ""
+
+
+class SearchIndex:
+    """
+    倒排索引 + BM25 排序的本地搜索引擎
+    """
+
+    def __init__(self, documents=(), k1: float = 1.5, b: float = 0.75):
+        """
+        参数：
+            documents: 文档列表（SearchDocument）
+            k1: BM25 词频饱和参数，越大词频的影响越大
+            b: BM25 文档长度归一化参数，0 表示不考虑文档长度
+        """
+        self.k1 = k1
+        self.b = b
+        self.documents: list[SearchDocument] = []
+        self._postings = defaultdict(list)  # 词 -> [(文档编号, 词频)]
+        self._doc_lengths: list[int] = []
+        self._total_length = 0
+        self.add_documents(documents)
+
+    def add_documents(self, documents) -> None:
+        """
+        把文档加入索引
+        """
+        for doc in documents:
+            doc_id = len(self.documents)
+            tokens = tokenize(f"{doc.title} {doc.content}")
+            for term, freq in Counter(tokens).items():
+                self._postings[term].append((doc_id, freq))
+            self.documents.append(doc)
+            self._doc_lengths.append(len(tokens))
+            self._total_length += len(tokens)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _idf(self, term: str) -> float:
+        """
+        逆文档频率：包含该词的文档越少，该词越重要
+        """
+        n = len(self.documents)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 3) -> list[tuple[SearchDocument, float]]:
+        """
+        搜索与查询最相关的 k 篇文档
+
+        参数：
+            query: 查询文本
+            k: 返回的文档数
+
+        返回：
+            [(文档, BM25 得分)]，按得分从高到低排列；没有匹配时返回空列表
+        """
+        if not self.documents or k <= 0:
+            return []
+
+        avg_length = self._total_length / len(self.documents) or 1.0
+        scores = defaultdict(float)
+
+        # 重复的查询词只计算一次
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, freq in postings:
+                length_ratio = self._doc_lengths[doc_id] / avg_length
+                norm = self.k1 * (1 - self.b + self.b * length_ratio)
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+        # 得分相同时，先加入索引的文档排在前面
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.documents[doc_id], score) for doc_id, score in top]
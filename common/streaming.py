@@ -0,0 +1,111 @@
+"""
+公共模块：流式输出渲染
+==============================================
+
+model.invoke 要等模型生成完全部内容才返回，用户要一直等到最后。
+流式输出（stream / astream）在模型生成时逐块返回内容：
+- 用户感受到的延迟主要取决于首 token 时间（TTFT），而不是总生成时间
+- 本模块边接收边打印，并记录 TTFT、总耗时和输出块数
+
+使用方法：
+
+from common.streaming import stream_print
+
+stats = stream_print(model, "用一句话介绍什么是智能体")
+print(stats.ttft, stats.total_time)
+full_message = stats.message  # 合并后的完整消息，可以加入对话历史
+"""
+
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class StreamStats:
+    """
+    一次流式调用的统计信息
+    """
+
+    ttft: float | None = None  # 首 token 时间（秒）
+    total_time: float = 0.0  # 总耗时（秒）
+    chunks: int = 0  # 收到的内容块数
+    message: object = None  # 合并后的完整消息（AIMessageChunk）
+
+
+class StreamRenderer:
+    """
+    流式输出渲染器：逐块打印内容，并统计耗时
+
+    stream_print / astream_print 都通过它处理每个内容块
+    """
+
+    def __init__(self, prefix: str = "", echo: bool = True):
+        """
+        参数：
+            prefix: 第一个内容块之前打印的前缀，如 "AI 回复："
+            echo: 是否打印内容（只统计耗时时设为 False）
+        """
+        self.prefix = prefix
+        self.echo = echo
+        self.stats = StreamStats()
+        self._start = time.perf_counter()
+
+    def on_chunk(self, chunk):
+        """
+        处理一个内容块：记录首 token 时间、打印内容、合并消息
+        """
+        if chunk.content:
+            if self.stats.ttft is None:
+                self.stats.ttft = time.perf_counter() - self._start
+                if self.echo:
+                    print(self.prefix, end="", flush=True)
+            self.stats.chunks += 1
+            if self.echo:
+                # flush=True：立即输出，不等缓冲区满
+                print(chunk.content, end="", flush=True)
+
+        # AIMessageChunk 支持 + 运算，逐块合并为完整消息
+        if self.stats.message is None:
+            self.stats.message = chunk
+        else:
+            self.stats.message = self.stats.message + chunk
+
+    def finish(self) -> StreamStats:
+        """
+        结束渲染，返回统计信息
+        """
+        self.stats.total_time = time.perf_counter() - self._start
+        if self.echo and self.stats.ttft is not None:
+            print()
+        return self.stats
+
+
+def stream_print(model, model_input, prefix: str = "", echo: bool = True) -> StreamStats:
+    """
+    同步流式调用模型，边接收边打印
+
+    参数：
+        model: 聊天模型
+        model_input: 模型输入（字符串或消息列表）
+        prefix: 回复内容前打印的前缀
+        echo: 是否打印内容
+
+    返回：
+        StreamStats（其中 message 为合并后的完整消息）
+    """
+    renderer = StreamRenderer(prefix=prefix, echo=echo)
+    for chunk in model.stream(model_input):
+        renderer.on_chunk(chunk)
+    return renderer.finish()
+
+
+async def astream_print(
+    model, model_input, prefix: str = "", echo: bool = True
+) -> StreamStats:
+    """
+    异步流式调用模型，边接收边打印（参数与 stream_print 相同）
+    """
+    renderer = StreamRenderer(prefix=prefix, echo=echo)
+    async for chunk in model.astream(model_input):
+        renderer.on_chunk(chunk)
+    return renderer.finish()
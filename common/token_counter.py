@@ -0,0 +1,195 @@
+"""
+公共模块：基于 BPE 分词器的 token 计数（按消息缓存）
+==============================================
+
+trim_messages / SummarizationMiddleware 需要一个 token 计数函数：
+- 按字符数估算（len(content)）对中文严重失真：一个汉字、一个英文单词都算作若干“token”，
+  为了不超限只能把阈值设得很保守，结果修剪掉了本可以保留的消息
+- trim_messages 内部会对消息列表的不同前缀反复计数（二分查找），
+  每次都重新分词，历史越长越慢
+
+本模块提供 TokenCounter：
+1. 使用 tiktoken 的本地 BPE 分词器（默认 cl100k_base，Qwen 的词表也是在它的基础上扩展的）
+2. 按消息缓存计数结果：键 = (消息类型, 名称, 文本内容)，同一段不断增长的历史
+   反复修剪时，只有新消息需要分词
+3. 计入每条消息的格式开销（角色标记等），与 OpenAI 兼容接口的计费方式一致
+4. LRU 淘汰：缓存条目数超过 maxsize 时淘汰最久未使用的
+
+使用方法：
+
+from common.token_counter import get_token_counter
+
+trimmed = trim_messages(
+    messages,
+    max_tokens=200,
+    token_counter=get_token_counter(),  # 可直接作为 token_counter 传入
+    strategy="last",
+)
+
+注意：
+- tiktoken 第一次使用某个编码时需要联网下载词表（之后缓存在本地）；
+  无法加载时会给出警告，并退回到按字符类别估算的方式
+"""
+
+import json
+import threading
+import warnings
+from collections import OrderedDict
+
+from langchain_core.messages import BaseMessage
+
+
+def _message_text(message: BaseMessage) -> str:
+    """
+    取出消息中需要计费的文本：正文（含多模态中的文本块）+ 工具调用的名称与参数
+    """
+    content = message.content
+    if isinstance(content, str):
+        text = content
+    else:
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                parts.append(block.get("text", ""))
+            else:
+                parts.append(json.dumps(block, ensure_ascii=False, default=str))
+        text = "".join(parts)
+
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += json.dumps(
+            [(call["name"], call["args"]) for call in tool_calls],
+            ensure_ascii=False,
+            default=str,
+        )
+    return text
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    无法加载分词器时的估算：汉字等非 ASCII 字符约 1 个 token，ASCII 约 4 个字符 1 个 token
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+class TokenCounter:
+    """
+    消息列表的 token 计数器（可直接作为 trim_messages 的 token_counter，线程安全）
+    """
+
+    def __init__(
+        self,
+        encoding_name: str = "cl100k_base",
+        tokens_per_message: int = 3,
+        maxsize: int = 10000,
+    ):
+        """
+        参数：
+            encoding_name: tiktoken 编码名称，如 "cl100k_base"、"o200k_base"
+            tokens_per_message: 每条消息的格式开销（角色、分隔符等）
+            maxsize: 最多缓存多少条消息的计数结果
+        """
+        self.encoding_name = encoding_name
+        self.tokens_per_message = tokens_per_message
+        self.maxsize = maxsize
+
+        self._encode = None  # 第一次计数时才加载分词器
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+    def _get_encoder(self):
+        """
+        加载分词器（只在第一次调用时执行），无法加载时退回到估算
+        """
+        if self._encode is None:
+            try:
+                import tiktoken
+
+                encoding = tiktoken.get_encoding(self.encoding_name)
+                # encode_ordinary 不检查特殊 token，消息中出现 "<|endoftext|>" 也按普通文本处理
+                self._encode = lambda text: len(encoding.encode_ordinary(text))
+            except Exception as e:
+                warnings.warn(
+                    f"无法加载 tiktoken 编码 {self.encoding_name}（{e}），"
+                    "改为按字符估算 token 数",
+                    stacklevel=3,
+                )
+                self._encode = estimate_tokens
+        return self._encode
+
+    def _cached(self, key: tuple, count_fn) -> int:
+        """
+        查缓存，未命中时调用 count_fn() 计数并写入缓存
+        """
+        with self._lock:
+            count = self._cache.get(key)
+            if count is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return count
+            self.misses += 1
+
+        count = count_fn()
+        with self._lock:
+            self._cache[key] = count
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return count
+
+    def count_message(self, message: BaseMessage) -> int:
+        """
+        单条消息的 token 数（含格式开销），命中缓存时不重新分词
+        """
+        text = _message_text(message)
+        extra = self.tokens_per_message + (1 if message.name else 0)
+        return self._cached(
+            (message.type, message.name, text),
+            lambda: self._get_encoder()(text) + extra,
+        )
+
+    def count_text(self, text: str) -> int:
+        """
+        一段文本的 token 数（不含消息格式开销），同样按内容缓存
+        """
+        return self._cached(("text", None, text), lambda: self._get_encoder()(text))
+
+    def __call__(self, messages) -> int:
+        """
+        消息列表的 token 总数
+        """
+        if isinstance(messages, BaseMessage):
+            return self.count_message(messages)
+        return sum(self.count_message(message) for message in messages)
+
+    def clear(self) -> None:
+        """
+        清空缓存与统计
+        """
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：命中 / 未命中（实际分词）次数、缓存的消息数
+        """
+        return {"hits": self.hits, "misses": self.misses, "messages": len(self._cache)}
+
+
+# 进程内共享的默认计数器
+_default_counter = TokenCounter()
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    获取默认的 token 计数器（cl100k_base）
+    """
+    return _default_counter
@@ -0,0 +1,256 @@
+"""
+公共模块：工具结果缓存
+==============================================
+
+Agent 在多轮对话、多个会话中经常用完全相同的参数调用同一个工具，
+例如反复查询"北京"的天气、重复计算同一个表达式。
+对于纯函数式的工具（相同输入总是得到相同输出），可以直接复用上一次的结果：
+
+1. 结果缓存：键 = 校验后的参数字典，命中时跳过工具执行
+2. 参数缓存：原始参数 -> 校验后的参数，命中时跳过 pydantic 参数校验
+3. 每个工具单独设置 TTL（天气数据会变化，TTL 短；计算器结果永不过期）
+4. LRU 淘汰：条目数超过 maxsize 时淘汰最久未使用的结果
+5. 命中 / 未命中计数：tool.cache_stats()
+
+使用方法：
+
+from langchain_core.tools import tool
+from common.tool_cache import cached_tool
+
+@cached_tool(ttl=600)   # 写在 @tool 之上
+@tool
+def get_weather(city: str) -> str:
+    ...
+
+get_weather.invoke({"city": "北京"})  # 第一次：执行工具
+get_weather.invoke({"city": "北京"})  # 第二次：直接返回缓存结果
+print(get_weather.cache_stats())
+
+注意：
+- 只对纯函数式的工具使用；有副作用的工具（发邮件、写数据库）不能缓存
+- 工具抛出异常时不缓存
+- 带注入参数（InjectedToolCallId / InjectedState / ToolRuntime 等）的工具不能缓存：
+  结果依赖每次调用注入的值，cached_tool 会直接报错
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from langchain_core.tools.base import (
+    _is_injected_arg_type,
+    get_all_basemodel_annotations,
+)
+from pydantic import PrivateAttr
+
+
+def _make_key(tool_input) -> str:
+    """
+    把参数规范化为缓存键（字典按键排序，与参数顺序无关）
+    """
+    return json.dumps(tool_input, sort_keys=True, ensure_ascii=False, default=repr)
+
+
+class _TTLCache:
+    """
+    带过期时间的 LRU 缓存（线程安全）
+    """
+
+    def __init__(self, ttl: float | None, maxsize: int):
+        """
+        参数：
+            ttl: 有效期（秒），None 表示永不过期
+            maxsize: 最多保存的条目数
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (value, 过期时间)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        查询缓存，返回 (是否命中, 值)
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            value, expires_at = item
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value) -> None:
+        """
+        写入缓存，超出 maxsize 时淘汰最久未使用的条目
+        """
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CachedStructuredTool(StructuredTool):
+    """
+    带结果缓存的 StructuredTool
+
+    - _to_args_and_kwargs：原始参数命中时直接返回上次校验后的参数，跳过校验
+    - _run / _arun：校验后的参数命中时直接返回上次的结果，跳过执行
+    """
+
+    cache_ttl: float | None = None
+    """结果有效期（秒），None 表示永不过期"""
+
+    cache_maxsize: int = 256
+    """最多缓存的结果数"""
+
+    _results: _TTLCache = PrivateAttr()
+    _validated_args: _TTLCache = PrivateAttr()
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    def model_post_init(self, context) -> None:
+        super().model_post_init(context)
+        self._results = _TTLCache(self.cache_ttl, self.cache_maxsize)
+        # 参数校验的结果不会变化，只需要 LRU 淘汰
+        self._validated_args = _TTLCache(None, self.cache_maxsize)
+
+    def _to_args_and_kwargs(self, tool_input, tool_call_id):
+        """
+        参数校验（带缓存）
+        """
+        if not isinstance(tool_input, dict):
+            return super()._to_args_and_kwargs(tool_input, tool_call_id)
+
+        raw_key = _make_key(self._filter_injected_args(tool_input))
+        hit, validated = self._validated_args.get(raw_key)
+        if hit:
+            # 返回副本：下游代码会向参数中注入 run_manager / config
+            return (), dict(validated)
+
+        args, kwargs = super()._to_args_and_kwargs(tool_input, tool_call_id)
+        if not args:
+            self._validated_args.set(raw_key, dict(kwargs))
+        return args, kwargs
+
+    def _lookup(self, args, kwargs):
+        """
+        按校验后的参数查询结果缓存，返回 (缓存键, 是否命中, 结果)
+        """
+        key = _make_key([args, kwargs])
+        hit, value = self._results.get(key)
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+        return key, hit, value
+
+    def _run(
+        self,
+        *args,
+        config: RunnableConfig,
+        run_manager: CallbackManagerForToolRun | None = None,
+        **kwargs,
+    ):
+        key, hit, value = self._lookup(args, kwargs)
+        if hit:
+            return value
+        value = super()._run(*args, config=config, run_manager=run_manager, **kwargs)
+        self._results.set(key, value)
+        return value
+
+    async def _arun(self, *args, config: RunnableConfig, run_manager=None, **kwargs):
+        # 没有异步实现时，父类会在线程池中调用 _run，缓存逻辑已在 _run 中
+        if not self.coroutine:
+            return await super()._arun(
+                *args, config=config, run_manager=run_manager, **kwargs
+            )
+
+        key, hit, value = self._lookup(args, kwargs)
+        if hit:
+            return value
+        value = await super()._arun(
+            *args, config=config, run_manager=run_manager, **kwargs
+        )
+        self._results.set(key, value)
+        return value
+
+    def cache_stats(self) -> dict:
+        """
+        返回缓存统计信息：命中 / 未命中次数、当前缓存的结果数
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._results),
+        }
+
+    def cache_clear(self) -> None:
+        """
+        清空缓存与统计
+        """
+        self._results.clear()
+        self._validated_args.clear()
+        self._hits = 0
+        self._misses = 0
+
+
+def _injected_arg_names(structured_tool: StructuredTool) -> set[str]:
+    """
+    工具中由运行时注入、而不是由模型提供的参数名
+    """
+    names = set(structured_tool._injected_args_keys)
+    schema = structured_tool.args_schema
+    if schema is not None and not isinstance(schema, dict):
+        names.update(
+            name
+            for name, annotation in get_all_basemodel_annotations(schema).items()
+            if _is_injected_arg_type(annotation)
+        )
+    return names
+
+
+def cached_tool(ttl: float | None = None, maxsize: int = 256):
+    """
+    工具结果缓存装饰器，写在 @tool 之上
+
+    参数：
+        ttl: 结果有效期（秒），None 表示永不过期
+        maxsize: 最多缓存的结果数（LRU 淘汰）
+
+    返回：
+        装饰器：把 @tool 创建的 StructuredTool 转换为 CachedStructuredTool
+    """
+
+    def decorator(structured_tool: StructuredTool) -> CachedStructuredTool:
+        if not isinstance(structured_tool, StructuredTool):
+            raise TypeError("cached_tool 需要写在 @tool 装饰器之上")
+        injected = _injected_arg_names(structured_tool)
+        if injected:
+            # 缓存键不含注入参数：命中时会返回另一次调用（如另一个 tool_call_id）的结果
+            raise TypeError(
+                f"工具 {structured_tool.name} 有注入参数 {sorted(injected)}，"
+                "结果依赖每次调用的上下文，不能使用 cached_tool"
+            )
+        fields = {
+            name: getattr(structured_tool, name)
+            for name in StructuredTool.model_fields
+        }
+        return CachedStructuredTool(**fields, cache_ttl=ttl, cache_maxsize=maxsize)
+
+    return decorator
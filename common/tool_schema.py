@@ -0,0 +1,158 @@
+"""
+公共模块：工具 schema 缓存
+==============================================
+
+model.bind_tools(tools) 会把每个工具转换为 OpenAI function schema（convert_to_openai_tool）：
+- 需要读取 pydantic 参数模型、生成 JSON Schema、整理 docstring，每个工具约几十微秒
+- create_agent 创建的 Agent 在每次调用模型前都会执行一次 bind_tools，
+  工具越多、请求越多，重复转换的开销越大
+
+而已经是 dict 的 schema 在 bind_tools 中几乎零开销（原样返回）。
+本模块按工具对象缓存转换结果：
+- 键：工具对象本身（identity）+ 版本（名称、描述、参数模型），工具被修改后自动重新生成
+- tool_schemas(tools)：手动 bind_tools 时使用
+- ToolSchemaCacheMiddleware：create_agent 时使用，在绑定前把工具替换为缓存的 schema，
+  工具的执行仍然使用原来的工具对象
+
+使用方法：
+
+from common.tool_schema import ToolSchemaCacheMiddleware, tool_schemas
+
+model_with_tools = model.bind_tools(tool_schemas([get_weather, calculator]))
+
+agent = create_agent(
+    model=model,
+    tools=[get_weather, calculator],
+    middleware=[ToolSchemaCacheMiddleware()],  # 放在中间件列表最后
+)
+
+注意：
+- 缓存的 schema 字典在多次调用间共享，不要修改它
+"""
+
+import json
+import threading
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+def _tool_version(tool) -> tuple:
+    """
+    工具的版本：名称、描述或参数模型变化后，需要重新生成 schema
+    """
+    if not isinstance(tool, BaseTool):
+        return ()
+    args_schema = tool.args_schema
+    if isinstance(args_schema, dict):
+        args_key = json.dumps(args_schema, sort_keys=True, default=str)
+    else:
+        args_key = id(args_schema)
+    return (tool.name, tool.description, args_key)
+
+
+class ToolSchemaCache:
+    """
+    工具 -> OpenAI function schema 的缓存（线程安全）
+    """
+
+    def __init__(self):
+        # id(工具) -> (工具, 版本, {strict: schema})
+        # 同时保存工具本身：既防止工具被回收后 id 被复用，也用于校验命中的是同一个对象
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tool, strict: bool | None = None) -> dict:
+        """
+        获取工具的 schema，未缓存时转换并缓存
+
+        参数：
+            tool: 工具（BaseTool、函数或 pydantic 模型）；dict 原样返回
+            strict: 传给 convert_to_openai_tool 的 strict 参数
+        """
+        if isinstance(tool, dict):
+            return tool
+
+        version = _tool_version(tool)
+        with self._lock:
+            entry = self._entries.get(id(tool))
+            if entry is not None and entry[0] is tool and entry[1] == version:
+                schema = entry[2].get(strict)
+                if schema is not None:
+                    self.hits += 1
+                    return schema
+            else:
+                entry = (tool, version, {})
+                self._entries[id(tool)] = entry
+            self.misses += 1
+
+        schema = convert_to_openai_tool(tool, strict=strict)
+        with self._lock:
+            entry[2][strict] = schema
+        return schema
+
+    def clear(self) -> None:
+        """
+        清空缓存与统计
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        返回缓存统计信息：命中 / 未命中次数、缓存的工具数
+        """
+        return {"hits": self.hits, "misses": self.misses, "tools": len(self._entries)}
+
+
+# 进程内共享的默认缓存
+_default_cache = ToolSchemaCache()
+
+
+def get_tool_schema_cache() -> ToolSchemaCache:
+    """
+    获取默认的工具 schema 缓存
+    """
+    return _default_cache
+
+
+def tool_schemas(tools, strict: bool | None = None) -> list[dict]:
+    """
+    把工具列表转换为 schema 列表（使用默认缓存），可直接传给 model.bind_tools
+    """
+    return [_default_cache.get(tool, strict=strict) for tool in tools]
+
+
+class ToolSchemaCacheMiddleware(AgentMiddleware):
+    """
+    在 Agent 每次调用模型前，把工具替换为缓存的 schema 再交给 bind_tools
+
+    - 只影响传给模型的工具描述，工具的执行仍由工具节点使用原工具对象完成
+    - 应放在中间件列表的最后：之前的中间件看到的仍是原始工具对象
+    - 使用结构化输出（response_format）时不做替换：
+      此时 bind_tools 可能需要以 strict 模式重新生成 schema
+    """
+
+    def __init__(self, cache: ToolSchemaCache | None = None):
+        """
+        参数：
+            cache: 使用的缓存，默认为进程内共享的缓存
+        """
+        super().__init__()
+        self.cache = cache or _default_cache
+
+    def _with_cached_schemas(self, request):
+        if request.response_format is not None or not request.tools:
+            return request
+        return request.override(tools=[self.cache.get(tool) for tool in request.tools])
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._with_cached_schemas(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._with_cached_schemas(request))
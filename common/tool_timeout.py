@@ -0,0 +1,113 @@
+"""
+公共模块：工具并行执行与单工具超时
+==============================================
+
+模型在一条 AIMessage 中返回多个 tool_calls 时（例如同时查询两个城市的天气并计算），
+这些调用彼此独立，可以并行执行：
+- create_agent 内部的工具节点（ToolNode）已经会并行执行同一轮的多个工具调用
+    - 同步执行（invoke / stream）：放入线程池，并发数由 config["max_concurrency"] 控制
+    - 异步执行（ainvoke / astream）：asyncio.gather 并发执行
+- 工具阶段的耗时因此从「所有调用之和」变为「最慢的那个调用」
+
+但最慢的调用仍然决定了整轮耗时，一个卡住的工具会拖住整个 Agent。
+本模块提供 ToolTimeoutMiddleware，为每个工具设置超时：
+- 超时后立即返回一条错误 ToolMessage，让模型继续推理（例如告诉用户稍后再试）
+
+使用方法：
+
+from common.tool_timeout import ToolTimeoutMiddleware
+
+agent = create_agent(
+    model=model,
+    tools=[get_weather, calculator],
+    middleware=[ToolTimeoutMiddleware(timeouts={"get_weather": 3.0}, default_timeout=10.0)],
+)
+agent.invoke({"messages": [...]}, config={"max_concurrency": 8})
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+
+
+class ToolTimeoutMiddleware(AgentMiddleware):
+    """
+    为工具调用设置超时的中间件
+
+    - 同步工具：在线程池中执行，等待结果时设置超时
+    - 异步执行：使用 asyncio.wait_for 设置超时
+
+    注意：Python 无法强制终止线程，同步工具超时后后台线程仍会运行到结束，
+    只是 Agent 不再等待它的结果
+    """
+
+    def __init__(
+        self,
+        timeouts: dict[str, float] | None = None,
+        default_timeout: float | None = 30.0,
+        max_workers: int = 16,
+    ):
+        """
+        参数：
+            timeouts: 工具名 -> 超时秒数，如 {"get_weather": 3.0}
+            default_timeout: 未单独配置的工具的超时秒数，None 表示不限制
+            max_workers: 执行同步工具的线程池大小
+        """
+        super().__init__()
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tool-timeout"
+        )
+
+    def _get_timeout(self, tool_name: str) -> float | None:
+        """
+        获取某个工具的超时秒数
+        """
+        return self.timeouts.get(tool_name, self.default_timeout)
+
+    @staticmethod
+    def _timeout_message(request, timeout: float) -> ToolMessage:
+        """
+        构造超时时返回给模型的错误消息
+        """
+        tool_name = request.tool_call["name"]
+        return ToolMessage(
+            content=f"工具 {tool_name} 执行超时（超过 {timeout:g} 秒），请稍后重试或换一种方式回答",
+            tool_call_id=request.tool_call["id"],
+            name=tool_name,
+            status="error",
+        )
+
+    def wrap_tool_call(self, request, handler):
+        """
+        同步执行：在线程池中运行工具，超时则返回错误消息
+        """
+        timeout = self._get_timeout(request.tool_call["name"])
+        if timeout is None:
+            return handler(request)
+
+        # 复制上下文变量（回调、配置等），保证在线程池中执行时行为一致
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, handler, request)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return self._timeout_message(request, timeout)
+
+    async def awrap_tool_call(self, request, handler):
+        """
+        异步执行：使用 asyncio.wait_for 设置超时
+        """
+        timeout = self._get_timeout(request.tool_call["name"])
+        if timeout is None:
+            return await handler(request)
+
+        try:
+            return await asyncio.wait_for(handler(request), timeout=timeout)
+        except asyncio.TimeoutError:
+            return self._timeout_message(request, timeout)
@@ -0,0 +1,124 @@
+"""
+公共模块：工具注册表（按需加载）
+==============================================
+
+各章节共享的工具统一放在这个包里，不再在每个章节目录下复制一份 tools/。
+
+工具按需加载（PEP 562 模块级 __getattr__）：
+- import common.tools 时只登记工具名，不导入任何工具模块
+- 第一次访问某个工具时，才导入它所在的模块并创建工具（包括生成参数的 pydantic schema）
+- 只用到天气工具的进程，不需要为计算器导入 NumPy、也不需要为搜索工具建立索引
+
+使用方法：
+
+from common.tools import get_weather, calculator   # 只加载这两个工具所在的模块
+
+from common.tools import get_tools
+tools = get_tools("get_weather", "web_search")
+
+可用工具：
+- get_weather: 天气查询（weather.py）
+- calculator / batch_calculator / calculate_expression: 计算器（calculation.py）
+- web_search: 网页搜索（search.py）
+
+注意：模块名与工具名不能相同（如 calculator.py 中的 calculator），
+否则导入子模块后，包上的同名属性会变成模块对象而不是工具
+"""
+
+import importlib
+import threading
+
+
+# 工具名 -> 所在模块
+_REGISTRY = {
+    "get_weather": "common.tools.weather",
+    "calculator": "common.tools.calculation",
+    "batch_calculator": "common.tools.calculation",
+    "calculate_expression": "common.tools.calculation",
+    "web_search": "common.tools.search",
+}
+
+# 已加载的工具：工具名 -> 工具对象
+_loaded = {}
+_lock = threading.RLock()
+
+__all__ = [
+    *_REGISTRY,
+    "get_tool",
+    "get_tools",
+    "list_tools",
+    "loaded_tools",
+    "register_tool",
+]
+
+
+def register_tool(name: str, module: str) -> None:
+    """
+    登记一个工具（不会立即导入）
+
+    参数：
+        name: 工具名，同时也是模块中工具对象的变量名
+        module: 工具所在模块，如 "common.tools.weather"
+    """
+    with _lock:
+        _REGISTRY[name] = module
+        _loaded.pop(name, None)
+        globals().pop(name, None)
+
+
+def get_tool(name: str):
+    """
+    获取工具，第一次获取时导入工具所在的模块
+
+    参数：
+        name: 工具名，如 "get_weather"
+
+    返回：
+        工具对象（BaseTool）
+    """
+    tool = _loaded.get(name)
+    if tool is not None:
+        return tool
+
+    if name not in _REGISTRY:
+        raise KeyError(f"未登记的工具：{name}，可用工具：{', '.join(_REGISTRY)}")
+
+    with _lock:
+        if name not in _loaded:
+            module = importlib.import_module(_REGISTRY[name])
+            _loaded[name] = getattr(module, name)
+            # 写入模块全局变量，之后访问 common.tools.<name> 不再经过 __getattr__
+            globals()[name] = _loaded[name]
+        return _loaded[name]
+
+
+def get_tools(*names: str) -> list:
+    """
+    按名称获取多个工具，不传名称时返回全部工具
+    """
+    return [get_tool(name) for name in (names or _REGISTRY)]
+
+
+def list_tools() -> list[str]:
+    """
+    所有已登记的工具名（不会导入工具模块）
+    """
+    return list(_REGISTRY)
+
+
+def loaded_tools() -> list[str]:
+    """
+    已经加载的工具名
+    """
+    return list(_loaded)
+
+
+def __getattr__(name: str):
+    # 只有在模块中找不到 name 时才会调用：from common.tools import get_weather
+    if name in _REGISTRY:
+        return get_tool(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_REGISTRY])
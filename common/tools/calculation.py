@@ -0,0 +1,345 @@
+"""
+自定义工具：计算器
+===================================
+
+演示带多个参数的工具
+
+- calculator：一次计算一组 (operation, a, b)
+- batch_calculator：一次计算多组，用 NumPy 向量化执行，
+  适合"把这 500 个订单金额加起来"这类表格式计算：一次工具调用代替上百次模型往返
+- calculate_expression：计算完整的算术表达式，如 "(10 + 20) * 3"，
+  多步计算一次工具调用完成，不需要模型一步步串联 calculator
+"""
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from langchain_core.tools import tool
+
+from common.tool_cache import cached_tool
+
+
+# 运算分派表：定义在模块级，只创建一次（不在每次调用时重建）
+OPERATIONS = {
+    "add": lambda x, y: x + y,
+    "subtract": lambda x, y: x - y,
+    "multiply": lambda x, y: x * y,
+    "divide": lambda x, y: x / y if y != 0 else "错误：除数不能为零",
+}
+
+# 向量化版本：NumPy ufunc，一次处理整个数组
+VECTOR_OPERATIONS = {
+    "add": np.add,
+    "subtract": np.subtract,
+    "multiply": np.multiply,
+    "divide": np.divide,
+}
+
+# 对计算结果的汇总方式（nan 表示该项计算出错，汇总时跳过）
+AGGREGATIONS = {
+    "sum": np.nansum,
+    "mean": np.nanmean,
+    "min": np.nanmin,
+    "max": np.nanmax,
+}
+
+SUPPORTED_OPERATIONS = ", ".join(OPERATIONS)
+
+
+# 纯计算：相同参数的结果永不过期
+@cached_tool(ttl=None)
+@tool
+def calculator(operation: str, a: float, b: float) -> str:
+    """
+    执行基本的数学计算
+
+    参数：
+        operation: 运算类型，支持 "add"(加), "subtract"(减), "multiply"(乘), "divide"(除)
+        a: 第一个数字
+        b: 第二个数字
+
+    返回：
+        计算结果字符串
+    """
+    if operation not in OPERATIONS:
+        return f"不支持的运算类型：{operation}。支持的类型：{SUPPORTED_OPERATIONS}"
+
+    try:
+        result = OPERATIONS[operation](a, b)
+        return f"{a} {operation} {b} = {result}"
+    except Exception as e:
+        return f"计算错误：{e}"
+
+
+@cached_tool(ttl=None)
+@tool
+def batch_calculator(
+    a: list[float],
+    b: Optional[list[float]] = None,
+    operations: Optional[list[str]] = None,
+    aggregate: Optional[str] = None,
+) -> str:
+    """
+    批量数学计算：一次计算多组数字，可以对结果求和/平均/最小/最大
+
+    参数：
+        a: 第一组数字
+        b: 第二组数字，与 a 逐项计算；长度为 1 时与 a 的每一项计算
+        operations: 每一项的运算类型，支持 "add", "subtract", "multiply", "divide"；
+            长度为 1 时所有项使用同一种运算；不传则直接使用 a 中的数字
+        aggregate: 对结果的汇总方式，支持 "sum"(求和), "mean"(平均), "min"(最小), "max"(最大)；
+            不传则返回每一项的结果
+
+    返回：
+        计算结果字符串
+
+    示例：
+        计算 500 个订单金额之和：a=[金额...], aggregate="sum"
+        计算每件商品的总价：a=[单价...], b=[数量...], operations=["multiply"]
+    """
+    if aggregate is not None and aggregate not in AGGREGATIONS:
+        return f"不支持的汇总方式：{aggregate}。支持的方式：{', '.join(AGGREGATIONS)}"
+
+    values = np.asarray(a, dtype=float)
+    errors = np.zeros(values.shape, dtype=bool)  # 出错的项（如除数为零）
+
+    if operations:
+        unknown = sorted(set(operations) - set(VECTOR_OPERATIONS))
+        if unknown:
+            return (
+                f"不支持的运算类型：{', '.join(unknown)}。"
+                f"支持的类型：{SUPPORTED_OPERATIONS}"
+            )
+        if b is None:
+            return "计算错误：指定 operations 时必须提供 b"
+
+        # 长度为 1 的 b / operations 广播到与 a 相同的长度
+        try:
+            x, y, ops = np.broadcast_arrays(
+                values, np.asarray(b, dtype=float), np.asarray(operations)
+            )
+        except ValueError:
+            return (
+                f"计算错误：a、b、operations 的长度不一致"
+                f"（{len(a)}、{len(b)}、{len(operations)}）"
+            )
+
+        values = np.full(x.shape, np.nan)
+        errors = np.zeros(x.shape, dtype=bool)
+        # 每种运算一次向量化计算，而不是逐项调用
+        for name in np.unique(ops):
+            mask = ops == name
+            if name == "divide":
+                zero = mask & (y == 0)
+                errors |= zero
+                mask &= ~zero
+            values[mask] = VECTOR_OPERATIONS[name](x[mask], y[mask])
+
+    error_count = int(errors.sum())
+    error_note = f"（其中 {error_count} 项除数为零，已跳过）" if error_count else ""
+
+    if aggregate is not None:
+        if error_count == len(values):
+            return "计算错误：没有可汇总的有效结果"
+        result = AGGREGATIONS[aggregate](values)
+        return f"{len(values)} 项的 {aggregate} = {float(result)}{error_note}"
+
+    results = [
+        "错误：除数不能为零" if error else float(value)
+        for value, error in zip(values, errors)
+    ]
+    return f"计算结果（共 {len(results)} 项）：{results}"
+
+
+# ----------------------------------------------------------------------------
+# 表达式计算器
+# ----------------------------------------------------------------------------
+# 不能用 eval() 计算模型给出的表达式：eval 可以执行任意 Python 代码。
+# 这里先用 ast 解析为语法树，只允许数字、四则运算和白名单中的函数，
+# 再把语法树编译为嵌套的闭包；编译结果按表达式字符串缓存，重复的表达式只解析一次。
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+}
+
+# 常见的中文 / 数学书写方式转换为 Python 语法
+_NORMALIZE_TABLE = str.maketrans(
+    {"×": "*", "÷": "/", "^": "**", "（": "(", "）": ")", "，": ","}
+)
+
+MAX_EXPRESSION_LENGTH = 500
+MAX_EXPONENT = 100
+MAX_RESULT_BITS = 4096
+
+
+def _safe_pow(base, exponent):
+    """
+    乘方：限制指数大小，避免 10 ** 10 ** 10 这类表达式耗尽 CPU 和内存
+    """
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"指数过大（超过 {MAX_EXPONENT}）")
+    result = operator.pow(base, exponent)
+    if isinstance(result, complex):
+        # 负数的小数次幂在 Python 中得到复数，如 (-8) ** (1/3)
+        raise ValueError("负数不能开小数次方（结果为复数）")
+    if isinstance(result, int) and result.bit_length() > MAX_RESULT_BITS:
+        raise ValueError("计算结果过大")
+    return result
+
+
+def _safe_round(number, ndigits=None):
+    """
+    四舍五入：限制小数位数，避免 round(1, -100000000) 这类调用长时间占用 CPU
+    """
+    if ndigits is None:
+        return round(number)
+    if isinstance(ndigits, bool) or not isinstance(ndigits, int):
+        raise ValueError("round 的小数位数必须是整数")
+    if abs(ndigits) > MAX_EXPONENT:
+        raise ValueError(f"round 的小数位数过大（超过 {MAX_EXPONENT}）")
+    return round(number, ndigits)
+
+
+_FUNCTIONS = {
+    "abs": abs,
+    "round": _safe_round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+}
+
+def _compile_node(node):
+    """
+    把语法树节点编译为无参闭包；遇到不允许的语法时抛出 ValueError
+    """
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"不支持的常量：{node.value!r}")
+        value = node.value
+        return lambda: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in _CONSTANTS:
+            raise ValueError(f"不支持的名称：{node.id}")
+        value = _CONSTANTS[node.id]
+        return lambda: value
+
+    if isinstance(node, ast.BinOp):
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            return lambda: _safe_pow(left(), right())
+        op = _BINARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"不支持的运算符：{type(node.op).__name__}")
+        return lambda: op(left(), right())
+
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"不支持的运算符：{type(node.op).__name__}")
+        operand = _compile_node(node.operand)
+        return lambda: op(operand())
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise ValueError(f"不支持的函数：{ast.unparse(node.func)}")
+        if node.keywords:
+            raise ValueError("函数不支持关键字参数")
+        func = _FUNCTIONS[node.func.id]
+        args = [_compile_node(arg) for arg in node.args]
+        return lambda: func(*(arg() for arg in args))
+
+    raise ValueError(f"不支持的语法：{type(node).__name__}")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str):
+    """
+    解析并编译算术表达式（按表达式字符串缓存）
+
+    参数：
+        expression: 算术表达式，如 "(10 + 20) * 3"
+
+    返回：
+        无参函数，调用后返回计算结果
+
+    异常：
+        ValueError: 表达式过长、有语法错误或包含不允许的语法
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"表达式过长（超过 {MAX_EXPRESSION_LENGTH} 个字符）")
+    try:
+        tree = ast.parse(expression.translate(_NORMALIZE_TABLE).strip(), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"表达式语法错误：{expression}") from None
+    return _compile_node(tree.body)
+
+
+@cached_tool(ttl=None)
+@tool
+def calculate_expression(expression: str) -> str:
+    """
+    计算算术表达式，多步计算请写成一个完整的表达式一次完成
+
+    参数：
+        expression: 算术表达式，如 "(10 + 20) * 3"、"4 * 25 + 10"、"sqrt(16) + 2 ** 3"
+            支持 + - * / // % **（乘方）和括号，函数 abs、round、min、max、sqrt，常量 pi、e
+
+    返回：
+        计算结果字符串
+    """
+    try:
+        result = compile_expression(expression)()
+    except ZeroDivisionError:
+        return "计算错误：除数不能为零"
+    except (ValueError, TypeError, OverflowError) as e:
+        return f"计算错误：{e}"
+
+    if isinstance(result, float) and not math.isfinite(result):
+        return "计算错误：计算结果溢出"
+
+    return f"{expression} = {result}"
+
+
+# 测试工具（在项目根目录运行：python -m common.tools.calculation）
+if __name__ == "__main__":
+    print("测试计算器工具：")
+    print(calculator.invoke({"operation": "add", "a": 10, "b": 5}))
+    print(calculator.invoke({"operation": "subtract", "a": 10, "b": 5}))
+    print(calculator.invoke({"operation": "multiply", "a": 10, "b": 5}))
+    print(calculator.invoke({"operation": "divide", "a": 10, "b": 5}))
+
+    print("\n测试批量计算器工具：")
+    print(batch_calculator.invoke({"a": [12.5, 30, 7.5], "aggregate": "sum"}))
+    print(
+        batch_calculator.invoke(
+            {"a": [10, 20, 30], "b": [2, 0, 5], "operations": ["multiply", "divide", "divide"]}
+        )
+    )
+
+    print("\n测试表达式计算器工具：")
+    print(calculate_expression.invoke({"expression": "(10 + 20) * 3"}))
+    print(calculate_expression.invoke({"expression": "4 × 25 + 10"}))
+    print(calculate_expression.invoke({"expression": "(-8) ** (1/3)"}))
+    print(calculate_expression.invoke({"expression": "round(1, -100000000)"}))
+    print(calculate_expression.invoke({"expression": "__import__('os').system('ls')"}))
@@ -0,0 +1,105 @@
+"""
+自定义工具：网页搜索（模拟）
+===================================
+
+演示可选参数的工具
+
+搜索由本地搜索引擎（倒排索引 + BM25，见 common/search_index.py）完成：
+- 语料在加载模块时建立一次索引
+- 可以用 set_search_corpus() 替换为自己的语料（如从文件加载的 10 万篇文档）
+"""
+
+from typing import Optional
+
+from langchain_core.tools import tool
+
+from common.search_index import SearchDocument, SearchIndex
+from common.tool_cache import cached_tool
+
+
+# 模拟搜索语料：主题 -> 搜索结果
+MOCK_RESULTS = {
+    "Python": [
+        "Python官方网站 - https://www.python.org",
+        "Python教程 - 菜鸟教程",
+        "Python最佳实践 - Real Python",
+    ],
+    "机器学习": [
+        "机器学习入门 - Coursera",
+        "Scikit-learn文档",
+        "机器学习实战 - Github",
+    ],
+    "LangChain": [
+        "LangChain官方文档",
+        "LangChain GitHub仓库",
+        "LangChain教程 - YouTube",
+    ],
+}
+
+# 主题作为文档正文参与检索，例如 "Scikit-learn文档" 也能被 "机器学习" 搜到
+_search_index = SearchIndex(
+    SearchDocument(title=title, content=topic)
+    for topic, titles in MOCK_RESULTS.items()
+    for title in titles
+)
+
+
+def set_search_corpus(documents) -> None:
+    """
+    替换搜索语料并重建索引
+
+    参数：
+        documents: SearchDocument 列表
+    """
+    global _search_index
+    _search_index = SearchIndex(documents)
+    # 语料变了，之前缓存的搜索结果不再有效
+    web_search.cache_clear()
+
+
+# 搜索结果缓存 1 小时
+@cached_tool(ttl=3600)
+@tool
+def web_search(query: str, num_results: Optional[int] = 3) -> str:
+    """
+    在网上搜索信息（模拟）
+
+    参数：
+        query: 搜索关键词
+        num_results: 返回结果数量，默认 3 条
+
+    返回：
+        搜索结果字符串
+    """
+    # 按 BM25 相关性取前 num_results 条
+    hits = _search_index.search(query, k=num_results or 3)
+
+    if not hits:
+        return f"未找到关于'{query}'的结果"
+
+    # 格式化输出
+    output = f"搜索'{query}'找到{len(hits)}条结果:\n"
+    for i, (doc, _score) in enumerate(hits, 1):
+        output += f"{i}. {doc.title}\n"
+
+    return output.strip()
+
+
+# 测试工具（在项目根目录运行：python -m common.tools.search）
+if __name__ == "__main__":
+    print("测试搜索工具：")
+    print(web_search.invoke({"query": "Python"}))
+    print("\n" + web_search.invoke({"query": "LangChain", "num_results": 2}))
+    print("\n" + web_search.invoke({"query": "Java", "num_results": 2}))
+
+# 测试搜索工具：
+# 搜索'Python'找到3条结果:
+# 1. Python最佳实践 - Real Python
+# 2. Python官方网站 - https://www.python.org
+# 3. Python教程 - 菜鸟教程
+
+# 搜索'LangChain'找到2条结果:
+# 1. LangChain GitHub仓库
+# 2. LangChain教程 - YouTube
+
+# 未找到关于'Java'的结果
@@ -0,0 +1,42 @@
+"""
+自定义工具：天气查询
+===================================
+
+使用 @tool 装饰器创建工具（LangChain 1.0 推荐方式）
+
+天气数据来自可替换的数据源（见 common/weather_provider.py）
+"""
+
+from langchain_core.tools import tool
+
+from common.tool_cache import cached_tool
+from common.weather_provider import get_weather_provider
+
+
+# 天气数据会变化：结果缓存 10 分钟
+@cached_tool(ttl=600)
+@tool
+def get_weather(city: str) -> str:
+    """
+    获取指定城市的天气信息
+
+    参数：
+        city: 城市名称，如"北京"、"上海"
+
+    返回：
+        天气信息字符串
+    """
+    # 从天气数据源查询（默认为本地数据文件 common/data/weather.csv，
+    # 可用 set_weather_provider 替换为真实 API）
+    record = get_weather_provider().get(city)
+    if record is None:
+        return f"抱歉，暂时没有{city}的天气数据"
+
+    return record.describe()
+
+
+# 测试工具（在项目根目录运行：python -m common.tools.weather）
+if __name__ == "__main__":
+    print("测试天气工具：")
+    print(f"北京天气：{get_weather.invoke({"city":"北京"})}")
+    print(f"乐山天气：{get_weather.invoke({"city":"乐山"})}")
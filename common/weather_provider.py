@@ -0,0 +1,255 @@
+"""
+公共模块：天气数据源
+==============================================
+
+get_weather 工具最初从写死的四个城市字典里取数据。
+实际应用中，天气数据来自外部数据源（文件、数据库、API），本模块把数据源抽象出来：
+
+1. WeatherProvider：数据源接口，只有一个 get(city) 方法
+2. CSVWeatherProvider：本地 CSV 文件数据源
+   - 用 mmap 内存映射文件，加载时只扫描一次，记录每个城市所在行的偏移量
+   - 查询时按偏移量直接切片读取这一行，不需要把整个文件解析到内存
+3. CachedWeatherProvider：为较慢的数据源（如远程 API）增加进程内 TTL 缓存和请求合并
+   - 请求合并：多个线程同时查询"北京"时，只有第一个线程真正查询数据源，
+     其余线程等待并共享它的结果
+
+get_weather 工具本身已经缓存 10 分钟（@cached_tool），默认的本地 CSV 数据源不再额外缓存；
+替换数据源时会一并清空工具的缓存。
+
+使用方法：
+
+from common.weather_provider import get_weather_provider
+
+record = get_weather_provider().get("北京")
+if record is not None:
+    print(record.describe())  # 晴天，温度 15°C，空气质量良好
+
+替换数据源：
+
+from common.weather_provider import CachedWeatherProvider, set_weather_provider
+
+set_weather_provider(CachedWeatherProvider(MyApiWeatherProvider(), ttl_seconds=300))
+"""
+
+import csv
+import mmap
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# 默认数据文件：common/data/weather.csv（表头：city,condition,temperature,note）
+DEFAULT_WEATHER_PATH = Path(__file__).resolve().parent / "data" / "weather.csv"
+
+
+@dataclass
+class WeatherRecord:
+    """
+    一个城市的天气数据
+    """
+
+    city: str
+    condition: str  # 天气状况，如"晴天"
+    temperature: float  # 温度（°C）
+    note: str = ""  # 补充说明，如"空气质量良好"
+
+    def describe(self) -> str:
+        """
+        格式化为工具返回给模型的描述
+        """
+        text = f"{self.condition}，温度 {self.temperature:g}°C"
+        return f"{text}，{self.note}" if self.note else text
+
+
+class WeatherProvider(ABC):
+    """
+    天气数据源接口
+    """
+
+    @abstractmethod
+    def get(self, city: str) -> WeatherRecord | None:
+        """
+        查询城市天气，没有该城市的数据时返回 None
+        """
+
+
+class CSVWeatherProvider(WeatherProvider):
+    """
+    基于内存映射 CSV 文件的天气数据源
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_WEATHER_PATH):
+        """
+        参数：
+            path: CSV 文件路径，第一行为表头 city,condition,temperature,note
+        """
+        self.path = Path(path)
+        # (城市 -> (行起始偏移, 行结束偏移), 内存映射)：整体替换，读取方一次取出两者
+        self._index = ({}, None)
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        重新映射文件并建立城市 -> 行偏移量的索引（数据文件更新后调用）
+        """
+        offsets = {}
+        mapped = None
+
+        with open(self.path, "rb") as f:
+            if self.path.stat().st_size > 0:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped is not None:
+            # 跳过表头，逐行记录偏移量；只解码第一列（城市名）
+            header_end = mapped.find(b"\n")
+            position = len(mapped) if header_end < 0 else header_end + 1
+            while position < len(mapped):
+                end = mapped.find(b"\n", position)
+                if end < 0:
+                    end = len(mapped)
+                comma = mapped.find(b",", position, end)
+                if comma > position:
+                    city = mapped[position:comma].decode("utf-8").strip()
+                    offsets[city] = (position, end)
+                position = end + 1
+
+        # 不关闭旧的映射：并发的 get() 可能还在读取，没有引用后由垃圾回收释放
+        self._index = (offsets, mapped)
+
+    def get(self, city: str) -> WeatherRecord | None:
+        offsets, mapped = self._index
+        offset = offsets.get(city)
+        if offset is None:
+            return None
+
+        start, end = offset
+        line = mapped[start:end].decode("utf-8").rstrip("\r")
+        name, condition, temperature, note = next(csv.reader([line]))
+        return WeatherRecord(
+            city=name, condition=condition, temperature=float(temperature), note=note
+        )
+
+    def cities(self) -> list[str]:
+        """
+        数据文件中的全部城市
+        """
+        return list(self._index[0])
+
+
+class _InFlight:
+    """
+    一次正在进行的数据源查询，供等待中的线程共享结果
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CachedWeatherProvider(WeatherProvider):
+    """
+    为数据源增加 TTL 缓存与请求合并
+    """
+
+    def __init__(self, provider: WeatherProvider, ttl_seconds: float = 600):
+        """
+        参数：
+            provider: 被包装的数据源
+            ttl_seconds: 缓存有效期（秒），天气数据会变化，不宜过长
+        """
+        self.provider = provider
+        self.ttl_seconds = ttl_seconds
+        self._cache = {}  # 城市 -> (WeatherRecord 或 None, 过期时间)
+        self._inflight = {}  # 城市 -> _InFlight
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.coalesced = 0  # 等待其他线程查询结果的次数
+        self.lookups = 0  # 实际查询数据源的次数
+
+    def get(self, city: str) -> WeatherRecord | None:
+        with self._lock:
+            item = self._cache.get(city)
+            if item is not None and time.monotonic() < item[1]:
+                self.hits += 1
+                return item[0]
+
+            call = self._inflight.get(city)
+            if call is not None:
+                # 已有线程在查询这个城市：等待它的结果
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _InFlight()
+                self._inflight[city] = call
+                self.lookups += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.provider.get(city)
+            # 没有数据的城市也缓存，避免反复查询数据源
+            with self._lock:
+                self._cache[city] = (call.result, time.monotonic() + self.ttl_seconds)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[city]
+            call.event.set()
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        返回统计信息：缓存命中、请求合并、实际查询数据源的次数
+        """
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "lookups": self.lookups,
+        }
+
+
+_default_provider = None
+_default_provider_lock = threading.Lock()
+
+
+def get_weather_provider() -> WeatherProvider:
+    """
+    获取默认天气数据源（首次调用时加载 common/data/weather.csv）
+    """
+    global _default_provider
+    with _default_provider_lock:
+        if _default_provider is None:
+            _default_provider = CSVWeatherProvider()
+        return _default_provider
+
+
+def set_weather_provider(provider: WeatherProvider) -> None:
+    """
+    替换默认天气数据源，并清空 get_weather 工具中旧数据源的缓存结果
+    """
+    # 在函数内导入：common.tools.weather 导入了本模块
+    from common.tools.weather import get_weather
+
+    global _default_provider
+    with _default_provider_lock:
+        _default_provider = provider
+    get_weather.cache_clear()
@@ -10,49 +10,57 @@ LangChain 1.0 基础教程 - 第一个 LLM 调用
 4. 基本配置和参数
 """
 
+import asyncio
 import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import sys
+import time
+from pathlib import Path
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-# 加载环境变量
-# 1. 查找 .env 文件，将其中的内容加载到 os.environ
-# 2. 从环境变量中读取密钥，若不存在，则返回None
-load_dotenv()
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
+from common.model_compare import compare_models, print_comparison
+from common.model_factory import get_chat_model
+from common.response_cache import get_response_cache
+from common.streaming import astream_print, stream_print
 
 
-# 校验 QWEN_API_KEY 是否被正确配置
-# 1. 防止 .env 未加载导致为 None
-# 2. 防止开发者未替换模板中的占位符
-# 3. 提前中断程序，避免模型初始化阶段出现难以定位的鉴权错误
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_API_KEY\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费秘钥"
-    )
+# 获取模型
+# 模型不在 import 阶段初始化，而是交给 common.model_factory.get_chat_model：
+# 1. 第一次调用时才执行 load_dotenv()，并校验 QWEN_API_KEY / QWEN_BASE_URL
+#    （防止 .env 未加载导致为 None、防止未替换模板中的占位符）
+# 2. 第一次调用时才通过 init_chat_model 创建模型
+#    init_chat_model 是LangChain 1.0 提供的标准跨厂商统一模型入口工厂函数
+#    Qwen 不是 OpenAI 协议直连，需要走 OpenAI-compatible endpoint，这一步很多人会踩坑
+# 3. 按 (model, model_provider, base_url, temperature, ...) 缓存模型实例，
+#    相同配置再次调用直接复用，底层 HTTP 客户端也一起复用
+#
+# 因此仅仅 import 本模块不会产生任何模型初始化开销
 
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
 
+# 流式输出模式
+# 设置环境变量 STREAM_OUTPUT=1（或写在 .env 中）后，示例2、3、6 改用 model.stream() 逐块打印回复
+# 用户感受到的等待时间主要取决于首 token 时间（TTFT），而不是总生成时间
+def invoke_and_print(model, model_input, prefix="AI 回复："):
+    """
+    调用模型并打印回复
 
-# 初始化模型
-# init_chat_model 是LangChain 1.0 提供的标准跨厂商统一模型入口工厂函数，是所有模型统一入口
-# LangChain 会自动帮你选择对应厂商的 ChatModel 类，并完成实例化
-# Qwen 不是 OpenAI 协议直连，需要走 OpenAI-compatible endpoint，这一步很多人会踩坑
-# LangChain 1.x 不再关心“你是什么模型”，只关心协议。Qwen 是 OpenAI 协议伪装模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+    - 默认：model.invoke() 阻塞到生成结束，再一次性打印
+    - 流式输出模式：model.stream() 边生成边打印，并显示首 token 时间
+
+    返回：
+        完整的 AI 消息（可以直接加入对话历史）
+    """
+    # 在调用时才读取：.env 在 get_chat_model() 第一次调用时才加载，import 时读取会漏掉其中的设置
+    if os.getenv("STREAM_OUTPUT") == "1":
+        stats = stream_print(model, model_input, prefix=prefix)
+        print(f"（首 token：{stats.ttft or 0:.2f}s，总耗时：{stats.total_time:.2f}s）")
+        return stats.message
+
+    response = model.invoke(model_input)
+    print(f"{prefix}{response.content}")
+    return response
 
 
 # ===================================================================================
@@ -70,9 +78,10 @@ def example_1_simple_invoke():
     print("示例1：最简单的模型调用")
     print("=" * 40)
 
-    # 初始化模型
-    # 格式：init_chat_model(...)
-    # 这里就使用上面初始化的那个 model
+    # 获取模型
+    # 格式：get_chat_model(...)，内部调用 init_chat_model(...)
+    # 第一次调用时创建，之后相同配置的调用直接复用缓存
+    model = get_chat_model()
 
     # 使用字符串直接调用模型
     response = model.invoke("你好！请用一句话介绍什么是人工智能")
@@ -101,7 +110,7 @@ def example_2_messages():
     print("示例2：使用消息列表进行对话")
     print("=" * 40)
 
-    # 模型已经在开头初始化
+    model = get_chat_model()
 
     # 构建消息列表
     messages = [
@@ -115,9 +124,7 @@ def example_2_messages():
     print("用户提示词：", messages[1].content)
 
     # 调用模型
-    response = model.invoke(messages)
-
-    print(f"\nAI 回复：\n{response.content}")
+    response = invoke_and_print(model, messages, prefix="\nAI 回复：\n")
 
     # 继续对话：将 AI 的回复添加到对话历史
     messages.append(response)
@@ -127,8 +134,7 @@ def example_2_messages():
     print("继续对话...")
     print("用户问题：", messages[-1].content)
 
-    response2 = model.invoke(messages)
-    print(f"\nAI 回复：\n{response2.content}")
+    invoke_and_print(model, messages, prefix="\nAI 回复：\n")
 
 
 # ===================================================================================
@@ -147,7 +153,7 @@ def example_3_dict_messages():
     print("示例3：使用字典格式的消息（推荐）")
     print("=" * 40)
 
-    # model 已经在开头初始化
+    model = get_chat_model()
 
     # 使用字典格式构建消息
     messages = [
@@ -163,9 +169,7 @@ def example_3_dict_messages():
     for msg in messages:
         print(f"{msg['role']}:{msg['content']}")
 
-    response = model.invoke(messages)
-
-    print(f"\nAI 回复：\n{response.content}")
+    invoke_and_print(model, messages, prefix="\nAI 回复：\n")
 
 
 # ===================================================================================
@@ -182,19 +186,19 @@ def example_4_model_parameters():
         - 2.0: 最随机，最有创造性
     - max_tokens: 限制输出的最大 token 数量
     - model_kwargs: 传递给底层模型的额外参数
+    - cache: 响应缓存，确定性调用可以直接复用之前的结果
     """
     print("\n" + "=" * 40)
     print("示例4：配置模型参数")
     print("=" * 40)
 
     # 创建一个温度较低的模型（更有确定性）
-    model_deterministic = init_chat_model(
-        model="qwen-plus",
-        model_provider="openai",
-        api_key=QWEN_API_KEY,
-        base_url=QWEN_BASE_URL,
+    # temperature=0 时相同输入的输出基本一致，开启本地响应缓存：
+    # 第一次请求模型，之后相同的提示词直接从本地 SQLite 缓存返回
+    model_deterministic = get_chat_model(
         temperature=0.0,  # 最有确定性
         max_tokens=100,  # 限制输出长度
+        cache=get_response_cache(),  # 本地响应缓存
     )
 
     prompt = "写一段关于春天景色的描写"
@@ -202,19 +206,17 @@ def example_4_model_parameters():
     print(f"提示词：{prompt}")
     print(f"\n使用 temperature = 0.0 （确定性输出）：")
 
-    # 调用三次，观察输出的一致性
+    # 调用三次，观察输出的一致性（以及缓存命中后的耗时）
     for i in range(3):
+        start = time.perf_counter()
         response = model_deterministic.invoke(prompt)
-        print(f"第 {i+1} 次：{response.content}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"第 {i+1} 次（{elapsed_ms:.2f} ms）：{response.content}")
 
     print("\n" + "=" * 40)
 
     # 创建一个温度较高的模型（更随机）
-    model_creative = init_chat_model(
-        model="qwen-plus",
-        model_provider="openai",
-        api_key=QWEN_API_KEY,
-        base_url=QWEN_BASE_URL,
+    model_creative = get_chat_model(
         temperature=1.5,  # 更有创造性
         max_tokens=100,  # 限制输出长度
     )
@@ -244,7 +246,7 @@ def example_5_response_structure():
     print("示例5：invoke 返回值详解")
     print("=" * 40)
 
-    # model 已经在开头初始化
+    model = get_chat_model()
 
     response = model.invoke("用一句话解释什么是递归")
 
@@ -286,11 +288,11 @@ def example_6_error_handling():
     print("=" * 40)
 
     try:
-        # 模型已经在开头初始化
+        # 模型在第一次调用时才创建，配置错误（ValueError）也会在这里抛出
+        model = get_chat_model()
 
-        response = model.invoke("请用一句话介绍什么是智能体")
+        invoke_and_print(model, "请用一句话介绍什么是智能体")
         print(f"成功调用模型！")
-        print(f"AI 回复：{response.content}")
 
     except ValueError as e:
         print(f"配置错误：{e}")
@@ -311,32 +313,92 @@ def example_7_multiple_models():
 
     LangChain 1.0 的优势是可以轻松切换不同的模型提供商
         - 只需要修改模型设定参数
+        - 每个模型名称都会创建一个独立的模型
+        - 使用 asyncio 并发调用所有模型，总耗时约等于最慢的那个模型
+        - 同时统计每个模型的总耗时、首 token 时间和输出速度
     """
     print("\n" + "=" * 40)
     print("示例 7：对比不同模型的输出")
     print("=" * 40)
 
-    # Groq 上可用的不同模型
+    # 要对比的模型
+    # - 不带前缀：走 Qwen 的 OpenAI 兼容端点
+    # - 带 "厂商:" 前缀：由 init_chat_model 推断厂商（需安装对应集成包并配置 API Key）
     models_to_test = [
+        "qwen-plus",
+        "qwen-turbo",
         "groq:llama-3.3-70b-versatile",
-        "groq:mixtral-8x7b-32768",
     ]
 
     prompt = "用一句话解释什么是智能体"
     print(f"提示词：{prompt}\n")
 
-    for model_name in models_to_test:
-        try:
-            print(f"\n使用模型：{model_name}")
-            print("=" * 40)
+    # 并发调用所有模型
+    results, wall_time = asyncio.run(compare_models(prompt, models_to_test))
+
+    print_comparison(results, wall_time)
+
+
+# ===================================================================================
+# 示例8：流式输出（stream）
+# ===================================================================================
+def example_8_streaming():
+    """
+    示例8：流式输出
+
+    - invoke: 等模型生成完全部内容才返回
+    - stream: 模型每生成一小段内容就返回一个 AIMessageChunk
+    - 关键点：
+        - 首 token 时间（TTFT）决定了用户感受到的等待时间
+        - 多个 AIMessageChunk 可以用 + 合并为完整消息
+    """
+    print("\n" + "=" * 40)
+    print("示例 8：流式输出")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    prompt = "用三句话介绍一下 LangChain"
+    print(f"提示词：{prompt}\n")
+
+    # 对照组：invoke 阻塞到生成结束
+    start = time.perf_counter()
+    response = model.invoke(prompt)
+    invoke_time = time.perf_counter() - start
+    print(f"【invoke】等待 {invoke_time:.2f}s 后一次性输出：\n{response.content}\n")
+
+    # 流式输出：边生成边打印
+    print("【stream】边生成边输出：")
+    stats = stream_print(model, prompt)
+
+    print(f"\n首 token 时间：{stats.ttft or 0:.2f}s")
+    print(f"总耗时：{stats.total_time:.2f}s")
+    print(f"内容块数：{stats.chunks}")
+    print(f"合并后的消息类型：{type(stats.message).__name__}")
+
+
+# ===================================================================================
+# 示例9：异步流式输出（astream）
+# ===================================================================================
+def example_9_async_streaming():
+    """
+    示例9：异步流式输出
 
-            # 模型已经在开头初始化
+    - astream 是 stream 的异步版本，适合在 asyncio 服务中使用
+    - 等待模型输出时不会阻塞事件循环，可以同时处理其他请求
+    """
+    print("\n" + "=" * 40)
+    print("示例 9：异步流式输出")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    prompt = "用一句话解释什么是异步编程"
+    print(f"提示词：{prompt}\n")
 
-            response = model.invoke(prompt)
-            print(f"回复：{response.content}")
+    stats = asyncio.run(astream_print(model, prompt, prefix="AI 回复："))
 
-        except Exception as e:
-            print(f"模型 {model_name} 调用失败：{e}")
+    print(f"\n首 token 时间：{stats.ttft or 0:.2f}s，总耗时：{stats.total_time:.2f}s")
 
 
 def main():
@@ -355,7 +417,9 @@ def main():
         # example_4_model_parameters()
         # example_5_response_structure()
         # example_6_error_handling()
-        example_7_multiple_models()
+        # example_7_multiple_models()
+        # example_8_streaming()
+        example_9_async_streaming()
 
         print("\n" + "=" * 80)
         print("所有示例运行完成！")
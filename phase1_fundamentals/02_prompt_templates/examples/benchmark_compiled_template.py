@@ -0,0 +1,96 @@
+"""
+基准测试：ChatPromptTemplate vs 预编译模板
+==============================================
+
+对比 100k 次渲染时，每次 format_messages 的平均耗时：
+1. ChatPromptTemplate.format_messages - 每次都重新解析模板、校验变量
+2. CompiledChatTemplate.format_messages - 只在编译时解析一次，渲染时填槽拼接
+
+运行方法（在 02_prompt_templates 目录下）：
+
+python examples/benchmark_compiled_template.py
+python examples/benchmark_compiled_template.py 10000   # 指定渲染次数
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 直接运行本文件时，把 02_prompt_templates 目录加入模块搜索路径
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from examples.template_library import TemplateLibrary, compile_template
+
+
+def bench(name: str, render, n: int) -> float:
+    """
+    执行 n 次渲染，打印并返回每次的平均耗时（微秒）
+    """
+    start = time.perf_counter()
+    for i in range(n):
+        render(i)
+    per_call_us = (time.perf_counter() - start) / n * 1e6
+    print(f"  {name:<24}{per_call_us:>10.2f} us/次")
+    return per_call_us
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("\n" + "=" * 60)
+    print(f"提示词模板渲染基准测试（每种方式渲染 {n} 次）")
+    print("=" * 60)
+
+    # 场景1：部分变量模板（对应 main.py 示例6）
+    original_template = ChatPromptTemplate.from_messages(
+        [("system", "你是一名{role}，你的目标用户是{audience}。"), ("user", "请{task}")]
+    )
+    partially_filled = original_template.partial(
+        role="科技博客作者", audience="软件人员"
+    )
+    compiled_partial = compile_template(partially_filled)
+
+    # 先确认两种方式的结果完全一致
+    assert partially_filled.format_messages(task="x") == compiled_partial.format_messages(
+        task="x"
+    )
+
+    print("\n【场景1：partial 模板】")
+    before = bench(
+        "ChatPromptTemplate",
+        lambda i: partially_filled.format_messages(task=f"介绍第{i}个概念"),
+        n,
+    )
+    after = bench(
+        "CompiledChatTemplate",
+        lambda i: compiled_partial.format_messages(task=f"介绍第{i}个概念"),
+        n,
+    )
+    print(f"  加速比：{before / after:.1f}x")
+
+    # 场景2：模板库中的翻译模板
+    translator = TemplateLibrary.TRANSLATOR
+    compiled_translator = compile_template(translator)
+
+    print("\n【场景2：TemplateLibrary.TRANSLATOR】")
+    before = bench(
+        "ChatPromptTemplate",
+        lambda i: translator.format_messages(
+            source_lang="英语", target_lang="中文", text=f"Sentence {i}"
+        ),
+        n,
+    )
+    after = bench(
+        "CompiledChatTemplate",
+        lambda i: compiled_translator.format_messages(
+            source_lang="英语", target_lang="中文", text=f"Sentence {i}"
+        ),
+        n,
+    )
+    print(f"  加速比：{before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,34 @@ messages = TemplateLibrary.TRANSLATOR.format_messages(
     target_lang="中文",
     text="Hello World"
 )
+
+预编译模板（高频渲染时使用）：
+
+from examples.template_library import compile_template
+
+translator = compile_template(TemplateLibrary.TRANSLATOR)
+messages = translator.format_messages(
+    source_lang="英语", target_lang="中文", text="Hello World"
+)
+
+批量翻译：
+
+from examples.template_library import translate_batch
+
+results = translate_batch(model, ["Hello", "Good morning"], "英语", "中文")
 """
 
-from langchain_core.prompts import ChatPromptTemplate
+import asyncio
+import time
+from string import Formatter
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import (
+    AIMessagePromptTemplate,
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    SystemMessagePromptTemplate,
+)
 
 
 class TemplateLibrary:
@@ -57,6 +82,262 @@ class TemplateLibrary:
     """
 
 
+# ============================================================================
+# 预编译模板
+# ============================================================================
+
+# 消息模板类型 -> 渲染后生成的消息类型
+_MESSAGE_CLASSES = {
+    SystemMessagePromptTemplate: SystemMessage,
+    HumanMessagePromptTemplate: HumanMessage,
+    AIMessagePromptTemplate: AIMessage,
+}
+
+
+class CompiledChatTemplate:
+    """
+    预编译的聊天模板
+
+    ChatPromptTemplate 每次 format_messages 都要重新解析模板字符串、校验变量。
+    预编译只在创建时解析一次：
+        1. 把每条消息模板拆分为「静态片段」和「变量槽位」
+        2. 固定的部分变量（partial）直接合并进静态片段
+        3. 渲染时只需把变量值填入槽位，再拼接字符串
+
+    只支持 f-string 格式、由 system/user/assistant 消息组成的模板
+    """
+
+    def __init__(self, template: ChatPromptTemplate):
+        """
+        参数：
+            template: 要编译的 ChatPromptTemplate（可以是 partial 之后的模板）
+        """
+        # 部分变量：固定值在编译时合并，函数值在每次渲染时调用
+        static_partials = {}
+        self._dynamic_partials = {}
+        for name, value in template.partial_variables.items():
+            if callable(value):
+                self._dynamic_partials[name] = value
+            else:
+                static_partials[name] = value
+
+        # 每条消息编译为：(消息类型, 片段列表, [(槽位下标, 变量名), ...])
+        self._compiled = []
+        input_variables = set()
+
+        for message_template in template.messages:
+            message_class = _MESSAGE_CLASSES.get(type(message_template))
+            prompt = getattr(message_template, "prompt", None)
+            if message_class is None or prompt is None:
+                raise ValueError(
+                    f"不支持预编译的消息模板类型：{type(message_template).__name__}"
+                )
+            if prompt.template_format != "f-string":
+                raise ValueError(f"只支持 f-string 模板，当前为：{prompt.template_format}")
+
+            segments = []
+            slots = []
+            for literal, field, format_spec, conversion in Formatter().parse(
+                prompt.template
+            ):
+                if literal:
+                    self._append_literal(segments, slots, literal)
+                if field is None:
+                    continue
+                if format_spec or conversion or not field.isidentifier():
+                    raise ValueError(f"不支持预编译的变量写法：{{{field}}}")
+
+                if field in static_partials:
+                    self._append_literal(
+                        segments, slots, str(static_partials[field])
+                    )
+                else:
+                    slots.append((len(segments), field))
+                    segments.append("")
+                    input_variables.add(field)
+
+            self._compiled.append((message_class, segments, slots))
+
+        self.input_variables = sorted(input_variables - set(self._dynamic_partials))
+
+    @staticmethod
+    def _append_literal(segments: list[str], slots: list, literal: str):
+        """
+        追加静态片段；上一个也是静态片段时直接合并
+        """
+        if segments and (not slots or slots[-1][0] != len(segments) - 1):
+            segments[-1] += literal
+        else:
+            segments.append(literal)
+
+    def format_messages(self, **kwargs) -> list:
+        """
+        渲染模板，返回消息列表（与 ChatPromptTemplate.format_messages 结果一致）
+        """
+        if self._dynamic_partials:
+            kwargs = {
+                **{name: func() for name, func in self._dynamic_partials.items()},
+                **kwargs,
+            }
+
+        messages = []
+        for message_class, segments, slots in self._compiled:
+            if not slots:
+                content = segments[0] if segments else ""
+            else:
+                parts = segments.copy()
+                try:
+                    for index, name in slots:
+                        parts[index] = str(kwargs[name])
+                except KeyError as e:
+                    raise KeyError(
+                        f"缺少模板变量：{e.args[0]}，需要的变量：{self.input_variables}"
+                    ) from None
+                content = "".join(parts)
+            messages.append(message_class(content=content))
+        return messages
+
+
+# 已编译模板的缓存：模板对象 id -> (模板对象, CompiledChatTemplate)
+_compiled_templates = {}
+
+
+def compile_template(template: ChatPromptTemplate) -> CompiledChatTemplate:
+    """
+    获取模板的预编译版本（同一个模板对象只编译一次）
+
+    示例：
+        translator = compile_template(TemplateLibrary.TRANSLATOR)
+        messages = translator.format_messages(
+            source_lang="英语", target_lang="中文", text="Hello"
+        )
+    """
+    cached = _compiled_templates.get(id(template))
+    # 同时保存模板对象本身，防止模板被回收后 id 被复用
+    if cached is not None and cached[0] is template:
+        return cached[1]
+
+    compiled = CompiledChatTemplate(template)
+    _compiled_templates[id(template)] = (template, compiled)
+    return compiled
+
+
+# ============================================================================
+# 批量翻译
+# ============================================================================
+def translate_batch(
+    model,
+    texts: list[str],
+    source_lang: str,
+    target_lang: str,
+    max_concurrency: int = 8,
+    max_retries: int = 2,
+    retry_delay: float = 1.0,
+) -> list[str]:
+    """
+    批量翻译：一次格式化并发送多条文本
+
+    - 使用 TRANSLATOR | model 组成链，通过 chain.batch 并发请求
+    - max_concurrency 限制同时进行的请求数，避免超过服务商的速率限制
+    - 返回结果与输入顺序一致
+    - 失败的条目重试，不影响其他条目；每轮重试只等待一次，失败条目一起并发重新请求
+
+    参数：
+        model: 聊天模型
+        texts: 要翻译的文本列表
+        source_lang: 源语言
+        target_lang: 目标语言
+        max_concurrency: 最大并发请求数
+        max_retries: 每条失败文本的最大重试次数
+        retry_delay: 首次重试前的等待秒数（之后每次翻倍）
+
+    返回：
+        译文列表；重试后仍失败的条目为 "翻译失败：..." 错误信息
+    """
+    chain = TemplateLibrary.TRANSLATOR | model
+    inputs = [
+        {"source_lang": source_lang, "target_lang": target_lang, "text": text}
+        for text in texts
+    ]
+
+    # return_exceptions=True：单条失败时返回异常对象，而不是让整批失败
+    outputs = chain.batch(
+        inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True
+    )
+
+    # 失败的条目一起重试（指数退避）：每轮只等待一次，再用一次 batch 并发重新请求
+    for attempt in range(max_retries):
+        failed = [i for i, out in enumerate(outputs) if isinstance(out, Exception)]
+        if not failed:
+            break
+        time.sleep(retry_delay * 2**attempt)
+        retried = chain.batch(
+            [inputs[i] for i in failed],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        for i, output in zip(failed, retried):
+            outputs[i] = output
+
+    results = []
+    for output in outputs:
+        if isinstance(output, Exception):
+            results.append(f"翻译失败：{output}")
+        else:
+            results.append(output.content)
+
+    return results
+
+
+async def atranslate_batch(
+    model,
+    texts: list[str],
+    source_lang: str,
+    target_lang: str,
+    max_concurrency: int = 8,
+    max_retries: int = 2,
+    retry_delay: float = 1.0,
+) -> list[str]:
+    """
+    批量翻译（异步版本）：参数和返回值与 translate_batch 相同
+
+    - 使用 chain.abatch 并发请求
+    - 失败条目的重试也是并发进行的，同样受 max_concurrency 限制
+    """
+    chain = TemplateLibrary.TRANSLATOR | model
+    inputs = [
+        {"source_lang": source_lang, "target_lang": target_lang, "text": text}
+        for text in texts
+    ]
+
+    outputs = await chain.abatch(
+        inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True
+    )
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def retry(inputs_item, output):
+        for attempt in range(max_retries):
+            if not isinstance(output, Exception):
+                break
+            await asyncio.sleep(retry_delay * 2**attempt)
+            async with semaphore:
+                try:
+                    output = await chain.ainvoke(inputs_item)
+                except Exception as e:
+                    output = e
+        return output
+
+    outputs = await asyncio.gather(
+        *(retry(inputs_item, output) for inputs_item, output in zip(inputs, outputs))
+    )
+
+    return [
+        f"翻译失败：{output}" if isinstance(output, Exception) else output.content
+        for output in outputs
+    ]
+
+
 if __name__ == "__main__":
     """测试模板库"""
 
@@ -11,9 +11,9 @@ Langchain 1.0 基础教程 - 提示词模板（Prompt Templates）
 5. 实际应用场景
 """
 
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import sys
+import time
+from pathlib import Path
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.prompts import (
     SystemMessagePromptTemplate,
@@ -21,34 +21,11 @@ from langchain_core.prompts import (
     AIMessagePromptTemplate,
 )
 
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-# 加载环境变量
-load_dotenv()
-
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请现在 .env 文件中设置有效的 QWEN_API_KEY\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费秘钥"
-    )
-
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请现在 .env 文件中设置有效的 QWEN_BASE_URL\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+from common.model_factory import get_chat_model
+from examples.template_library import compile_template, translate_batch
 
 
 # ============================================================================
@@ -70,6 +47,8 @@ def example_1_why_templates():
     print("示例1：为什么需要提示词模板？")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 不推荐：使用字符串拼接
     print("\n【方式1：字符串拼接（不推荐）】")
     print("-" * 40)
@@ -120,6 +99,8 @@ def example_2_prompt_template_basics():
     print("示例2：PromptTemplate 基础用法")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 方法1：使用 from_template （最简单）
     print("\n【方法1：from_template（推荐）】")
     template1 = PromptTemplate.from_template("将以下文本翻译为{language}:\n{text}")
@@ -169,6 +150,8 @@ def example_3_chat_prompt_template():
     print("示例3：ChatPromptTemplate - 聊天消息模板")
     print("=" * 40)
 
+    model = get_chat_model()
+
     print("\n【方法1：元组格式（推荐）】")
 
     chat_template = ChatPromptTemplate.from_messages(
@@ -210,6 +193,8 @@ def example_4_conversation_template():
     print("示例4：多轮对话模板")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 创建包含多轮对话历史的模板
     template = ChatPromptTemplate.from_messages(
         [
@@ -256,6 +241,8 @@ def example_5_message_templates():
     print("示例 5：MessagePromptTemplate 类（高级用法）")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 分别创建不同类型的消息模板
     system_template = SystemMessagePromptTemplate.from_template(
         "你是一个{profession}，你的特长是{specialty}。"
@@ -300,6 +287,8 @@ def example_6_partial_variables():
     print("示例 6：部分变量（Partial Variables）")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 创建原始模板
     original_template = ChatPromptTemplate.from_messages(
         [("system", "你是一名{role}，你的目标用户是{audience}。"), ("user", "请{task}")]
@@ -321,7 +310,9 @@ def example_6_partial_variables():
     print(f"AI 回复：{response1.content[:100]}...\n")
 
     # 复用模板，不同的 task
-    messages2 = partially_filled.format_messages(task="用一句话介绍智能体的运行特点")
+    # 同一个模板需要反复渲染时，可以先预编译：模板只解析一次，之后渲染只需填值拼接
+    compiled_template = compile_template(partially_filled)
+    messages2 = compiled_template.format_messages(task="用一句话介绍智能体的运行特点")
     response2 = model.invoke(messages2)
     print(f"AI 回复：{response2.content[:100]}...\n")
 
@@ -343,6 +334,8 @@ def example_7_lcel_chains():
     print("示例 7：LCEL 链式调用（预览）")
     print("=" * 80)
 
+    model = get_chat_model()
+
     # 创建模板
     template = ChatPromptTemplate.from_messages(
         [("system", "你是一名{role}。"), ("user", "{input}")]
@@ -358,6 +351,45 @@ def example_7_lcel_chains():
     print(f"AI 回复：{response.content[:100]}...\n")
 
 
+# ============================================================================
+# 示例8：批量翻译（batch）
+# ============================================================================
+def example_8_batch_translate():
+    """
+    示例8：使用模板库批量翻译
+
+    - 逐条调用：N 条文本需要 N 次串行请求
+    - 批量调用：translate_batch 内部使用 chain.batch 并发请求
+    - 关键点：
+        - max_concurrency 限制并发数，避免触发服务商的速率限制
+        - 返回结果与输入顺序一致
+        - 失败的条目会单独重试
+    """
+    print("\n" + "=" * 40)
+    print("示例 8：批量翻译")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    texts = [
+        "那个塞尔达荒野之息好玩吗？",
+        "今天天气不错，适合出去走走。",
+        "这家餐厅的菜味道很好，就是有点贵。",
+        "我最近在学习 LangChain。",
+    ]
+
+    start = time.perf_counter()
+    results = translate_batch(
+        model, texts, source_lang="中文", target_lang="英文", max_concurrency=4
+    )
+    elapsed = time.perf_counter() - start
+
+    for text, result in zip(texts, results):
+        print(f"{text} -> {result}")
+
+    print(f"\n共翻译 {len(texts)} 条，耗时 {elapsed:.2f}s")
+
+
 def main():
     """
     主程序：运行所有示例
@@ -373,7 +405,8 @@ def main():
         # example_4_conversation_template()
         # example_5_message_templates()
         # example_6_partial_variables()
-        example_7_lcel_chains()
+        # example_7_lcel_chains()
+        example_8_batch_translate()
 
         print("=" * 80)
         print("所有示例运行完成！")
@@ -0,0 +1,131 @@
+"""
+基准测试：对话历史修剪 - 每轮重新修剪 vs ContextWindow 增量维护
+==============================================
+
+模拟一段很长的对话（默认 10000 轮），每轮追加用户消息与 AI 回复后，取出要发给模型的历史：
+- keep_recent_messages：示例 4 原来的写法，每轮重新拆分 system / 对话消息再切片
+- trim_messages：每轮对完整历史按 token 数修剪（使用按消息缓存的 TokenCounter）
+- ContextWindow：deque + 增量维护的 token 总数，每轮只处理新消息
+
+两种每轮重新修剪的方式在历史很长时非常慢，只在若干历史长度附近各测量一小段轮数，
+输出每轮的平均耗时；ContextWindow 完整跑完全部轮数。
+
+运行方法（在项目根目录下，不需要 API Key，不会请求模型）：
+
+python phase1_fundamentals/03_messages/benchmark_context_window.py
+python phase1_fundamentals/03_messages/benchmark_context_window.py 20000   # 指定轮数
+"""
+
+import sys
+import time
+import warnings
+from pathlib import Path
+
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import trim_messages
+
+from common.context_window import ContextWindow
+from common.token_counter import TokenCounter
+
+
+MAX_TOKENS = 2000  # 窗口的 token 上限
+MAX_PAIRS = 10  # keep_recent_messages 保留的轮数
+SAMPLE_TURNS = 20  # 每个采样点测量的轮数
+
+
+def make_turn(i: int) -> tuple[HumanMessage, AIMessage]:
+    return (
+        HumanMessage(content=f"第 {i} 个问题：下午工作总是犯困怎么办？"),
+        AIMessage(
+            content=f"第 {i} 个回答：起来走动五分钟或做几次深呼吸能有效缓解困意。"
+        ),
+    )
+
+
+def keep_recent_messages(messages, max_pairs=3):
+    """
+    示例 4 原来的写法：每轮重新拆分并切片
+    """
+    system_msgs = [m for m in messages if m.type == "system"]
+    conversation_msgs = [m for m in messages if m.type != "system"]
+    return system_msgs + conversation_msgs[-max_pairs * 2 :]
+
+
+def bench_rebuild(name: str, trim, turns: int) -> None:
+    """
+    在若干历史长度附近各测量 SAMPLE_TURNS 轮，每轮：追加一轮对话 + 修剪完整历史
+    """
+    history = [SystemMessage(content="你是一名智能回答助手。")]
+    samples = sorted({min(turns, n) for n in (1000, turns // 4, turns // 2, turns)})
+    results = []
+    done = 0
+    for sample in samples:
+        # 不计时地把历史补到采样点之前
+        while done < sample - SAMPLE_TURNS:
+            history.extend(make_turn(done))
+            done += 1
+        start = time.perf_counter()
+        measured = 0
+        while done < sample:
+            history.extend(make_turn(done))
+            trim(history)
+            done += 1
+            measured += 1
+        per_turn = (time.perf_counter() - start) / max(measured, 1) * 1000
+        results.append(f"{sample} 轮: {per_turn:.3f} ms/轮")
+    print(f"{name:<24}{'，'.join(results)}")
+
+
+def bench_window(turns: int) -> None:
+    """
+    完整运行全部轮数：每轮追加一轮对话并取出窗口内的消息
+    """
+    window = ContextWindow(
+        max_tokens=MAX_TOKENS, token_counter=TokenCounter().count_message
+    )
+    window.append(SystemMessage(content="你是一名智能回答助手。"))
+    start = time.perf_counter()
+    for i in range(turns):
+        window.extend(make_turn(i))
+        window.messages()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'ContextWindow':<24}全部 {turns} 轮: {elapsed / turns * 1000:.3f} ms/轮"
+        f"（共 {elapsed:.2f} s）"
+    )
+    print(f"{'':<24}{window.stats()}")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    # 无法下载分词器词表时 TokenCounter 会给出警告并改为估算，不影响对比
+    warnings.simplefilter("ignore")
+
+    print(f"{turns} 轮对话，窗口上限 {MAX_TOKENS} tokens\n")
+    bench_rebuild(
+        "keep_recent_messages",
+        lambda history: keep_recent_messages(history, max_pairs=MAX_PAIRS),
+        turns,
+    )
+    counter = TokenCounter()
+    bench_rebuild(
+        "trim_messages",
+        lambda history: trim_messages(
+            history,
+            max_tokens=MAX_TOKENS,
+            token_counter=counter,
+            strategy="last",
+            include_system=True,
+            start_on="human",
+        ),
+        turns,
+    )
+    bench_window(turns)
+
+
+if __name__ == "__main__":
+    main()
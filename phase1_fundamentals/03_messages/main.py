@@ -8,39 +8,15 @@ Langchain 1.0 - 消息类型与对话管理
 3. 消息的修剪和优化
 """
 
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import sys
+from pathlib import Path
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-# 加载环境变量
-load_dotenv()
-
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请现在 .env 文件中设置有效的 QWEN_API_KEY\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费秘钥"
-    )
-
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请现在 .env 文件中设置有效的 QWEN_BASE_URL\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+from common.context_window import ContextWindow
+from common.model_factory import get_chat_model
 
 
 # ============================================================================
@@ -56,6 +32,8 @@ def example_1_message_types():
     print("示例 1：三种消息类型对比")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 方式1：消息对象（啰嗦）
     print("\n【方式1：消息对象】")
     message_obj = [
@@ -88,6 +66,8 @@ def example_2_conversation_history():
     print("示例 2：对话历史管理（重点）")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 初始化对话历史
     conversation = [
         {
@@ -143,6 +123,8 @@ def example_3_wrong_way():
     print("示例 3：错误示范 - AI 失忆")
     print("=" * 70)
 
+    model = get_chat_model()
+
     print("\n错误做法：不保存历史")
 
     # 第一次
@@ -165,34 +147,19 @@ def example_4_optimize_history():
     难点：对话历史太长怎么办？
 
     - 解决方案：
-        1. 只保留最近 N 条
+        1. 只保留最近 N 轮
         2. 总是保留 system 消息
+
+    - 关键点：
+        - 每轮都重新拆分、切片完整历史，历史越长越慢
+        - ContextWindow 用 deque 增量维护窗口，追加消息时只处理这一条消息
+        - 对比见 benchmark_context_window.py
     """
     print("\n" + "=" * 80)
     print("示例 4：优化对话历史（避免太长）")
     print("=" * 80)
 
-    def keep_recent_messages(messages, max_pairs=3):
-        """
-        保留最近的 N 轮对话
-
-        参数：
-            - messages: 完整消息列表
-            - max_pairs: 保留的对话轮数
-
-        返回：
-            - 优化后的消息列表
-        """
-        # 分离 system 消息和对话消息
-        system_msgs = [m for m in messages if m.get("role") == "system"]
-        conversation_msgs = [m for m in messages if m.get("role") != "system"]
-
-        # 只保留最近的消息（每轮 = user + assistant）
-        max_messages = max_pairs * 2
-        recent_msgs = conversation_msgs[-max_messages:]
-
-        # 返回：system + 最近对话
-        return system_msgs + recent_msgs
+    model = get_chat_model()
 
     # 模拟长对话
     long_conversation = [
@@ -225,10 +192,14 @@ def example_4_optimize_history():
 
     print(f"原始消息数：{len(long_conversation)}")
 
-    # 使用优化函数：只保留最近 2 轮
-    optimized = keep_recent_messages(long_conversation, max_pairs=2)
+    # 滑动窗口：system 消息固定保留，只保留最近 3 轮（最近 2 轮对话 + 当前问题）
+    # 实际聊天时每轮 append 新消息即可，超出的旧消息自动淘汰
+    window = ContextWindow(max_turns=3)
+    window.extend(long_conversation)
+    optimized = window.messages()
     print(f"优化后的消息数：{len(optimized)}")
-    print(f"保留的内容：system + 最近2轮对话")
+    print(f"保留的内容：system + 最近2轮对话 + 当前问题")
+    print(f"窗口统计：{window.stats()}")
 
     # 使用优化后的对话历史
     resonse = model.invoke(optimized)
@@ -247,6 +218,8 @@ def example_5_simple_chatbot():
     print("示例5：实战 - 简单聊天机器人")
     print("=" * 40)
 
+    model = get_chat_model()
+
     conversation = [{"role": "system", "content": "你是一个友好的智能回答助手。"}]
 
     questions = [
@@ -0,0 +1,147 @@
+"""
+基准测试：bind_tools 时重复生成工具 schema vs 使用缓存的 schema
+==============================================
+
+按请求创建 Agent 时，每次请求的开销包括：
+1. create_agent - 编译 Agent 图
+2. bind_tools - 把每个工具转换为 OpenAI function schema（每次调用模型前都会执行）
+
+分别用 3、30、300 个工具，对比不使用缓存（每次重新生成 schema）与使用缓存：
+- 按请求创建 Agent 并调用一次模型：不加中间件 vs 加 ToolSchemaCacheMiddleware
+- 预先创建好的 Agent 调用一次模型：不加中间件 vs 加 ToolSchemaCacheMiddleware
+- 单独的 bind_tools：bind_tools(tools) vs bind_tools(tool_schemas(tools))
+
+模型使用 ChatOpenAI 的子类：bind_tools 与真实模型相同，但不发出请求，直接返回固定回复
+
+运行方法（在项目根目录下，不需要 API Key，不会请求模型）：
+
+python phase1_fundamentals/04_custom_tools/benchmark_tool_schemas.py
+python phase1_fundamentals/04_custom_tools/benchmark_tool_schemas.py 50   # 指定重复次数
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from langchain.agents import create_agent
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langchain_openai import ChatOpenAI
+
+from common.tool_schema import ToolSchemaCacheMiddleware, tool_schemas
+
+
+def make_tools(n: int) -> list:
+    """
+    生成 n 个参数相同、名称不同的工具
+    """
+
+    def lookup(city: str, days: int = 1, unit: Optional[str] = None) -> str:
+        """
+        查询城市的数据
+
+        参数：
+            city: 城市名称
+            days: 查询天数
+            unit: 单位
+        """
+        return city
+
+    return [
+        StructuredTool.from_function(
+            func=lookup, name=f"lookup_{i}", description=f"查询第 {i} 类城市数据"
+        )
+        for i in range(n)
+    ]
+
+
+class OfflineChatOpenAI(ChatOpenAI):
+    """
+    bind_tools 与 ChatOpenAI 完全相同，但不发出请求，直接返回固定的回复
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+def bench(func, repeat: int) -> float:
+    """
+    执行 repeat 次，返回每次的平均耗时（毫秒）
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def print_row(n: int, uncached_ms: float, cached_ms: float) -> None:
+    print(
+        f"{n:<10}{uncached_ms:>14.2f}{cached_ms:>14.2f}"
+        f"{uncached_ms / cached_ms:>10.1f}x"
+    )
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    # 不会发出请求
+    model = OfflineChatOpenAI(model="gpt-4o-mini", api_key="benchmark")
+    request = {"messages": [{"role": "user", "content": "北京"}]}
+    header = f"{'工具数':<8}{'无缓存':>11}{'缓存':>12}{'加速比':>9}"
+
+    print(f"每项重复 {repeat} 次，单位：毫秒/次")
+    results = {}
+    for n in (3, 30, 300):
+        tools = make_tools(n)
+        tool_schemas(tools)  # 预热：第一次生成并缓存 schema
+
+        def agent_request(middleware):
+            # 按请求创建 Agent 并调用一次模型
+            create_agent(model=model, tools=tools, middleware=middleware).invoke(
+                request
+            )
+
+        # 预先创建好的 Agent（如 common/agent_pool.py），每次请求只调用一次模型
+        uncached_agent = create_agent(model=model, tools=tools)
+        cached_agent = create_agent(
+            model=model, tools=tools, middleware=[ToolSchemaCacheMiddleware()]
+        )
+
+        results[n] = [
+            (
+                bench(lambda: agent_request([]), repeat),
+                bench(lambda: agent_request([ToolSchemaCacheMiddleware()]), repeat),
+            ),
+            (
+                bench(lambda: uncached_agent.invoke(request), repeat),
+                bench(lambda: cached_agent.invoke(request), repeat),
+            ),
+            (
+                bench(lambda: model.bind_tools(tools), repeat),
+                bench(lambda: model.bind_tools(tool_schemas(tools)), repeat),
+            ),
+        ]
+
+    titles = [
+        "【create_agent + 一次模型调用】不加中间件 vs 加 ToolSchemaCacheMiddleware",
+        "【预先创建的 Agent，一次模型调用】不加中间件 vs 加 ToolSchemaCacheMiddleware",
+        "【bind_tools】bind_tools(tools) vs bind_tools(tool_schemas(tools))",
+    ]
+    for i, title in enumerate(titles):
+        print(f"\n{title}")
+        print(header)
+        for n, rows in results.items():
+            print_row(n, *rows[i])
+
+    print("\n说明：Agent 每次调用模型前都会执行一次 bind_tools，")
+    print("一次请求中模型被调用几次，bind 的开销就重复几次。")
+    print("中间件本身也有开销（多一层 wrap_model_call），工具很少时可能抵消节省的时间。")
+
+
+if __name__ == "__main__":
+    main()
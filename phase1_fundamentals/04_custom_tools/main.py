@@ -8,8 +8,8 @@ LangChain 1.0 - 自定义工具（@tool 装饰器）
 3. 测试工具
 """
 
-import os
 import sys
+from pathlib import Path
 
 
 # Windows 终端编码支持
@@ -25,43 +25,16 @@ if sys.platform == "win32":
     sys.stderr = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
 
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.tools import tool
 
-# 导入自定义工具
-from tools.weather import get_weather
-from tools.calculator import calculator
-from tools.web_search import web_search
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+from common.model_factory import get_chat_model
+from common.tool_schema import tool_schemas
 
-# 加载环境变量
-load_dotenv()
-
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_API_KEY\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费密钥"
-    )
-
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL\n"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+# 导入自定义工具（common/tools 公共工具包，按需加载）
+from common.tools import batch_calculator, calculator, get_weather, web_search
 
 
 # ============================================================================
@@ -213,8 +186,12 @@ def example_5_bind_tools():
     print("示例 5：工具绑定到模型（预览）")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 绑定工具到模型
-    model_with_tools = model.bind_tools([get_weather, calculator])
+    # tool_schemas 缓存每个工具转换后的 schema，重复绑定时不再重新生成
+    # （等价于 model.bind_tools([get_weather, calculator])）
+    model_with_tools = model.bind_tools(tool_schemas([get_weather, calculator]))
 
     print("模型已绑定工具：")
     print(" - get_weather")
@@ -283,6 +260,49 @@ def example_6_best_practices():
     )
 
 
+# ============================================================================
+# 示例 7：批量工具 - 一次调用处理一组数据
+# ============================================================================
+def example_7_batch_calculator():
+    """
+    示例7：批量计算器
+
+    - calculator 一次只能计算一组 (operation, a, b)，
+      "把这 500 个订单金额加起来"需要模型来回调用上百次
+    - batch_calculator 接收数组，用 NumPy 向量化计算，一次工具调用完成
+    - 关键点：
+        - 参数类型可以是 list[float]、list[str]
+        - 工具设计要考虑模型的调用次数：每次工具调用都是一次模型往返
+    """
+    print("\n" + "=" * 40)
+    print("示例 7：批量计算器")
+    print("=" * 40)
+
+    print("\n批量计算器工具参数：")
+    print(batch_calculator.args)
+
+    # 汇总：500 个订单金额求和
+    order_totals = [round(19.9 + i * 0.5, 2) for i in range(500)]
+    print("\n500 个订单金额求和：")
+    print(batch_calculator.invoke({"a": order_totals, "aggregate": "sum"}))
+
+    # 逐项计算：单价 × 数量
+    print("\n每件商品的总价（单价 × 数量）：")
+    print(
+        batch_calculator.invoke(
+            {"a": [12.5, 8.0, 99.9], "b": [4, 10, 1], "operations": ["multiply"]}
+        )
+    )
+
+    # 绑定到模型：模型可以一次调用完成整组计算
+    model = get_chat_model()
+    model_with_tools = model.bind_tools([calculator, batch_calculator])
+    response = model_with_tools.invoke(
+        f"这些订单金额的总和与平均值分别是多少？{order_totals[:20]}"
+    )
+    print(f"\n工具调用：{response.tool_calls}")
+
+
 # ============================================================================
 # 主程序
 # ============================================================================
@@ -297,7 +317,8 @@ def main():
         # example_3_multiple_params()
         # example_4_optional_params()
         # example_5_bind_tools()
-        example_6_best_practices()
+        # example_6_best_practices()
+        example_7_batch_calculator()
 
         print("\n" + "=" * 80)
         print("完成！")
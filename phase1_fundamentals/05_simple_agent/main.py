@@ -13,45 +13,22 @@ LangChain 1.0 - Simple Agent (使用 creat_agent)
 - 旧的 `create_react_agent` （langgraph.prebuilt）已弃用
 """
 
-import os
+import asyncio
 import sys
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import time
+from pathlib import Path
 from langchain.agents import create_agent  # LangChain 1.0 API
 from langgraph.checkpoint.memory import MemorySaver  # 用于多轮对话
 
-# 导入自定义工具
-from tools.weather import get_weather
-from tools.calculator import calculator
-from tools.web_search import web_search
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-# 加载环境变量
-load_dotenv()
+from common.agent_pool import get_agent, get_agent_pool
+from common.agent_runner import run_conversations
+from common.model_factory import get_chat_model
 
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_API_KEY"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费密钥"
-    )
-
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+# 导入自定义工具（common/tools 公共工具包，按需加载）
+from common.tools import calculator, get_weather, web_search
 
 
 # ============================================================================
@@ -70,6 +47,8 @@ def example_1_basic_agent():
     print("示例1：创建第一个 Agent")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model,
         tools=[get_weather],  # 只给一个工具
@@ -79,6 +58,7 @@ def example_1_basic_agent():
     print("\nAgent 创建成功！")
     print("配置的工具：get_weather")
     print("使用 LangChain 1.0 API: create_agent")
+    # 之后的示例使用 get_agent：参数与 create_agent 相同，相同配置的 Agent 只编译一次（见示例7）
 
     # 测试：需要工具的问题
     print("\n测试1：询问天气（需要工具）")
@@ -118,8 +98,10 @@ def example_2_multi_tool_agent():
     print("示例2：多工具 Agent")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 创建配置多个工具的 Agent
-    agent = create_agent(
+    agent = get_agent(
         model=model,
         tools=[get_weather, calculator, web_search],
         system_prompt="你是一名智能助手。",
@@ -164,6 +146,8 @@ def example_3_agent_with_system_prompt():
     print("示例3：自定义 Agent 行为")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # create_agent 使用 system_prompt 参数（字符串或SystemMessage）
     system_messages = """你是一个友好的智能助手。
     特点：
@@ -171,7 +155,7 @@ def example_3_agent_with_system_prompt():
         - 使用工具前会先说明
         - 结果用表格或列表清晰展示"""
 
-    agent = create_agent(
+    agent = get_agent(
         model=model,
         tools=[get_weather, calculator, web_search],
         system_prompt=system_messages,  # 使用 system_prompt 参数
@@ -203,7 +187,9 @@ def example_4_agent_execution_details():
     print("示例4：Agent 执行过程详解")
     print("=" * 40)
 
-    agent = create_agent(
+    model = get_chat_model()
+
+    agent = get_agent(
         model=model, tools=[calculator], system_prompt="你是一个智能助手。"
     )
 
@@ -242,10 +228,12 @@ def example_5_multi_turn_agent():
     print("示例5：多轮对话 Agent")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 创建内存检查点
     memory = MemorySaver()
     # 创建带记忆的 Agent
-    agent = create_agent(
+    agent = get_agent(
         model=model,
         tools=[calculator],
         system_prompt="你是一个智能助手。",
@@ -276,6 +264,109 @@ def example_5_multi_turn_agent():
     print(f"Agent: {response2["messages"][-1].content}")
 
 
+# ============================================================================
+# 示例6：异步并发运行多个会话（ainvoke）
+# ============================================================================
+def example_6_async_concurrent_agents():
+    """
+    示例6：异步并发运行多个会话
+
+    - invoke 是同步调用：等待模型响应时线程在空等，多个会话只能一个接一个处理
+    - ainvoke 是异步调用：一个会话等待模型时，事件循环可以推进其他会话
+    - 关键点：
+        - run_conversations 使用 asyncio.Semaphore 限制同时进行的会话数
+        - 每个会话使用独立的 thread_id，互不干扰
+        - 报告吞吐量（conversations/sec）
+    """
+    print("\n" + "=" * 40)
+    print("示例6：异步并发运行多个会话")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    agent = get_agent(
+        model=model,
+        tools=[get_weather, calculator],
+        system_prompt="你是一名智能助手，回答简洁。",
+        checkpointer=MemorySaver(),
+    )
+
+    # 模拟多个用户同时发起的会话（每个会话可以有多轮）
+    conversations = [
+        ["北京今天的天气怎么样？"],
+        ["上海的天气怎么样？"],
+        ["15*30等于多少？"],
+        ["10 加 5 等于多少？", "再乘以 3 呢？"],
+        ["深圳天气如何？"],
+        ["100 除以 4 等于多少？"],
+    ]
+
+    report = asyncio.run(run_conversations(agent, conversations, max_concurrency=4))
+
+    for turns, result in zip(conversations, report.results):
+        print(f"\n[{result.conversation_id}] {' -> '.join(turns)}")
+        if result.error:
+            print(f"失败：{result.error}")
+        else:
+            print(f"Agent 回复（{result.latency:.2f}s）：{result.final_answer}")
+
+    serial_time = sum(r.latency for r in report.results)
+    print("\n" + "=" * 40)
+    print(f"会话数：{len(report.results)}，失败：{report.failed}")
+    print(f"并发总耗时：{report.wall_time:.2f}s（串行约需 {serial_time:.2f}s）")
+    print(f"吞吐量：{report.conversations_per_second:.2f} conversations/sec")
+
+
+# ============================================================================
+# 示例 7：复用编译好的 Agent（Agent 复用池）
+# ============================================================================
+def example_7_agent_pool():
+    """
+    示例7：复用编译好的 Agent
+
+    - create_agent 每次都会构建并编译一个新的图，按请求创建 Agent 时这部分耗时计入每个请求
+    - get_agent 参数与 create_agent 相同，相同配置（模型、工具、系统提示词、中间件）只编译一次
+    - 关键点：
+        - 编译好的 Agent 是无状态的，对话状态保存在 checkpointer 中，可以被并发复用
+        - 每个请求可以传入自己的 checkpointer，复用编译结果时只做一次轻量的绑定
+        - get_agent_pool().stats() 查看编译次数、命中次数和节省的编译时间
+    """
+    print("\n" + "=" * 40)
+    print("示例7：复用编译好的 Agent")
+    print("=" * 40)
+
+    model = get_chat_model()
+    tools = [get_weather, calculator]
+    system_prompt = "你是一名智能助手，回答简洁。"
+    requests = 100
+
+    # 每个请求都重新创建 Agent
+    start = time.perf_counter()
+    for _ in range(requests):
+        create_agent(model=model, tools=tools, system_prompt=system_prompt)
+    create_time = time.perf_counter() - start
+
+    # 每个请求从复用池获取 Agent（每个请求使用独立的 checkpointer）
+    start = time.perf_counter()
+    for _ in range(requests):
+        get_agent(
+            model=model,
+            tools=tools,
+            system_prompt=system_prompt,
+            checkpointer=MemorySaver(),
+        )
+    pool_time = time.perf_counter() - start
+
+    print(f"\n{requests} 个请求创建 Agent 的总耗时：")
+    print(f"create_agent：{create_time * 1000:.1f}ms")
+    print(f"get_agent：{pool_time * 1000:.1f}ms")
+
+    stats = get_agent_pool().stats()
+    print(f"\n复用池统计：编译 {stats['compiles']} 次，命中 {stats['hits']} 次")
+    print(f"累计编译耗时：{stats['compile_time'] * 1000:.1f}ms")
+    print(f"节省的编译耗时：{stats['compile_time_saved'] * 1000:.1f}ms")
+
+
 # ============================================================================
 # 主程序
 # ============================================================================
@@ -289,7 +380,9 @@ def main():
         # example_2_multi_tool_agent()
         # example_3_agent_with_system_prompt()
         # example_4_agent_execution_details()
-        example_5_multi_turn_agent()
+        # example_5_multi_turn_agent()
+        # example_6_async_concurrent_agents()
+        example_7_agent_pool()
 
         print("\n" + "=" * 80)
         print("完成！")
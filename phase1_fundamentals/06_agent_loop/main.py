@@ -22,42 +22,21 @@ ReAct 循环：
     - 在学习本代码时，需时刻对照 agent.stream(...) 返回的 chunk/chunk.items() 的值，从而可以观察到代码中 tool_calls 和 content 的获取方法
 """
 
-import os
+import asyncio
 import sys
+import time
+from pathlib import Path
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain.agents import create_agent
-from tools.calculator import calculator
-from tools.weather import get_weather
+from langchain_core.tools import tool
 
-# 加载环境变量
-load_dotenv()
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_API_KEY"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费密钥"
-    )
-
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+from common.agent_runner import run_conversations
+from common.model_factory import get_chat_model
+from common.tool_timeout import ToolTimeoutMiddleware
+from common.tools import calculate_expression, calculator, get_weather
 
 
 # ==============================================================================
@@ -82,6 +61,8 @@ def example_1_understand_loop():
     print("示例1：Agent 执行循环详解")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model, tools=[calculator], system_prompt="你是一个智能助手。"
     )
@@ -126,6 +107,8 @@ def example_2_streaming():
     print("示例2：流式输出 Graph State")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model, tools=[calculator, get_weather], system_prompt="你是一名智能助手。"
     )
@@ -184,6 +167,8 @@ def example_3_multi_step():
     print("示例 3：多步骤执行")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model,
         tools=[calculator],
@@ -223,6 +208,8 @@ def example_4_inspect_state():
     print("示例 4：查看中间状态")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model, tools=[calculator], system_prompt="你是一名智能助手。"
     )
@@ -268,6 +255,8 @@ def example_5_message_types():
     print("示例 5：消息类型详解")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model, tools=[get_weather], system_prompt="你是一名智能助手。"
     )
@@ -315,6 +304,172 @@ def example_5_message_types():
             print(f"结果：{msg.content}")
 
 
+# ==============================================================================
+# 示例6：异步流式执行多个会话（astream）
+# ==============================================================================
+def example_6_async_streaming():
+    """
+    示例6：异步流式执行多个会话
+
+    - astream 是 stream 的异步版本
+    - 多个会话的执行循环交替推进：谁的模型/工具先返回，谁就先输出
+    - 关键点：
+        - 每个节点（model / tools）执行完成后都会触发一次回调
+        - 输出带有会话 ID，可以看到多个会话是交错执行的
+        - 总耗时约等于最慢的会话，而不是所有会话之和
+    """
+    print("\n" + "=" * 40)
+    print("示例 6：异步流式执行多个会话")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    agent = create_agent(
+        model=model, tools=[calculator, get_weather], system_prompt="你是一名智能助手。"
+    )
+
+    conversations = [
+        ["北京天气如何？"],
+        ["100 除以 5 等于多少？"],
+        ["上海天气如何？然后计算 4 * 25"],
+    ]
+
+    def on_chunk(conversation_id, chunk):
+        # chunk 与 agent.stream() 的输出相同：{节点名: 状态更新}
+        for node, state in chunk.items():
+            if state and "messages" in state:
+                msg = state["messages"][-1]
+                if hasattr(msg, "tool_calls") and msg.tool_calls:
+                    print(f"[{conversation_id}][{node}] 调用工具：{msg.tool_calls}")
+                elif hasattr(msg, "content") and msg.content:
+                    print(f"[{conversation_id}][{node}] {msg.content}")
+
+    report = asyncio.run(
+        run_conversations(
+            agent, conversations, max_concurrency=3, stream=True, on_chunk=on_chunk
+        )
+    )
+
+    print("\n" + "=" * 40)
+    print(f"并发总耗时：{report.wall_time:.2f}s")
+    print(f"吞吐量：{report.conversations_per_second:.2f} conversations/sec")
+
+
+# ==============================================================================
+# 示例7：并行执行独立的工具调用 + 单工具超时
+# ==============================================================================
+@tool
+def get_air_quality(city: str) -> str:
+    """
+    查询指定城市的空气质量（模拟一个较慢的外部 API）
+
+    参数：
+        city: 城市名称，如"北京"、"上海"
+
+    返回：
+        空气质量信息字符串
+    """
+    # 模拟网络延迟；"成都"模拟接口卡住的情况
+    time.sleep(10 if city == "成都" else 1)
+    return f"{city}空气质量：良，AQI 65"
+
+
+def example_7_parallel_tools():
+    """
+    示例7：并行执行独立的工具调用
+
+    - 模型在一条 AIMessage 中返回多个 tool_calls 时，这些调用彼此独立
+    - create_agent 的工具节点会并行执行它们：
+        - invoke / stream：放入线程池，并发数由 config["max_concurrency"] 控制
+        - ainvoke / astream：asyncio.gather 并发执行
+    - 关键点：
+        - 工具阶段耗时约等于最慢的调用，而不是所有调用之和
+        - ToolTimeoutMiddleware 为单个工具设置超时，卡住的工具不会拖住整个 Agent
+        - 超时的调用返回一条错误 ToolMessage，模型可以据此继续回答
+    """
+    print("\n" + "=" * 40)
+    print("示例 7：并行执行独立的工具调用")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    agent = create_agent(
+        model=model,
+        tools=[get_air_quality, get_weather],
+        system_prompt="你是一名智能助手。需要查询多个城市时，请在一次回复中同时调用所有工具。",
+        middleware=[ToolTimeoutMiddleware(timeouts={"get_air_quality": 3.0})],
+    )
+
+    start = time.perf_counter()
+    response = None
+    for chunk in agent.stream(
+        {"messages": [{"role": "user", "content": "北京、上海、成都的空气质量和天气分别如何？"}]},
+        config={"max_concurrency": 8},
+        stream_mode="updates",
+    ):
+        for node, state in chunk.items():
+            if not state or "messages" not in state:
+                continue
+            elapsed = time.perf_counter() - start
+            if node == "tools":
+                # 每个工具调用完成后单独返回一次更新，可以看到它们几乎同时开始
+                for msg in state["messages"]:
+                    print(f"[{elapsed:.2f}s] {msg.name}（{msg.status}）：{msg.content}")
+            else:
+                msg = state["messages"][-1]
+                if msg.tool_calls:
+                    print(f"[{elapsed:.2f}s] 模型请求 {len(msg.tool_calls)} 个工具调用")
+                else:
+                    response = msg.content
+
+    print(f"\n最终回答：{response}")
+    print(f"总耗时：{time.perf_counter() - start:.2f}s")
+    print("（3 次空气质量查询若串行执行至少需要 12s；并行 + 超时后工具阶段约 3s）")
+
+
+# ==============================================================================
+# 示例8：表达式计算器 - 多步计算合并为一次工具调用
+# ==============================================================================
+def example_8_expression_calculator():
+    """
+    示例8：表达式计算器
+
+    - calculator 只支持两个数的运算，"先算 10 加 20，再乘以 3，再减去 4 除以 2"
+      需要模型一步步调用，每一步都是一次完整的模型往返
+    - calculate_expression 接收完整的算术表达式，一次工具调用得到结果
+    - 关键点：
+        - 对比两种工具下的模型调用次数和工具调用次数
+        - 表达式用 ast 解析并限制语法，不会执行任意代码
+    """
+    print("\n" + "=" * 40)
+    print("示例 8：表达式计算器")
+    print("=" * 40)
+
+    model = get_chat_model()
+    question = "先算 10 加 20，然后把结果乘以 3，再减去 4 除以 2 的结果"
+
+    for calc_tool in [calculator, calculate_expression]:
+        agent = create_agent(
+            model=model,
+            tools=[calc_tool],
+            system_prompt="你是一名数学助手，请使用工具完成计算。",
+        )
+
+        start = time.perf_counter()
+        response = agent.invoke({"messages": [{"role": "user", "content": question}]})
+        elapsed = time.perf_counter() - start
+
+        # 每条 AIMessage 对应一次模型调用
+        model_calls = sum(1 for msg in response["messages"] if msg.type == "ai")
+        tool_calls_count = sum(
+            len(msg.tool_calls) for msg in response["messages"] if msg.type == "ai"
+        )
+
+        print(f"\n使用工具：{calc_tool.name}")
+        print(f"模型调用次数：{model_calls}，工具调用次数：{tool_calls_count}，耗时：{elapsed:.2f}s")
+        print(f"最终回答：{response['messages'][-1].content}")
+
+
 # ==============================================================================
 # 主程序
 # ==============================================================================
@@ -328,7 +483,10 @@ def main():
         # example_2_streaming()
         # example_3_multi_step()
         # example_4_inspect_state()
-        example_5_message_types()
+        # example_5_message_types()
+        # example_6_async_streaming()
+        # example_7_parallel_tools()
+        example_8_expression_calculator()
 
         print("\n" + "=" * 80)
         print("完成！")
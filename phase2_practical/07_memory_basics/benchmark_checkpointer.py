@@ -0,0 +1,149 @@
+"""
+基准测试：InMemorySaver vs SQLiteSaver 的 checkpoint 写入与读取速度
+==============================================
+
+1. 先用不请求网络的假模型运行 Agent，记录下多个会话多轮对话中
+   checkpointer 收到的全部 put / put_writes 调用
+2. 把这些调用原样重放给不同的 checkpointer，统计每秒写入的 checkpoint 数：
+   - InMemorySaver：状态只保存在内存中（上限参考）
+   - SQLiteSaver（逐次提交）：每次 put_writes 都单独提交一个事务
+   - SQLiteSaver（按超级步批量）：put_writes 缓冲，与超级步结束时的 put 一起提交
+3. 写入的同时用多个线程读取各会话的最新状态（get_tuple），统计每秒读取次数
+
+运行方法（在项目根目录下，不需要 API Key，不会请求模型）：
+
+python phase2_practical/07_memory_basics/benchmark_checkpointer.py
+python phase2_practical/07_memory_basics/benchmark_checkpointer.py 50   # 指定每个会话的轮数
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.checkpoint.memory import InMemorySaver
+
+from common.checkpointer import SQLiteSaver
+
+
+THREADS = 8  # 会话数
+READERS = 4  # 并发读取状态的线程数
+
+
+class RecordingSaver(InMemorySaver):
+    """
+    记录 Agent 运行时对 checkpointer 的全部写入调用
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self.calls.append(("put", (config, checkpoint, metadata, new_versions)))
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self.calls.append(("put_writes", (config, writes, task_id, task_path)))
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+class UnbatchedSQLiteSaver(SQLiteSaver):
+    """
+    对照组：每次 put_writes 都立即提交
+    """
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        super().put_writes(config, writes, task_id, task_path)
+        self.flush()
+
+
+def record(turns: int) -> list:
+    """
+    运行 THREADS 个会话、每个会话 turns 轮对话，返回记录的写入调用
+    """
+    recorder = RecordingSaver()
+    model = FakeListChatModel(responses=["好的，我记住了，还有什么可以帮您？"])
+    agent = create_agent(model=model, tools=[], checkpointer=recorder)
+    for j in range(turns):
+        for i in range(THREADS):
+            agent.invoke(
+                {"messages": [{"role": "user", "content": f"第 {j} 轮：我的订单还没到"}]},
+                {"configurable": {"thread_id": f"bench-{i}"}},
+            )
+    return recorder.calls
+
+
+def replay(saver, calls: list) -> tuple[float, int]:
+    """
+    把记录的调用重放给 saver，同时 READERS 个线程读取最新状态
+
+    返回：
+        (写入耗时秒数, 读取次数)
+    """
+    done = threading.Event()
+    reads = [0] * READERS
+
+    def reader(i: int):
+        config = {"configurable": {"thread_id": f"bench-{i % THREADS}"}}
+        while not done.is_set():
+            saver.get_tuple(config)
+            reads[i] += 1
+            time.sleep(0)  # 让出 GIL，避免读取线程挤占写入线程
+
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    for t in readers:
+        t.start()
+
+    start = time.perf_counter()
+    for method, args in calls:
+        getattr(saver, method)(*args)
+    if isinstance(saver, SQLiteSaver):
+        saver.flush()
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    for t in readers:
+        t.join()
+    return elapsed, sum(reads)
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    calls = record(turns)
+    checkpoints = sum(1 for method, _ in calls if method == "put")
+    print(
+        f"{THREADS} 个会话 × {turns} 轮对话：{checkpoints} 个 checkpoint，"
+        f"{len(calls) - checkpoints} 次 put_writes；同时 {READERS} 个线程读取状态"
+    )
+    print(f"{'checkpointer':<30}{'checkpoint/秒':>14}{'读取/秒':>10}{'事务数':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        savers = [
+            ("InMemorySaver", InMemorySaver()),
+            ("SQLiteSaver（逐次提交）", UnbatchedSQLiteSaver(Path(tmp) / "a.sqlite")),
+            ("SQLiteSaver（按超级步批量）", SQLiteSaver(Path(tmp) / "b.sqlite")),
+        ]
+        for name, saver in savers:
+            elapsed, reads = replay(saver, calls)
+            transactions = "-"
+            if isinstance(saver, SQLiteSaver):
+                transactions = saver.stats()["transactions"]
+                saver.close()
+            print(
+                f"{name:<30}{checkpoints / elapsed:>14.0f}"
+                f"{reads / elapsed:>10.0f}{transactions:>8}"
+            )
+
+    print("\n说明：SQLiteSaver 的状态保存在磁盘上，进程重启后仍可按 thread_id 恢复对话。")
+
+
+if __name__ == "__main__":
+    main()
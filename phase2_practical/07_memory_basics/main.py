@@ -7,43 +7,24 @@ LangChain 1.0 - Memory Basics(内存管理基础)
 2. checkpointer 参数 - 为 Agent 添加内存
 3. thread_id - 会话管理
 4. 多轮对话状态保持
+5. SQLiteSaver - 持久化到本地 SQLite 的 checkpointer
+6. DeltaAgentState - 增量保存消息历史，减小 checkpoint 占用
+7. BoundedInMemorySaver - 限制内存中的会话数，超出的会话溢出到磁盘
 """
 
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-from langchain.agents import create_agent
+import sys
+from pathlib import Path
 from langchain_core.tools import tool
 from langgraph.checkpoint.memory import InMemorySaver
 
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-# 加载环境变量
-load_dotenv()
-
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_API_KEY"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费密钥"
-    )
-
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
-)
+from common.agent_pool import get_agent
+from common.bounded_checkpointer import BoundedInMemorySaver
+from common.checkpointer import SQLiteSaver
+from common.delta_state import DeltaAgentState, checkpoint_storage_bytes
+from common.model_factory import get_chat_model
 
 
 # 创建一个简单的工具
@@ -72,8 +53,10 @@ def example_1_no_memory():
     print("示例 1：没有内存的 Agent")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 创建没有 checkpointer 的 Agent
-    agent = create_agent(model=model, tools=[], system_prompt="你是一名智能助手。")
+    agent = get_agent(model=model, tools=[], system_prompt="你是一名智能助手。")
 
     print("\n第一轮对话：")
     response1 = agent.invoke({"messages": [{"role": "user", "content": "我叫哈利"}]})
@@ -100,8 +83,10 @@ def example_2_with_memory():
     print("示例 2：使用 InMemorySaver 添加短期内存")
     print("=" * 40)
 
+    model = get_chat_model()
+
     # 创建带内存的 Agent
-    agent = create_agent(
+    agent = get_agent(
         model=model,
         tools=[],
         system_prompt="你是一名智能助手。",
@@ -143,7 +128,9 @@ def example_3_multiple_threads():
     print("示例 3：多个独立会话")
     print("=" * 40)
 
-    agent = create_agent(
+    model = get_chat_model()
+
+    agent = get_agent(
         model=model,
         tools=[],
         system_prompt="你是一名智能助手。",
@@ -197,7 +184,9 @@ def example_4_memory_with_tools():
     print("示例 4：内存 + 工具调用")
     print("=" * 40)
 
-    agent = create_agent(
+    model = get_chat_model()
+
+    agent = get_agent(
         model=model,
         tools=[get_user_info],
         system_prompt="你是一名智能助手。",
@@ -243,7 +232,9 @@ def example_5_inspect_memory():
     print("示例 5：查看内存状态")
     print("=" * 40)
 
-    agent = create_agent(
+    model = get_chat_model()
+
+    agent = get_agent(
         model=model,
         tools=[],
         system_prompt="你是一名智能助手。",
@@ -290,7 +281,9 @@ def example_6_practical_use():
     print("示例 6：实际应用 - 客服机器人")
     print("=" * 80)
 
-    agent = create_agent(
+    model = get_chat_model()
+
+    agent = get_agent(
         model=model,
         tools=[get_user_info],
         system_prompt="""你是一个客服助手。
@@ -300,6 +293,7 @@ def example_6_practical_use():
         - 使用 get_user_info 工具查询用户信息时需要用户 ID
 """,
         checkpointer=InMemorySaver(),
+        state_schema=DeltaAgentState,  # 长会话：每一步只保存新增的消息（见示例 8）
     )
 
     # 模拟用户会话
@@ -324,6 +318,176 @@ def example_6_practical_use():
         print(f"客服回复：{response["messages"][-1].content}")
 
 
+# ============================================================================
+# 示例7：持久化内存 - SQLiteSaver
+# ============================================================================
+def example_7_sqlite_checkpointer():
+    """
+    示例7：使用 SQLiteSaver 把对话状态持久化到本地文件
+
+    - InMemorySaver 的问题：进程重启后所有会话丢失，会话越多占用内存越大
+
+    - 关键点：
+        - SQLiteSaver 与 InMemorySaver 用法相同，直接传给 checkpointer
+        - 状态保存在 .cache/checkpoints.sqlite，重新打开后按 thread_id 恢复对话
+        - 一个超级步的写入在一个事务中提交，多个线程可以同时读取
+    """
+    print("\n" + "=" * 40)
+    print("示例 7：持久化内存 - SQLiteSaver")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    config = {"configurable": {"thread_id": "sqlite_demo"}}
+
+    # 第一个“进程”：对话后关闭 checkpointer
+    print("\n[第一次运行]")
+    saver = SQLiteSaver()
+    saver.delete_thread("sqlite_demo")  # 清理上次运行留下的同名会话
+    agent = get_agent(
+        model=model,
+        tools=[],
+        system_prompt="你是一名智能助手。",
+        checkpointer=saver,
+    )
+    response = agent.invoke(
+        {"messages": [{"role": "user", "content": "我叫哈利，住在女贞路 4 号"}]},
+        config=config,
+    )
+    print(f"Agent 回复：{response["messages"][-1].content}")
+    print(f"写入统计：{saver.stats()}")
+    saver.close()
+
+    # 模拟重启：重新打开同一个数据库文件
+    print("\n[重启后]")
+    saver = SQLiteSaver()
+    agent = get_agent(
+        model=model,
+        tools=[],
+        system_prompt="你是一名智能助手。",
+        checkpointer=saver,
+    )
+    state = agent.get_state(config)
+    print(f"恢复的消息数：{len(state.values["messages"])}")
+
+    response = agent.invoke(
+        {"messages": [{"role": "user", "content": "我叫什么？住在哪里？"}]},
+        config=config,
+    )
+    print(f"Agent 回复：{response["messages"][-1].content}")
+    saver.close()
+
+
+# ============================================================================
+# 示例8：增量保存消息历史 - DeltaAgentState
+# ============================================================================
+def example_8_delta_checkpoints():
+    """
+    示例8：对比完整保存与增量保存消息历史的 checkpoint 占用
+
+    - 问题：示例 5 中可以看到，每个 checkpoint 都保存了完整的 messages 列表，
+      n 步的会话共保存约 n²/2 条消息
+
+    - 关键点：
+        - state_schema=DeltaAgentState：每一步只保存新增 / 修改的消息
+        - 读取状态时从最近的快照开始重放写入，得到的消息历史完全相同
+        - 会话越长，节省的空间越多
+    """
+    print("\n" + "=" * 40)
+    print("示例 8：增量保存消息历史")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    conversations = [
+        "你好，我想咨询一下",
+        "我的用户 ID 是 1206",
+        "帮我查一下我的信息",
+        "我的订单号是 A-2024-0817，还没有发货",
+        "能帮我催一下吗？",
+        "我多大来着？",
+        "我的订单号是多少？",
+        "好的，谢谢",
+    ]
+
+    results = {}
+    for name, state_schema in [("完整保存", None), ("增量保存", DeltaAgentState)]:
+        saver = InMemorySaver()
+        agent = get_agent(
+            model=model,
+            tools=[get_user_info],
+            system_prompt="你是一个客服助手，能够记住用户说过的话。",
+            checkpointer=saver,
+            state_schema=state_schema,
+        )
+        config = {"configurable": {"thread_id": "delta_demo"}}
+
+        for user_msg in conversations:
+            agent.invoke(
+                {"messages": [{"role": "user", "content": user_msg}]}, config=config
+            )
+
+        messages = agent.get_state(config).values["messages"]
+        checkpoints = len(list(saver.list(config)))
+        size = checkpoint_storage_bytes(saver)
+        results[name] = size
+        print(
+            f"{name}：消息数 {len(messages)}，checkpoint 数 {checkpoints}，"
+            f"存储 {size / 1024:.1f} KB"
+        )
+
+    print(f"\n增量保存的占用为完整保存的 {results["增量保存"] / results["完整保存"]:.0%}")
+
+
+# ============================================================================
+# 示例9：限制内存中的会话数 - BoundedInMemorySaver
+# ============================================================================
+def example_9_bounded_memory():
+    """
+    示例9：会话很多时，限制内存占用
+
+    - 问题：示例 3 中一个 InMemorySaver 永久保存所有 thread_id 的状态，
+      服务端会话越来越多，内存只增不减
+
+    - 关键点：
+        - max_threads / max_bytes 限制内存中的会话数与字节数
+        - 超出上限时，最久未访问的会话被写入磁盘并移出内存
+        - 再次访问该 thread_id 时自动加载回来，Agent 仍然记得之前的对话
+    """
+    print("\n" + "=" * 40)
+    print("示例 9：限制内存中的会话数")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    # 内存中最多保留 2 个会话
+    saver = BoundedInMemorySaver(max_threads=2)
+    agent = get_agent(
+        model=model,
+        tools=[],
+        system_prompt="你是一名智能助手。",
+        checkpointer=saver,
+    )
+
+    users = ["Alice", "Bob", "Carol", "Dave"]
+    for name in users:
+        config = {"configurable": {"thread_id": f"user_{name}"}}
+        agent.invoke(
+            {"messages": [{"role": "user", "content": f"我叫 {name}"}]}, config=config
+        )
+        print(f"[{name}] 我叫 {name}  ->  {saver.stats()}")
+
+    # Alice 的会话已经被移到磁盘，再次访问时自动加载
+    print("\n[回到会话 - Alice]")
+    config = {"configurable": {"thread_id": "user_Alice"}}
+    response = agent.invoke(
+        {"messages": [{"role": "user", "content": "我叫什么？"}]}, config=config
+    )
+    print(f"Agent 回复：{response["messages"][-1].content}")
+    print(f"统计：{saver.stats()}")
+    saver.close()
+
+
 # ============================================================================
 # 主程序
 # ============================================================================
@@ -338,7 +502,10 @@ def main():
         # example_3_multiple_threads()
         # example_4_memory_with_tools()
         # example_5_inspect_memory()
-        example_6_practical_use()
+        # example_6_practical_use()
+        # example_7_sqlite_checkpointer()
+        # example_8_delta_checkpoints()
+        example_9_bounded_memory()
 
         print("\n" + "=" * 80)
         print(" 完成！")
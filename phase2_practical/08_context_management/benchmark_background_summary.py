@@ -0,0 +1,110 @@
+"""
+基准测试：同步摘要 vs 后台预先生成摘要 - 每一轮的响应时间
+==============================================
+
+用不请求网络的假模型模拟多轮对话，摘要模型每次调用固定耗时 0.5 秒，
+对比 SummarizationMiddleware 与 BackgroundSummarizationMiddleware：
+- 每一轮的最长响应时间、明显变慢（超过 0.3 秒）的轮数
+- 后台摘要次数、退回同步摘要的次数
+
+分两种对话：
+- 短回复：每轮新增的 token 较少，token 数会先经过 prefetch_ratio × 阈值，再达到阈值
+- 长回复：每轮新增的 token 超过阈值的 20%，只在模型调用前检查时会直接越过
+  prefetch_ratio × 阈值（80%），必须在模型回复之后也检查，才能提前开始生成摘要
+
+每轮之间暂停 0.6 秒，模拟用户阅读回复、输入下一个问题的时间。
+
+运行方法（在项目根目录下，不需要 API Key，不会请求模型）：
+
+python phase2_practical/08_context_management/benchmark_background_summary.py
+python phase2_practical/08_context_management/benchmark_background_summary.py 20   # 指定轮数
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from langchain.agents import create_agent
+from langchain.agents.middleware import SummarizationMiddleware
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.checkpoint.memory import InMemorySaver
+
+from common.background_summary import BackgroundSummarizationMiddleware
+from common.token_counter import get_token_counter
+
+
+SUMMARY_SECONDS = 0.5  # 摘要模型每次调用的耗时
+THINK_SECONDS = 0.6  # 两轮之间用户的思考时间
+SLOW_SECONDS = 0.3  # 超过这个时间的一轮算作明显变慢
+
+REPLIES = {
+    "短回复": "好的，我记住了，还有什么可以帮您？",
+    "长回复": "好的，我记住了。" + "这是一段比较长的回复内容，" * 6,
+}
+
+
+def run(middleware, reply: str, turns: int) -> list[float]:
+    """
+    运行一段对话，返回每一轮的响应时间（秒）
+    """
+    agent = create_agent(
+        model=FakeListChatModel(responses=[reply]),
+        tools=[],
+        checkpointer=InMemorySaver(),
+        middleware=[middleware],
+    )
+    config = {"configurable": {"thread_id": "bench"}}
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        agent.invoke(
+            {"messages": [{"role": "user", "content": f"第{i}轮：我在学习LangChain。"}]},
+            config,
+        )
+        latencies.append(time.perf_counter() - start)
+        time.sleep(THINK_SECONDS)
+    return latencies
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+
+    options = {
+        "trigger": ("tokens", 300),
+        "keep": ("messages", 2),
+        "token_counter": get_token_counter(),
+    }
+    middlewares = {
+        "同步摘要": lambda model: SummarizationMiddleware(model=model, **options),
+        "后台摘要": lambda model: BackgroundSummarizationMiddleware(
+            model=model, **options
+        ),
+    }
+
+    print(f"每段对话 {turns} 轮，摘要模型耗时 {SUMMARY_SECONDS}s，阈值 300 tokens")
+    print(
+        f"{'对话':<8}{'中间件':<8}{'最慢一轮(s)':>12}{'变慢的轮数':>10}"
+        f"{'后台摘要':>10}{'同步摘要':>10}"
+    )
+    for name, reply in REPLIES.items():
+        for label, make in middlewares.items():
+            summary_model = FakeListChatModel(
+                responses=["用户在学习 LangChain。"], sleep=SUMMARY_SECONDS
+            )
+            middleware = make(summary_model)
+            latencies = run(middleware, reply, turns)
+            slow = sum(latency > SLOW_SECONDS for latency in latencies)
+
+            stats = getattr(middleware, "stats", None)
+            stats = stats() if stats else {"prefetched": "-", "inline": "-"}
+            print(
+                f"{name:<8}{label:<8}{max(latencies):>14.2f}{slow:>12}"
+                f"{stats['prefetched']:>14}{stats['inline']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+基准测试：checkpoint 序列化 - JsonPlusSerializer vs CompactSerializer
+==============================================
+
+用不请求网络的假模型，按本章示例的对话内容模拟几段长对话（含工具调用与 token 用量元数据），
+记录 checkpointer 序列化的全部对象（checkpoint、通道值、中间写入），再分别用不同的序列化器处理，对比：
+- 每个 checkpoint 的平均字节数
+- 序列化 / 反序列化耗时
+- 反序列化结果与原对象是否一致（另外单独检查带额外字段的消息等特殊情况）
+
+运行方法（在项目根目录下，不需要 API Key，不会请求模型）：
+
+python phase2_practical/08_context_management/benchmark_serde.py
+python phase2_practical/08_context_management/benchmark_serde.py 100   # 指定每段对话的轮数
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from common.compact_serde import CompactSerializer
+
+
+# 本章示例中的对话内容
+CONVERSATIONS = {
+    "长对话": [
+        "你好，我叫小李。",
+        "我是一名高中数学老师。",
+        "我最近在减肥，不吃晚饭。",
+        "我现在住在成都。",
+        "我最近在学习Python和LangChain。",
+    ],
+    "客服": [
+        "你好，我想咨询订单",
+        "我的订单号是 12345",
+        "帮我算一下 100 乘以 2 的优惠价",
+        "谢谢",
+    ],
+}
+
+
+# 对话中不常见、但序列化时不能丢失信息的消息
+EDGE_CASES = [
+    AIMessage(content="好的", foo=1),  # 消息模型允许额外字段
+    HumanMessage(content="你好", name="小李", source={"channel": "web", "ids": [1, 2]}),
+    AIMessage(content=[{"type": "text", "text": "多模态内容"}], id="ai-1"),
+]
+
+
+@tool
+def calculator(operation: str, a: float, b: float) -> str:
+    """
+    执行数学计算
+    """
+    return f"{a} {operation} {b} = {a * b if operation == 'multiply' else a + b}"
+
+
+class FakeToolModel(FakeMessagesListChatModel):
+    """
+    按顺序返回预设消息的假模型（忽略 bind_tools）
+    """
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def fake_responses(turns: int) -> list:
+    """
+    生成与 qwen-plus 返回结构相同的回复：每 4 轮有一次工具调用
+    """
+    metadata = {
+        "token_usage": {
+            "completion_tokens": 42,
+            "prompt_tokens": 318,
+            "total_tokens": 360,
+            "completion_tokens_details": None,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        },
+        "model_provider": "openai",
+        "model_name": "qwen-plus",
+        "system_fingerprint": None,
+        "finish_reason": "stop",
+        "logprobs": None,
+    }
+    usage = {"input_tokens": 318, "output_tokens": 42, "total_tokens": 360}
+
+    responses = []
+    for i in range(turns):
+        if i % 4 == 2:
+            responses.append(
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "calculator",
+                            "args": {"operation": "multiply", "a": 100, "b": 2},
+                            "id": f"call_{i:024x}",
+                        }
+                    ],
+                    response_metadata={**metadata, "finish_reason": "tool_calls"},
+                    usage_metadata=usage,
+                    id=f"lc_run--{i:08x}-0000-4000-8000-000000000000",
+                )
+            )
+        responses.append(
+            AIMessage(
+                content=f"好的，已经记下了。这是第 {i + 1} 轮回复，还有什么可以帮您？",
+                response_metadata=metadata,
+                usage_metadata=usage,
+                id=f"lc_run--{i:08x}-0000-4000-8000-000000000001",
+            )
+        )
+    return responses
+
+
+class RecordingSerializer(JsonPlusSerializer):
+    """
+    记录 checkpointer 序列化过的全部对象
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.objects = []
+
+    def dumps_typed(self, obj):
+        self.objects.append(obj)
+        return super().dumps_typed(obj)
+
+
+def record(turns: int) -> tuple[list, int]:
+    """
+    运行各段对话，返回 (序列化过的对象, checkpoint 数)
+    """
+    serde = RecordingSerializer()
+    saver = InMemorySaver(serde=serde)
+    for name, messages in CONVERSATIONS.items():
+        agent = create_agent(
+            model=FakeToolModel(responses=fake_responses(turns)),
+            tools=[calculator],
+            system_prompt="你是客服助手。",
+            checkpointer=saver,
+        )
+        config = {"configurable": {"thread_id": name}}
+        for i in range(turns):
+            agent.invoke(
+                {"messages": [{"role": "user", "content": messages[i % len(messages)]}]},
+                config,
+            )
+    checkpoints = sum(
+        len(cps) for ns in saver.storage.values() for cps in ns.values()
+    )
+    return serde.objects, checkpoints
+
+
+def bench(serde, objects: list) -> tuple[int, float, float, bool]:
+    """
+    返回 (总字节数, 序列化耗时 ms, 反序列化耗时 ms, 结果是否一致)
+    """
+    start = time.perf_counter()
+    encoded = [serde.dumps_typed(obj) for obj in objects]
+    dumps_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    decoded = [serde.loads_typed(data) for data in encoded]
+    loads_ms = (time.perf_counter() - start) * 1000
+
+    size = sum(len(data) for _type, data in encoded)
+    return size, dumps_ms, loads_ms, decoded == objects
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    objects, checkpoints = record(turns)
+    print(
+        f"{len(CONVERSATIONS)} 段对话 × {turns} 轮：{checkpoints} 个 checkpoint，"
+        f"{len(objects)} 个序列化对象"
+    )
+    print(
+        f"{'序列化器':<24}{'字节/checkpoint':>16}{'压缩比':>8}"
+        f"{'序列化(ms)':>12}{'反序列化(ms)':>14}{'一致':>6}"
+    )
+
+    baseline = None
+    serdes = [
+        ("JsonPlusSerializer", JsonPlusSerializer()),
+        ("Compact（不压缩）", CompactSerializer(compress=False)),
+        ("Compact + zstd", CompactSerializer()),
+    ]
+    for name, serde in serdes:
+        size, dumps_ms, loads_ms, same = bench(serde, objects)
+        baseline = baseline or size
+        print(
+            f"{name:<24}{size / checkpoints:>16.0f}{baseline / size:>7.1f}x"
+            f"{dumps_ms:>12.1f}{loads_ms:>14.1f}{'是' if same else '否':>6}"
+        )
+
+    print("\n特殊消息的往返检查（额外字段、name、多模态内容）：")
+    for name, serde in serdes:
+        decoded = serde.loads_typed(serde.dumps_typed(EDGE_CASES))
+        print(f"{name:<24}{'一致' if decoded == EDGE_CASES else '不一致'}")
+
+
+if __name__ == "__main__":
+    main()
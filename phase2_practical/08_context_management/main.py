@@ -7,46 +7,36 @@ LangChain 1.0 - Context Management (上下文管理)
 2. trim_messages - 消息修剪工具
 3. 管理对话长度，避免超 token
 4. 中间件的使用
+
+各示例的 checkpointer 由 create_checkpointer() 创建：默认为 InMemorySaver，
+设置环境变量 CHECKPOINTER=sqlite 时改为 SQLiteSaver，对话状态保存在本地
+.cache/checkpoints.sqlite 中，进程重启后仍可按 thread_id 继续对话；
+CHECKPOINTER=bounded 时改为 BoundedInMemorySaver，限制内存中的会话数；
+另外设置 CHECKPOINT_SERDE=compact 时，checkpoint 使用紧凑的二进制序列化
+（对比见 benchmark_serde.py）
 """
 
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import sys
+from pathlib import Path
 from langchain.agents import create_agent
 from langchain.agents.middleware import SummarizationMiddleware
 from langchain_core.tools import tool
 from langchain_core.messages.utils import trim_messages
 from langchain_core.messages import HumanMessage, AIMessage
-from langgraph.checkpoint.memory import InMemorySaver
-
-
-# 加载环境变量
-load_dotenv()
 
-QWEN_API_KEY = os.getenv("QWEN_API_KEY")
-QWEN_BASE_URL = os.getenv("QWEN_BASE_URL")
-
-if not QWEN_API_KEY or QWEN_API_KEY == "your_qwen_api_key_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_API_KEY"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/api-key 获取免费密钥"
-    )
+# 将项目根目录加入模块搜索路径，以便导入 common 公共模块
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-if not QWEN_BASE_URL or QWEN_BASE_URL == "your_qwen_base_url_here":
-    raise ValueError(
-        "\n请先在 .env 文件中设置有效的 QWEN_BASE_URL"
-        "访问 https://bailian.console.aliyun.com/cn-beijing/?tab=model#/model-market/detail/qwen-plus 获取适配 OpenAI 的 url"
-    )
-
-
-# 初始化模型
-model = init_chat_model(
-    model="qwen-plus",
-    model_provider="openai",
-    api_key=QWEN_API_KEY,
-    base_url=QWEN_BASE_URL,
-    temperature=0.8,
+from common.background_summary import BackgroundSummarizationMiddleware
+from common.checkpointer import create_checkpointer
+from common.prefix_cache import PrefixReuseMiddleware, PrefixReuseTracker
+from common.rolling_summary import (
+    BackgroundRollingSummarizationMiddleware,
+    RollingSummarizationMiddleware,
 )
+from common.context_window import ContextWindow
+from common.model_factory import get_chat_model
+from common.token_counter import get_token_counter
 
 
 # 自定义工具
@@ -79,11 +69,13 @@ def example_1_problem_unlimited_growth():
     print("示例 1：问题演示 - 对话历史无限增长")
     print("=" * 40)
 
+    model = get_chat_model()
+
     agent = create_agent(
         model=model,
         tools=[calculator],
         system_prompt="你是一名智能助手。",
-        checkpointer=InMemorySaver(),
+        checkpointer=create_checkpointer(),
     )
 
     config = {"configurable": {"thread_id": "long_conversation"}}
@@ -137,22 +129,23 @@ def example_2_summarization_middleware():
         3. summarization_prompt (可选)
         - 自定义摘要提示词
         - 默认：简洁摘要对话历史
+        4. prefetch_ratio（BackgroundSummarizationMiddleware）
+        - token 数达到阈值的这个比例时，就在后台提前生成摘要
+        - 下一次调用模型时直接替换旧消息，用户不用等待摘要模型
     """
     print("\n" + "=" * 40)
     print("示例 2：SummarizationMiddleware - 自动摘要")
     print("=" * 40)
 
-    summary_model = init_chat_model(
-        model="qwen-plus",
-        model_provider="openai",
-        api_key=QWEN_API_KEY,
-        base_url=QWEN_BASE_URL,
-        temperature=0.1,
-    )
+    model = get_chat_model()
+
+    summary_model = get_chat_model(temperature=0.1)
 
-    summarization_middleware = SummarizationMiddleware(
+    # 与 SummarizationMiddleware 参数相同，摘要改为在后台提前生成
+    summarization_middleware = BackgroundSummarizationMiddleware(
         model=summary_model,
         max_tokens_before_summary=1000,  # 超过 1000 tokens 就生成摘要
+        prefetch_ratio=0.8,  # 达到 800 tokens 时开始在后台生成摘要
         summary_prompt="""
 你正在为一个智能体构建**长期记忆摘要**。
 
@@ -164,6 +157,9 @@ def example_2_summarization_middleware():
 4. 删除闲聊、重复内容
 5. 用第三人称客观描述
 6. 输出内容将作为 system memory 供后续对话理解上下文
+
+需要压缩的对话：
+{messages}
 """,
     )
 
@@ -172,7 +168,7 @@ def example_2_summarization_middleware():
         model=model,
         tools=[],
         system_prompt="你是一名智能助手。",
-        checkpointer=InMemorySaver(),
+        checkpointer=create_checkpointer(),
         middleware=[summarization_middleware],
     )
 
@@ -195,6 +191,7 @@ def example_2_summarization_middleware():
         print(f"Agent 回复：{response["messages"][-1].content[:200]}...")
 
     print(f"\n消息数：{len(response["messages"])}")
+    print(f"摘要统计：{summarization_middleware.stats()}")
 
 
 # ============================================================================
@@ -212,6 +209,7 @@ def example_3_manual_trimming():
         - trim_messages 手动控制消息 token 数量
         - 适合需要精确控制的场景
         - 需要自己管理修剪逻辑
+        - token_counter 使用 BPE 分词器计数，并按消息缓存结果
     """
     print("\n" + "=" * 40)
     print("示例 3：手动消息修剪")
@@ -249,22 +247,35 @@ def example_3_manual_trimming():
 
     print(f"\n原始消息数：{len(messages)}")
 
-    def fake_token_counter(messages):
-        # 非常粗略：按字符数近似 token
-        return sum(len(m.content) for m in messages)
+    # 使用 BPE 分词器计数（按字符数估算对中文严重失真），结果按消息缓存
+    token_counter = get_token_counter()
+    print(f"原始 token 数：{token_counter(messages)}")
 
     trimmed = trim_messages(
         messages=messages,
         max_tokens=200,  # 用 token 控制
-        token_counter=fake_token_counter,
+        token_counter=token_counter,
         strategy="last",
     )
 
-    print(f"修剪后的消息数：{len(trimmed)}")
+    print(f"修剪后的消息数：{len(trimmed)}（{token_counter(trimmed)} tokens）")
     print("\n保留的消息：")
     for msg in trimmed:
         print(f"{msg.__class__.__name__}: {msg.content}")
 
+    # 对话不断增长、每轮都重新修剪：trim_messages 会对不同前缀反复计数，
+    # 但只有新增的消息需要分词，其余命中缓存
+    history = []
+    for i in range(0, len(messages), 2):
+        history.extend(messages[i : i + 2])
+        trim_messages(
+            messages=history,
+            max_tokens=200,
+            token_counter=token_counter,
+            strategy="last",
+        )
+    print(f"\n逐轮修剪 {len(messages) // 2} 次后的计数统计：{token_counter.stats()}")
+
 
 # ============================================================================
 # 示例4：对比不同策略
@@ -306,13 +317,14 @@ def example_4_comparison():
    - 可能断开上下文
    适用：只需要指定数量的 token
 
-4. 滑动窗口（自定义）
+4. 滑动窗口（ContextWindow，见示例 6）
    优点：
    - 保留系统消息 + 最近消息
    - 可控成本
+   - 增量维护，每轮只处理新消息
    缺点：
-   - 需要自己实现
-   适用：有明确规则的场景
+   - 旧消息完全丢失
+   适用：有明确规则的场景、很长的对话
 
 推荐方案：
 - 短对话（<10轮）：不处理
@@ -335,23 +347,23 @@ def example_5_practical_customer_service():
     - 关键点：
         - 自动管理对话 token
         - 重要信息（订单号）通过摘要保留
+        - 摘要在后台提前生成，不会让某一轮回复突然变慢
+        - 分层滚动摘要：每次只摘要新增的对话，摘要开销不随对话长度增长
         - 适合生产环境
     """
     print("\n" + "=" * 40)
     print("示例 5：实际应用 - 客服机器人")
     print("=" * 40)
 
-    summary_model = init_chat_model(
-        model="qwen-plus",
-        model_provider="openai",
-        api_key=QWEN_API_KEY,
-        base_url=QWEN_BASE_URL,
-        temperature=0.1,
-    )
+    model = get_chat_model()
+
+    summary_model = get_chat_model(temperature=0.1)
 
-    summarization_middleware = SummarizationMiddleware(
+    summarization_middleware = BackgroundRollingSummarizationMiddleware(
         model=summary_model,
         max_tokens_before_summary=800,  # 超过 800 tokens 就生成摘要
+        prefetch_ratio=0.8,  # 后台提前生成摘要，客户不用等待
+        fanout=4,  # 只摘要新增的对话，每 4 段摘要合并为 1 段
         summary_prompt="""
 你正在为一个智能体构建**长期记忆摘要**。
 
@@ -363,6 +375,9 @@ def example_5_practical_customer_service():
 4. 删除闲聊、重复内容
 5. 用第三人称客观描述
 6. 输出内容将作为 system memory 供后续对话理解上下文
+
+需要压缩的对话：
+{messages}
 """,
     )
 
@@ -377,7 +392,7 @@ def example_5_practical_customer_service():
 - 简洁回答
 - 使用工具计算
 """,
-        checkpointer=InMemorySaver(),
+        checkpointer=create_checkpointer(),
         middleware=[summarization_middleware],
     )
 
@@ -399,6 +414,137 @@ def example_5_practical_customer_service():
         print(f"客服：{response["messages"][-1].content}")
 
     print(f"\n总消息数：{len(response["messages"])}")
+    print(f"摘要统计：{summarization_middleware.stats()}")
+
+
+# ============================================================================
+# 示例6：滑动窗口（ContextWindow）
+# ============================================================================
+def example_6_sliding_window():
+    """
+    示例6：使用 ContextWindow 增量维护对话窗口
+
+    - 场景：不需要摘要、只关心最近对话的长聊天
+
+    - 关键点：
+        - system 消息固定保留，对话按 token 数从最旧的一端淘汰
+        - 每轮只计数新追加的消息，不会重新修剪完整历史
+        - 淘汰后窗口总是从用户消息开始
+        - trim_to：需要淘汰时一次淘汰到更低的位置，窗口开头几轮才变化一次，
+          其余轮次只在末尾追加，服务端的前缀缓存可以复用
+    """
+    print("\n" + "=" * 40)
+    print("示例 6：滑动窗口（ContextWindow）")
+    print("=" * 40)
+
+    model = get_chat_model()
+
+    window = ContextWindow(max_tokens=300, trim_to=150)
+    tracker = PrefixReuseTracker()
+    window.append({"role": "system", "content": "你是一名智能助手，回答尽量简短。"})
+
+    conversations = [
+        "你好，我叫小李。",
+        "我是一名高中数学老师。",
+        "我最近在减肥，不吃晚饭。",
+        "我现在住在成都。",
+        "我最近在学习Python和LangChain。",
+        "我叫什么名字？",
+    ]
+
+    for i, question in enumerate(conversations, 1):
+        window.append({"role": "user", "content": question})
+        messages = window.messages()
+        reuse = tracker.observe(messages)
+        response = model.invoke(messages)
+        window.append(response)
+
+        print(f"\n第 {i} 轮 用户：{question}")
+        print(f"AI：{response.content[:60]}")
+        print(f"窗口：{window.stats()}，前缀复用率：{reuse["ratio"]:.0%}")
+
+    print("\n最早的对话已被淘汰，最后一个问题可能无法回答（对比示例 2 的摘要）")
+
+
+# ============================================================================
+# 示例7：前缀稳定的上下文布局（服务端前缀缓存）
+# ============================================================================
+def example_7_stable_prefix():
+    """
+    示例7：让每次请求的前缀尽量保持不变
+
+    - 背景：qwen-plus 等模型服务会缓存请求的前缀，前缀相同的部分计费更低、响应更快；
+      但前缀中只要有一个字节变化，之后的内容就全部无法复用
+
+    - 对比：
+        - 默认布局：每次摘要都重写整段摘要，摘要之后的内容全部无法复用
+        - 前缀稳定布局：system 提示词固定；摘要只在末尾追加新的分段摘要（fanout=None），
+          摘要之前的内容逐字节不变
+
+    - 关键点：
+        - PrefixReuseMiddleware 记录每次请求能复用上一次请求多少前缀（复用率）
+        - 两次摘要之间，两种布局都只在末尾追加消息；区别在摘要发生的那一轮：
+          前缀稳定布局还能复用之前的全部摘要，代价是摘要随分段数增长、可能更早触发下一次摘要
+        - trigger 设大、keep 设小：摘要次数越少，前缀变化越少
+        - system 提示词中不要放时间、随机数等每轮变化的内容
+        - 实际命中以响应中的 cached_tokens 为准，这里统计的是复用潜力
+    """
+    print("\n" + "=" * 40)
+    print("示例 7：前缀稳定的上下文布局")
+    print("=" * 40)
+
+    model = get_chat_model()
+    summary_model = get_chat_model(temperature=0.1)
+
+    conversations = [
+        "你好，我想咨询订单",
+        "我的订单号是 12345",
+        "帮我算一下 100 乘以 2 的优惠价",
+        "我想把收货地址改成成都市武侯区",
+        "另外发票抬头写我们公司的名字",
+        "大概什么时候能发货？",
+        "如果不满意可以七天无理由退货吗？",
+        "退货的运费谁来承担？",
+        "那我先不退了，帮我再买一件同款",
+        "两件一起算的话总价是多少？",
+        "好的，我的订单号和收货地址分别是什么？",
+    ]
+
+    # 两种布局使用相同的触发条件；按 BPE 分词器计数（默认的估算对中文偏低）
+    options = {
+        "trigger": ("tokens", 400),
+        "keep": ("messages", 4),
+        "token_counter": get_token_counter(),
+    }
+    layouts = {
+        "默认布局": SummarizationMiddleware(model=summary_model, **options),
+        "前缀稳定布局": RollingSummarizationMiddleware(
+            model=summary_model,
+            fanout=None,  # 摘要只追加、不合并
+            **options,
+        ),
+    }
+
+    for name, summarization_middleware in layouts.items():
+        monitor = PrefixReuseMiddleware()
+        agent = create_agent(
+            model=model,
+            tools=[calculator],
+            system_prompt="你是客服助手。记住用户的问题，简洁回答，需要计算时使用工具。",
+            checkpointer=create_checkpointer(),
+            middleware=[summarization_middleware, monitor],  # 监控放在最后
+        )
+        config = {"configurable": {"thread_id": f"prefix_{name}"}}
+
+        print(f"\n{name}")
+        for msg in conversations:
+            agent.invoke(
+                {"messages": [{"role": "user", "content": msg}]}, config=config
+            )
+        history = monitor.history(config["configurable"]["thread_id"])
+        ratios = [f"{record["ratio"]:.0%}" for record in history]
+        print(f"每次请求的前缀复用率：{" ".join(ratios)}")
+        print(f"整体：{monitor.stats()}")
 
 
 # ============================================================================
@@ -414,7 +560,9 @@ def main():
         # example_2_summarization_middleware()
         # example_3_manual_trimming()
         # example_4_comparison()
-        example_5_practical_customer_service()
+        # example_5_practical_customer_service()
+        # example_6_sliding_window()
+        example_7_stable_prefix()
 
         print("\n" + "=" * 80)
         print("完成！")